@@ -58,11 +58,7 @@ if settings.WSR:
 from castervoice.lib import control
 
 if control.nexus() is None:
-    from castervoice.lib.ctrl.mgr.loading.load.content_loader import ContentLoader
-    from castervoice.lib.ctrl.mgr.loading.load.content_request_generator import ContentRequestGenerator
-    _crg = ContentRequestGenerator()
-    _content_loader = ContentLoader(_crg)
-    control.init_nexus(_content_loader)
+    control.init_nexus(control.create_content_loader())
 
 if settings.SETTINGS["sikuli"]["enabled"]:
     from castervoice.asynch.sikuli import sikuli_controller
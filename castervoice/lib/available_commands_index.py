@@ -0,0 +1,127 @@
+class AvailableCommandsIndex(object):
+    """
+    Keeps track of which rules are currently loaded, and answers questions
+    about what can be said with them.
+
+    Rules are only stored by reference when they're loaded, which is cheap
+    and happens on every merge. The specs are only collected and sorted
+    the first time the commands are asked for after a change.
+    """
+
+    def __init__(self):
+        # {rcn: (rule, context name or None)}
+        self._ccr_rules = {}
+        self._non_ccr_rules = {}
+        # sorted list of (spec, rcn, context name or None), or None if it needs rebuilding
+        self._commands = None
+
+    def set_ccr_rules(self, rules_and_context_names):
+        """
+        Replaces all indexed CCR rules.
+
+        :param rules_and_context_names: list of (rule class name, MappingRule, context name or None)
+        """
+        self._ccr_rules = {}
+        for rcn, rule, context_name in rules_and_context_names:
+            self._ccr_rules[rcn] = (rule, context_name)
+        self._commands = None
+
+    def set_non_ccr_rule(self, rcn, rule, context_name=None):
+        """
+        :param rcn: str, rule class name
+        :param rule: MappingRule, or None if the rule was disabled
+        :param context_name: str or None
+        """
+        if rule is None:
+            self._non_ccr_rules.pop(rcn, None)
+        else:
+            self._non_ccr_rules[rcn] = (rule, context_name)
+        self._commands = None
+
+    def get_commands(self, rcn=None, context_name=None, prefix=None):
+        """
+        All filters are case insensitive. Commands of global rules match any context.
+
+        :param rcn: str, only commands of the rule with this class name
+        :param context_name: str, only commands available in this context (e.g. an executable)
+        :param prefix: str, only commands with specs starting with this
+        :return: list of (spec, rule class name, context name or None), sorted by spec
+        """
+        rcn = rcn.lower() if rcn is not None else None
+        context_name = context_name.lower() if context_name is not None else None
+        prefix = prefix.lower() if prefix is not None else None
+        commands = []
+        for command in self._get_all_commands():
+            spec, command_rcn, command_context_name = command
+            if rcn is not None and command_rcn.lower() != rcn:
+                continue
+            if context_name is not None and command_context_name is not None \
+                    and command_context_name.lower() != context_name:
+                continue
+            if prefix is not None and not spec.lower().startswith(prefix):
+                continue
+            commands.append(command)
+        return commands
+
+    def find_commands(self, about):
+        """
+        :param about: str, part of a spec, a rule class name, or a context name
+        :return: list of (spec, rule class name, context name or None), sorted by spec
+        """
+        about = about.lower().strip()
+        commands = []
+        for command in self._get_all_commands():
+            spec, rcn, context_name = command
+            if about in spec.lower() or about in rcn.lower() \
+                    or (context_name is not None and about in context_name.lower()):
+                commands.append(command)
+        return commands
+
+    @staticmethod
+    def get_context_name(details):
+        """
+        :param details: RuleDetails
+        :return: str, the executable or title the rule is limited to, or None for global rules
+        """
+        if details.executable is not None:
+            return details.executable
+        return details.title
+
+    @staticmethod
+    def format_commands(commands):
+        """
+        :param commands: list of (spec, rule class name, context name or None)
+        :return: str, the specs grouped by rule
+        """
+        if len(commands) == 0:
+            return "No matching commands."
+        rcns_to_specs = {}
+        rcns_to_context_names = {}
+        for spec, rcn, context_name in commands:
+            rcns_to_specs.setdefault(rcn, []).append(spec)
+            rcns_to_context_names[rcn] = context_name
+        lines = []
+        for rcn in sorted(rcns_to_specs):
+            context_name = rcns_to_context_names[rcn]
+            lines.append(rcn + (" ({})".format(context_name) if context_name is not None else "") + ":")
+            lines.extend("    " + spec for spec in rcns_to_specs[rcn])
+        return "\n".join(lines)
+
+    def _get_all_commands(self):
+        if self._commands is None:
+            commands = []
+            for rules in (self._ccr_rules, self._non_ccr_rules):
+                for rcn, (rule, context_name) in rules.items():
+                    commands.extend((spec, rcn, context_name) for spec in rule._mapping.keys())
+            self._commands = sorted(commands, key=lambda command: command[:2])
+        return self._commands
+
+
+_INSTANCE = None
+
+
+def get_instance():
+    global _INSTANCE
+    if _INSTANCE is None:
+        _INSTANCE = AvailableCommandsIndex()
+    return _INSTANCE
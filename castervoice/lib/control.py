@@ -7,5 +7,20 @@ def init_nexus(content_loader):
     _NEXUS = Nexus(content_loader)
 
 
+def create_content_loader():
+    from castervoice.lib import settings
+    from castervoice.lib.ctrl.mgr.loading.load.content_loader import ContentLoader
+    from castervoice.lib.ctrl.mgr.loading.load.content_manifest import ContentManifest
+    from castervoice.lib.ctrl.mgr.loading.load.content_module_finder import ContentModuleFinder
+    from castervoice.lib.ctrl.mgr.loading.load.content_request_generator import ContentRequestGenerator
+    manifest = None
+    if settings.settings(["grammar_loading", "content_manifest"]):
+        manifest = ContentManifest(settings.SETTINGS["paths"]["CONTENT_MANIFEST_PATH"])
+    crg = ContentRequestGenerator(manifest)
+    module_finder = ContentModuleFinder()
+    module_finder.install()
+    return ContentLoader(crg, settings.settings(["grammar_loading", "lazy_rules"]), module_finder)
+
+
 def nexus():
     return _NEXUS
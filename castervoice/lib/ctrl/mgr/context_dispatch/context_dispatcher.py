@@ -0,0 +1,78 @@
+import threading
+
+from castervoice.lib.context import AppContext
+from castervoice.lib.ctrl.mgr.context_dispatch.dispatched_context import DispatchedAppContext
+from castervoice.lib.util.lru_cache import LRUCache
+
+
+class ContextDispatcher(object):
+    """
+    Classifies the foreground window against every registered context at once,
+    and remembers the result per window (handle, executable and title), so that
+    the contexts it created only have to look themselves up in the result.
+
+    Without it, the speech engine checks every grammar's context separately on
+    every utterance, and the negation context of the global CCR grammar checks
+    every app context again.
+    """
+
+    def __init__(self, cache_size=32):
+        """
+        :param cache_size: int, how many windows to remember the classification of
+        """
+        self._lock = threading.Lock()
+        # {key: Context}
+        self._contexts = {}
+        # {(handle, executable, title): frozenset of keys}
+        self._classifications = LRUCache(cache_size)
+
+    def create_context(self, executable=None, title=None):
+        """
+        A drop-in replacement for AppContext(executable, title).
+
+        :param executable: str, list of str, or None
+        :param title: str, list of str, or None
+        :return: DispatchedAppContext
+        """
+        return DispatchedAppContext(self, self.register(AppContext(executable=executable, title=title)))
+
+    def register(self, context):
+        """
+        Adds a context to the classification. Contexts are identified by their
+        description, so registering an equal context again changes nothing.
+        Registering a new context forgets all classifications.
+
+        :param context: Context
+        :return: str, the key of the context
+        """
+        key = str(context)
+        with self._lock:
+            if key not in self._contexts:
+                self._contexts[key] = context
+                self._classifications.clear()
+        return key
+
+    def classify(self, executable, title, handle):
+        """
+        :param executable: str, of the foreground window
+        :param title: str, of the foreground window
+        :param handle: int, of the foreground window
+        :return: frozenset of the keys of the registered contexts which match the window
+        """
+        window_key = (handle, executable, title)
+        with self._lock:
+            matching_keys = self._classifications.get(window_key)
+            if matching_keys is None:
+                matching_keys = frozenset(key for key, context in self._contexts.items()
+                                          if context.matches(executable, title, handle))
+                self._classifications.put(window_key, matching_keys)
+        return matching_keys
+
+    def matches(self, context, executable, title, handle):
+        """
+        Checks any context against the window, registering it first if needed.
+
+        :param context: Context
+        :return: boolean
+        """
+        return self.register(context) in self.classify(executable, title, handle)
@@ -0,0 +1,50 @@
+from dragonfly import Context
+
+
+class DispatchedAppContext(Context):
+    """
+    A context which is looked up in its ContextDispatcher's
+    classification of the window rather than matched itself.
+    """
+
+    def __init__(self, dispatcher, key):
+        """
+        :param dispatcher: ContextDispatcher
+        :param key: str, the key the context was registered with
+        """
+        Context.__init__(self)
+        self._dispatcher = dispatcher
+        self._key = key
+        self._str = key
+
+    def matches(self, executable, title, handle):
+        return self._key in self._dispatcher.classify(executable, title, handle)
+
+    def __invert__(self):
+        return DispatchedNegationContext(self._dispatcher, frozenset([self._key]))
+
+
+class DispatchedNegationContext(Context):
+    """
+    Matches when none of a set of dispatched contexts match. Combining
+    several of them with & gives one context with all of their keys, so
+    "not in any app context" costs one set comparison.
+    """
+
+    def __init__(self, dispatcher, keys):
+        """
+        :param dispatcher: ContextDispatcher
+        :param keys: frozenset of str
+        """
+        Context.__init__(self)
+        self._dispatcher = dispatcher
+        self._keys = keys
+        self._str = ", ".join(sorted(keys))
+
+    def matches(self, executable, title, handle):
+        return self._keys.isdisjoint(self._dispatcher.classify(executable, title, handle))
+
+    def __and__(self, other):
+        if isinstance(other, DispatchedNegationContext) and other._dispatcher is self._dispatcher:
+            return DispatchedNegationContext(self._dispatcher, self._keys | other._keys)
+        return Context.__and__(self, other)
@@ -1,19 +1,31 @@
-from dragonfly import MappingRule, Function
+from dragonfly import MappingRule, Function, Compound, Repetition, DictList, DictListRef
 
 from castervoice.lib.ctrl.mgr.errors.no_pronunciation_error import NoPronunciationError
 from castervoice.lib.ctrl.mgr.rule_details import RuleDetails
+from castervoice.lib.merge.ccrmerging2.activation_rule_generator import create_activation_choice
 
 
 class GrammarActivator(object):
     """
     It is the responsibility of the Activator to manage a grammar for activating
     and deactivating rules. It is stateful.
+
+    The rules' triggers are kept in a DictList which all of the activation
+    commands refer to, so the activation rule stays the same size no matter
+    how many rules there are, and rules registered after it was loaded can
+    be activated right away.
     """
 
+    # the most rules which can be named in one "enable X and Y" command
+    _MAX_RULES_PER_COMMAND = 5
+
     def __init__(self, merge_rule_checker_fn):
         self._class_name_to_trigger = {}
+        # {trigger: rule class name}
+        self._triggers = DictList("activatable_rules")
         self._activation_rule_class = None
         self._activation_fn = None
+        self._batch_activation_fn = None
         self._merge_rule_checker_fn = merge_rule_checker_fn
 
     def set_activation_fn(self, activation_fn):
@@ -25,13 +37,34 @@ class GrammarActivator(object):
         """
         self._activation_fn = activation_fn
 
+    def set_batch_activation_fn(self, batch_activation_fn):
+        """
+        Like the activation function, but takes a list of rule class names,
+        for "enable X and Y" / "disable X and Y".
+        """
+        self._batch_activation_fn = batch_activation_fn
+
     def register_rule(self, managed_rule):
         """
         register or re-register a rule;
         the "trigger" is what the rule is called when you say "enabled X" or "disable X"
+
+        :param managed_rule: ManagedRule
+        """
+        self.register_trigger(managed_rule.get_rule_class_name(), self._get_trigger(managed_rule))
+
+    def register_trigger(self, class_name, trigger):
+        """
+        Like register_rule, for rules which haven't been imported yet.
+
+        :param class_name: str
+        :param trigger: str
         """
-        trigger = self._get_trigger(managed_rule)
-        self._class_name_to_trigger[managed_rule.get_rule_class_name()] = trigger
+        old_trigger = self._class_name_to_trigger.get(class_name)
+        if old_trigger is not None and old_trigger != trigger and self._triggers.get(old_trigger) == class_name:
+            del self._triggers[old_trigger]
+        self._class_name_to_trigger[class_name] = trigger
+        self._triggers[trigger] = class_name
 
     def _get_trigger(self, managed_rule):
         """
@@ -49,20 +82,27 @@ class GrammarActivator(object):
         """
         Construct new rule and for activation.
         Should be called once only, after initial content loading.
-        Rule reloading does not watch for new files, so no need to ever call this again.
+        Rules registered later are added to the triggers list, so no need to ever call this again.
         """
-        if self._activation_rule_class is not None:
+        if self._activation_rule_class is not None or len(self._triggers) == 0:
             return None
 
-        _mapping = {}
-        for class_name, trigger in self._class_name_to_trigger.items():
-            enable_spec = "enable {}".format(trigger)
-            disable_spec = "disable {}".format(trigger)
-            _mapping[enable_spec] = Function(lambda rcn: self._activation_fn(rcn, True), rcn=class_name)
-            _mapping[disable_spec] = Function(lambda rcn: self._activation_fn(rcn, False), rcn=class_name)
+        _mapping = {
+            "<active> <rcn>": Function(lambda active, rcn: self._activation_fn(rcn, active))
+        }
+        _extras = [create_activation_choice(), DictListRef("rcn", self._triggers)]
+        if self._batch_activation_fn is not None:
+            and_another = Compound("and <rcn>", extras=[DictListRef("rcn", self._triggers)],
+                                   value_func=lambda node, extras: extras["rcn"])
+            _extras.extend([DictListRef("first_rcn", self._triggers),
+                            Repetition(and_another, min=1, max=GrammarActivator._MAX_RULES_PER_COMMAND,
+                                       name="more_rcns")])
+            _mapping["<active> <first_rcn> <more_rcns>"] = Function(
+                lambda active, first_rcn, more_rcns: self._batch_activation_fn([first_rcn] + more_rcns, active))
 
         class GrammarActivatorRule(MappingRule):
             mapping = _mapping
+            extras = _extras
         self._activation_rule_class = GrammarActivatorRule
 
         # name that should be pretty difficult to say by mistake:
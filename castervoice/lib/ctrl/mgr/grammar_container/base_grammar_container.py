@@ -4,9 +4,22 @@ from castervoice.lib.ctrl.mgr.errors.base_class_error import DontUseBaseClassErr
 class BaseGrammarContainer(object):
 
     def set_non_ccr(self, rcn, grammar):
+        """
+        Replaces the grammar of one non-ccr rule.
+
+        :param rcn: str, rule class name
+        :param grammar: Grammar, not loaded, or None to turn the rule off
+        :return: list of Grammar, which the caller should load
+        """
         raise DontUseBaseClassError(self)
 
     def set_ccr(self, ccr_grammars):
+        """
+        Replaces all ccr grammars.
+
+        :param ccr_grammars: list of Grammar, not loaded
+        :return: list of Grammar, those of ccr_grammars which the caller should load
+        """
         raise DontUseBaseClassError(self)
 
     def wipe_ccr(self):
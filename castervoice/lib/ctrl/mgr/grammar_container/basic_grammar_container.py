@@ -21,14 +21,17 @@ class BasicGrammarContainer(BaseGrammarContainer):
             BasicGrammarContainer._empty_grammar(old_grammar)
             del self._non_ccr_grammars[rcn]
 
-        if grammar is not None:
-            self._non_ccr_grammars[rcn] = grammar
+        if grammar is None:
+            return []
+        self._non_ccr_grammars[rcn] = grammar
+        return [grammar]
 
     def set_ccr(self, ccr_grammars):
         # first, wipe out old ccr rules
         for ccr_grammar in self._ccr_grammars:
             BasicGrammarContainer._empty_grammar(ccr_grammar)
         self._ccr_grammars = ccr_grammars
+        return ccr_grammars
 
     def wipe_ccr(self):
         self.set_ccr([])
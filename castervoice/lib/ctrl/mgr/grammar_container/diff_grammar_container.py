@@ -0,0 +1,37 @@
+from castervoice.lib.ctrl.mgr.grammar_container.basic_grammar_container import BasicGrammarContainer
+from castervoice.lib.ctrl.mgr.grammar_container.grammar_fingerprint import get_grammar_fingerprint
+
+
+class DiffGrammarContainer(BasicGrammarContainer):
+    """
+    Like the BasicGrammarContainer, but when the CCR grammars are replaced,
+    already loaded grammars which are identical to new ones are kept
+    instead of being unloaded and the new ones loaded in their place.
+    """
+
+    def __init__(self):
+        super(DiffGrammarContainer, self).__init__()
+        # [(fingerprint, loaded ccr grammar)]
+        self._fingerprinted_ccr_grammars = []
+
+    def set_ccr(self, ccr_grammars):
+        old_grammars = {}
+        for fingerprint, grammar in self._fingerprinted_ccr_grammars:
+            old_grammars.setdefault(fingerprint, []).append(grammar)
+
+        self._fingerprinted_ccr_grammars = []
+        self._ccr_grammars = []
+        grammars_to_load = []
+        for grammar in ccr_grammars:
+            fingerprint = get_grammar_fingerprint(grammar)
+            if len(old_grammars.get(fingerprint, [])) > 0:
+                grammar = old_grammars[fingerprint].pop()
+            else:
+                grammars_to_load.append(grammar)
+            self._fingerprinted_ccr_grammars.append((fingerprint, grammar))
+            self._ccr_grammars.append(grammar)
+
+        for unmatched_grammars in old_grammars.values():
+            for old_grammar in unmatched_grammars:
+                BasicGrammarContainer._empty_grammar(old_grammar)
+        return grammars_to_load
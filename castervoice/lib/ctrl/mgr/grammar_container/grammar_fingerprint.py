@@ -0,0 +1,44 @@
+from dragonfly import Literal, MappingRule, Repetition, RuleRef
+
+
+def get_grammar_fingerprint(grammar):
+    """
+    Identifies what a grammar would recognize and do: two grammars with the
+    same fingerprint are interchangeable. Rule names are left out, since merged
+    rules get new names every merge.
+
+    Actions and extras are compared by identity rather than by content, so
+    only grammars built from the very same (e.g. cached) rule objects match.
+
+    :param grammar: Grammar, with its rules added
+    :return: tuple
+    """
+    return (str(grammar._context),
+            tuple(get_rule_fingerprint(rule) for rule in grammar.rules))
+
+
+def get_rule_fingerprint(rule):
+    """
+    :param rule: Rule
+    :return: tuple, see get_grammar_fingerprint
+    """
+    parts = [rule.__class__.__name__, rule.exported, str(rule._context)]
+    if isinstance(rule, MappingRule):
+        parts.append(tuple(sorted((spec, id(action)) for spec, action in rule._mapping.items())))
+        parts.append(tuple(sorted((name, id(extra)) for name, extra in rule._extras.items())))
+        parts.append(tuple(sorted((name, repr(default)) for name, default in rule._defaults.items())))
+    else:
+        parts.append(_get_element_fingerprint(rule.element))
+    return tuple(parts)
+
+
+def _get_element_fingerprint(element):
+    if isinstance(element, RuleRef):
+        return "ref", get_rule_fingerprint(element.rule)
+    parts = [element.__class__.__name__, element.name]
+    if isinstance(element, Literal):
+        parts.append(tuple(element.words))
+    elif isinstance(element, Repetition):
+        parts.append((element._min, element._max))
+    parts.extend(_get_element_fingerprint(child) for child in element.children)
+    return tuple(parts)
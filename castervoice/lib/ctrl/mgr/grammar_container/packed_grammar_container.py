@@ -0,0 +1,115 @@
+import collections
+
+from dragonfly import Grammar
+
+from castervoice.lib.ctrl.mgr.grammar_container.basic_grammar_container import BasicGrammarContainer
+from castervoice.lib.ctrl.mgr.grammar_container.diff_grammar_container import DiffGrammarContainer
+from castervoice.lib.ctrl.mgr.grammar_container.grammar_fingerprint import get_rule_fingerprint
+
+
+class PackedGrammarContainer(DiffGrammarContainer):
+    """
+    Puts all non-CCR rules which have the same context into one grammar ("pack"),
+    so the engine has fewer grammars to hold and fewer contexts to check per utterance.
+
+    Disabling a rule only disables it inside its pack, and enabling an identical
+    copy of it again only re-enables it. Any other change replaces the pack's grammar,
+    since rules can't be added to or removed from a loaded grammar. Rules which can't
+    share a pack (a rule name which is already taken there, or more than one rule)
+    get a grammar of their own, like in the BasicGrammarContainer.
+
+    Also keeps unchanged CCR grammars, like the DiffGrammarContainer.
+    """
+
+    def __init__(self):
+        super(PackedGrammarContainer, self).__init__()
+        # {rcn: (context key, rule)}, in the order the rules were packed
+        self._packed_rules = collections.OrderedDict()
+        # {context key: Grammar}
+        self._packed_grammars = {}
+        # {context key: Context}
+        self._pack_contexts = {}
+        self._pack_count = 0
+
+    def set_non_ccr(self, rcn, grammar):
+        if grammar is None:
+            if rcn in self._packed_rules:
+                self._packed_rules[rcn][1].disable()
+                return []
+            return BasicGrammarContainer.set_non_ccr(self, rcn, None)
+
+        context_key = str(grammar._context)
+        if rcn in self._packed_rules and self._is_same_rule(rcn, context_key, grammar):
+            self._packed_rules[rcn][1].enable()
+            return []
+
+        changed_context_keys = []
+        if rcn in self._packed_rules:
+            changed_context_keys.append(self._packed_rules.pop(rcn)[0])
+
+        if not self._can_pack(context_key, grammar):
+            grammars_to_load = self._rebuild_packs(changed_context_keys)
+            grammars_to_load.extend(BasicGrammarContainer.set_non_ccr(self, rcn, grammar))
+            return grammars_to_load
+
+        # take the rule out of the grammar it was made in
+        BasicGrammarContainer.set_non_ccr(self, rcn, None)
+        rule = grammar.rules[0]
+        grammar.remove_rule(rule)
+
+        self._packed_rules[rcn] = (context_key, rule)
+        self._pack_contexts[context_key] = grammar._context
+        if context_key not in changed_context_keys:
+            changed_context_keys.append(context_key)
+        return self._rebuild_packs(changed_context_keys)
+
+    def _is_same_rule(self, rcn, context_key, grammar):
+        old_context_key, old_rule = self._packed_rules[rcn]
+        if old_context_key != context_key or len(grammar.rules) != 1:
+            return False
+        # rules can only be switched on in a loaded grammar
+        if not self._packed_grammars[context_key].loaded:
+            return False
+        return get_rule_fingerprint(old_rule) == get_rule_fingerprint(grammar.rules[0])
+
+    def _can_pack(self, context_key, grammar):
+        if len(grammar.rules) != 1:
+            return False
+        rule_name = grammar.rules[0].name
+        return not any(key == context_key and rule.name == rule_name
+                       for key, rule in self._packed_rules.values())
+
+    def _rebuild_packs(self, context_keys):
+        """
+        Replaces the grammars of the given packs with new, unloaded ones. A new grammar is
+        made rather than changing the old one, since a loaded grammar also holds the rules
+        its rules referenced, which would stay behind after those rules are gone.
+        The old grammars are unloaded and left empty.
+
+        :param context_keys: list of str
+        :return: list of Grammar, the new grammars, which the caller should load
+        """
+        grammars_to_load = []
+        for context_key in context_keys:
+            old_grammar = self._packed_grammars.pop(context_key, None)
+            if old_grammar is not None:
+                for rule in old_grammar.rules:
+                    if rule.active:
+                        rule.deactivate()
+                old_grammar.unload()
+                for rule in list(old_grammar.rules):
+                    old_grammar.remove_rule(rule)
+
+            rules = [rule for key, rule in self._packed_rules.values() if key == context_key]
+            if len(rules) == 0:
+                del self._pack_contexts[context_key]
+                continue
+
+            self._pack_count += 1
+            packed_grammar = Grammar(name="packed" + str(self._pack_count),
+                                     context=self._pack_contexts[context_key])
+            for rule in rules:
+                packed_grammar.add_rule(rule)
+            self._packed_grammars[context_key] = packed_grammar
+            grammars_to_load.append(packed_grammar)
+        return grammars_to_load
@@ -1,15 +1,18 @@
+import contextlib
 import os, traceback
 
-from dragonfly import Grammar
+from dragonfly import Grammar, MappingRule
 
 from castervoice.lib import printer
+from castervoice.lib.available_commands_index import AvailableCommandsIndex
 from castervoice.lib.ctrl.mgr.errors.invalid_companion_configuration_error import InvalidCompanionConfigurationError
 from castervoice.lib.ctrl.mgr.errors.not_a_module import NotAModuleError
 from castervoice.lib.ctrl.mgr.loading.load.content_type import ContentType
 from castervoice.lib.ctrl.mgr.managed_rule import ManagedRule
-from castervoice.lib.ctrl.mgr.rule_formatter import _set_rdescripts
+from castervoice.lib.ctrl.mgr.rule_formatter import _set_class_rdescripts
 from castervoice.lib.ctrl.mgr.rules_enabled_diff import RulesEnabledDiff
 from castervoice.lib.merge.ccrmerging2.hooks.events.activation_event import RuleActivationEvent
+from castervoice.lib.merge.ccrmerging2.hooks.events.merge_completed_event import MergeCompletedEvent
 from castervoice.lib.merge.ccrmerging2.sorting.config_ruleset_sorter import ConfigBasedRuleSetSorter
 from castervoice.lib.util.ordered_set import OrderedSet
 
@@ -30,7 +33,12 @@ class GrammarManager(object):
                  smrc,
                  t_runner,
                  companion_config,
-                 combo_validator):
+                 combo_validator,
+                 merge_scheduler=None,
+                 commands_index=None,
+                 activation_predictor=None,
+                 validation_cache=None,
+                 validation_pool=None):
         """
         Holds both the current merged ccr rules and the most recently instantiated/validated
         copies of all ccr and non-ccr rules.
@@ -51,6 +59,13 @@ class GrammarManager(object):
         :param t_runner: a reference is kept to it so can instantly activate its activation rule
         :param companion_config: a config which controls which rules can be enabled/disabled instantly by other rules
         :param combo_validator: validates all (ccr/non-ccr) rule+detail combinations
+        :param merge_scheduler: MergeScheduler to merge in the background, or None to merge on the engine thread
+        :param commands_index: AvailableCommandsIndex to keep up to date with the loaded rules, or None
+        :param activation_predictor: ActivationPredictor, to merge the likely next ccr rule sets ahead
+            of time with the merge scheduler, or None
+        :param validation_cache: ValidationCache, to skip validating rules whose files haven't changed, or None
+        :param validation_pool: ThreadPool to validate rules on while the rest are imported at startup, or None;
+            it's closed once the GrammarManager is initialized
         """
         self._config = config
         self._merger = merger
@@ -66,33 +81,53 @@ class GrammarManager(object):
         self._transformers_runner = t_runner
         self._companion_config = companion_config
         self._combo_validator = combo_validator
+        self._merge_scheduler = merge_scheduler
+        self._commands_index = commands_index
+        self._activation_predictor = activation_predictor if merge_scheduler is not None else None
+        self._validation_cache = validation_cache
+        self._validation_pool = validation_pool
 
         # rules: (class name : ManagedRule}
         self._managed_rules = {}
+        # rules which are only imported once they're enabled: {class name: ContentRequest}
+        self._lazy_rule_requests = {}
+        # rules being validated on the validation pool: {class name: (ManagedRule, AsyncResult)}
+        self._pending_validations = {}
         #
         self._reload_observable.register_listener(self)
         '''The passed method references below would be a good place to start splitting the GM apart.'''
         #
         self._activator.set_activation_fn(lambda rcn, active: self._change_rule_enabled(rcn, active))
+        self._activator.set_batch_activation_fn(lambda rcns, active: self.change_rules_enabled(rcns, active))
         #
-        smrc.set_reload_fn(lambda rcn: self._delegate_enable_rule(rcn, True))
+        smrc.set_reload_fn(lambda rcn: self._reload_self_modifying_rule(rcn))
+        #
+        if self._merge_scheduler is not None:
+            self._merge_scheduler.set_apply_fn(lambda merge_result: self._apply_background_merge(merge_result))
         #
         self._initial_activations_complete = False
+        #
+        self._batch_depth = 0
+        self._batch_enabled_rcns = None
+        self._batch_diff = None
+        self._batch_grammars_to_load = None
 
     def initialize(self):
         if self._initial_activations_complete:
             return
+        self._finish_startup_validation()
 
         loaded_enabled_rcns = set(self._managed_rules.keys())
         enabled_ordered_rcns = self._config.get_enabled_rcns_ordered()
-        for rcn in enabled_ordered_rcns:
-            if rcn in loaded_enabled_rcns:
-                rd = self._managed_rules[rcn].get_details()
-                if rd.declared_ccrtype is None:
-                    self._delegate_enable_rule(rcn, True)
-            else:
-                msg = "Skipping rule {} because it is enabled but not loaded."
-                printer.out(msg.format(rcn))
+        with self.batch():
+            for rcn in enabled_ordered_rcns:
+                if rcn in loaded_enabled_rcns:
+                    rd = self._managed_rules[rcn].get_details()
+                    if rd.declared_ccrtype is None:
+                        self._delegate_enable_rule(rcn, True)
+                else:
+                    msg = "Skipping rule {} because it is enabled but not loaded."
+                    printer.out(msg.format(rcn))
         if self._ccr_toggle.is_active():
             self._remerge_ccr_rules(enabled_ordered_rcns)
 
@@ -112,27 +147,159 @@ class GrammarManager(object):
         :param details:
         :return:
         """
+        self._register_rule(rule_class, details)
+
+    def prevalidate_rule(self, rule_class, details):
+        """
+        Starts validating a rule on the validation pool, ahead of it being registered,
+        if its outcome isn't already cached. The ContentLoader calls this as each
+        rule is imported, so validation overlaps with importing the rest.
+
+        :param rule_class:
+        :param details:
+        """
+        if self._validation_pool is None:
+            return
+        managed_rule = ManagedRule(rule_class, details)
+        async_result = None
+        if self._get_cached_validation(managed_rule) is None:
+            async_result = self._validation_pool.apply_async(self._get_invalidation, (managed_rule,))
+        self._pending_validations[managed_rule.get_rule_class_name()] = (managed_rule, async_result)
+
+    def _finish_startup_validation(self):
+        self._pending_validations = {}
+        if self._validation_pool is not None:
+            self._validation_pool.close()
+            self._validation_pool = None
+        if self._validation_cache is not None:
+            self._validation_cache.save()
+
+    def register_lazy_rule(self, request):
+        """
+        Registers a rule which hasn't been imported: only its "enable X" / "disable X"
+        command is set up. It's imported and registered the first time it's enabled.
+
+        :param request: ContentRequest for the rule's module
+        """
+        self._lazy_rule_requests[request.content_class_name] = request
+        self._activator.register_trigger(request.content_class_name, request.trigger)
+
+    def _load_lazy_rule(self, class_name):
+        """
+        :param class_name: str
+        :return: boolean, whether the rule is registered now
+        """
+        request = self._lazy_rule_requests.pop(class_name, None)
+        if request is not None:
+            content = self._content_loader.load_request(request)
+            if content is not None:
+                rule_class, details = content
+                self.register_rule(rule_class, details)
+        return class_name in self._managed_rules
+
+    def _register_rule(self, rule_class, details, activatable=True):
+        """
+        :param rule_class:
+        :param details:
+        :param activatable: boolean, whether to add "enable X" / "disable X" for the rule
+        """
         class_name = rule_class.__name__
 
         # do not load or watch invalid rules
-        invalidation = self._get_invalidation(rule_class, details)
+        managed_rule, invalidation = self._validate(rule_class, details)
         if invalidation is not None:
             printer.out(invalidation)
             return
 
-        _set_rdescripts(rule_class.mapping, class_name)
+        _set_class_rdescripts(rule_class, class_name)
         '''
         rule should be safe for loading at this point: register it
         but do not load here -- this method only registers
         '''
-        managed_rule = ManagedRule(rule_class, details)
         self._managed_rules[class_name] = managed_rule
         # set up de/activation command
-        self._activator.register_rule(managed_rule)
+        if activatable:
+            self._activator.register_rule(managed_rule)
         # watch this file for future changes
         if not details.watch_exclusion:
             self._reload_observable.register_watched_file(details.get_filepath())
 
+    @contextlib.contextmanager
+    def batch(self):
+        """
+        Collects all rule de/activations (and their companion rules) made in the
+        with-block, then does them with one remerge and one config file write.
+        Non-ccr rules are switched on and off right away, but their grammars are
+        only loaded at the end. Batches can be nested; the outermost one does the work.
+        """
+        if self._batch_depth == 0:
+            self._batch_enabled_rcns = None
+            self._batch_diff = RulesEnabledDiff([], set())
+            self._batch_grammars_to_load = []
+        self._batch_depth += 1
+        try:
+            yield
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self._commit_batch()
+
+    def has_rule(self, class_name):
+        """
+        :param class_name: str
+        :return: boolean, whether a rule of that class name is registered (possibly lazily)
+        """
+        return class_name in self._managed_rules or class_name in self._lazy_rule_requests
+
+    def get_enabled_rcns_ordered(self):
+        """
+        :return: list of str, the class names of the enabled rules, in order
+        """
+        return self._config.get_enabled_rcns_ordered()
+
+    def change_rules_enabled(self, class_names, enabled):
+        """
+        :param class_names: list of str
+        :param enabled: boolean
+        """
+        with self.batch():
+            for class_name in class_names:
+                self._change_rule_enabled(class_name, enabled)
+
+    def _commit_batch(self):
+        enabled_diff = self._batch_diff
+        enabled_rcns = self._batch_enabled_rcns
+        grammars_to_load = self._batch_grammars_to_load
+        self._batch_diff = None
+        self._batch_enabled_rcns = None
+        self._batch_grammars_to_load = None
+
+        self._load_grammars(grammars_to_load)
+
+        if enabled_rcns is not None:
+            ko_diff = self._remerge_ccr_rules(enabled_rcns.to_list())
+            if len(ko_diff.newly_disabled) > 0:
+                ko_diff = self._handle_companion_rules(ko_diff)
+                GrammarManager._combine_diffs(enabled_diff, ko_diff)
+        self._rewrite_config_file(enabled_diff)
+
+    @staticmethod
+    def _combine_diffs(diff, later_diff):
+        """
+        Adds a later diff to a diff: whichever happened last to a rule wins.
+
+        :param diff: RulesEnabledDiff, changed in place
+        :param later_diff: RulesEnabledDiff
+        """
+        for rcn in later_diff.newly_enabled:
+            diff.newly_disabled.discard(rcn)
+            if rcn not in diff.newly_enabled:
+                diff.newly_enabled.append(rcn)
+        for rcn in later_diff.newly_disabled:
+            if rcn in diff.newly_enabled:
+                diff.newly_enabled.remove(rcn)
+            diff.newly_disabled.add(rcn)
+
     def _change_rule_enabled(self, class_name, enabled, tail=True):
         """
         This is called by the GrammarActivator. The necessity of this function
@@ -143,7 +310,16 @@ class GrammarManager(object):
         :param tail: (boolean) whether this is the tail call, since this fn is recursive
         :return:
         """
-
+        if class_name in self._lazy_rule_requests:
+            # an unloaded rule isn't enabled, so there is nothing to disable
+            if not enabled:
+                return
+            if not self._load_lazy_rule(class_name):
+                printer.out("Could not load {}.".format(class_name))
+                return
+
+        if tail and self._activation_predictor is not None:
+            self._activation_predictor.record_activation(class_name, enabled)
         # load it
         enabled_diff = self._delegate_enable_rule(class_name, enabled)
         # run activation hooks
@@ -165,6 +341,9 @@ class GrammarManager(object):
         :param enabled_diff:
         :return:
         """
+        if self._batch_depth > 0:
+            GrammarManager._combine_diffs(self._batch_diff, enabled_diff)
+            return
         if len(enabled_diff.newly_enabled) + len(enabled_diff.newly_disabled) > 0:
             result = OrderedSet(self._config.get_enabled_rcns_ordered())
             result.remove_all(enabled_diff.newly_disabled)
@@ -181,7 +360,7 @@ class GrammarManager(object):
             rcn = difference[0]
             enabled = difference[1]
             for companion_rcn in self._companion_config.get_companions(rcn):
-                if companion_rcn in self._managed_rules:
+                if companion_rcn in self._managed_rules or self._load_lazy_rule(companion_rcn):
                     mr = self._managed_rules[companion_rcn]
                     is_ccr = mr.get_details().declared_ccrtype is not None
                     if is_ccr:
@@ -219,13 +398,31 @@ class GrammarManager(object):
             return self._enable_non_ccr_rule(managed_rule, enabled)
         else:
             rcn = managed_rule.get_rule_class_name()
-            enabled_rules = OrderedSet(self._config.get_enabled_rcns_ordered())
-            enabled_rules.update(rcn, enabled)
-            enabled_diff = self._remerge_ccr_rules(enabled_rules.to_list())
+            if self._batch_depth > 0:
+                # the remerge happens once, when the batch is committed
+                if self._batch_enabled_rcns is None:
+                    self._batch_enabled_rcns = OrderedSet(self._config.get_enabled_rcns_ordered())
+                self._batch_enabled_rcns.update(rcn, enabled)
+                enabled_diff = RulesEnabledDiff([], set())
+            else:
+                enabled_rules = OrderedSet(self._config.get_enabled_rcns_ordered())
+                enabled_rules.update(rcn, enabled)
+                enabled_diff = self._remerge_ccr_rules(enabled_rules.to_list())
             place = enabled_diff.newly_enabled.append if enabled else enabled_diff.newly_disabled.add
             place(rcn)
             return enabled_diff
 
+    def _reload_self_modifying_rule(self, class_name):
+        """
+        Selfmod rules change without their files changing, so anything
+        built from the old copy of the rule has to be marked stale first.
+
+        :param class_name: str
+        :return: RulesEnabledDiff
+        """
+        self._managed_rules[class_name].invalidate()
+        return self._delegate_enable_rule(class_name, True)
+
     def _remerge_ccr_rules(self, enabled_rcns):
         """
         :return: RulesEnabledDiff
@@ -234,32 +431,117 @@ class GrammarManager(object):
         self._ccr_toggle.set_active(True)
 
         # handle CCR: get all active ccr rules after de/activating one
-        loaded_enabled_rcns = set(self._managed_rules.keys())
-        active_rule_class_names = [rcn for rcn in enabled_rcns if rcn in loaded_enabled_rcns]
-        active_mrs = [self._managed_rules[rcn] for rcn in active_rule_class_names]
-        active_ccr_mrs = [mr for mr in active_mrs if mr.get_details().declared_ccrtype is not None]
+        active_ccr_mrs = self._get_active_ccr_managed_rules(enabled_rcns)
 
         '''
         The merge may result in 1 to n+1 rules where n is the number of ccr app rules
         which are in the active rules list.
         For instance, if you have 1 app rule, you'll end up with two ccr rules. This is because
         the merger has to make the global one, plus an app rule with the app stuff plus all the
-        global stuff.
+        global stuff. (With the shared layout, the app rule only references the global stuff, and
+        all of the rules go into one grammar.)
         '''
         sorter = ConfigBasedRuleSetSorter(enabled_rcns)
+        if self._merge_scheduler is not None:
+            # rules KO'd by the merge are handled when it's applied: see _apply_background_merge
+            self._merge_scheduler.submit(active_ccr_mrs, sorter)
+            return RulesEnabledDiff([], set())
         merge_result = self._merger.merge_rules(active_ccr_mrs, sorter)
+        self._load_merge_result(merge_result)
+
+        return merge_result.rules_enabled_diff
+
+    def _get_active_ccr_managed_rules(self, enabled_rcns):
+        """
+        :param enabled_rcns: list of rule class names, in order
+        :return: list of ManagedRule for the loaded ccr rules among them, in the same order
+        """
+        active_mrs = [self._managed_rules[rcn] for rcn in enabled_rcns if rcn in self._managed_rules]
+        return [mr for mr in active_mrs if mr.get_details().declared_ccrtype is not None]
+
+    def set_foreground_executable(self, executable):
+        """
+        Called after each utterance, with the foreground window from when it
+        started: a new foreground window changes which rules are likely to be
+        enabled next.
+
+        :param executable: str or None
+        """
+        if self._activation_predictor is None:
+            return
+        if self._activation_predictor.set_foreground(executable):
+            self._prefetch_predicted_merges()
+
+    def _prefetch_predicted_merges(self):
+        """
+        Merges the ccr rule sets which would result from enabling the predicted
+        rules in the background, so that enabling one of them is a cache hit.
+        """
+        if self._activation_predictor is None or not self._ccr_toggle.is_active():
+            return
+        enabled_rcns = self._config.get_enabled_rcns_ordered()
+        ccr_rcns = [rcn for rcn, mr in self._managed_rules.items() if mr.get_details().declared_ccrtype is not None]
+        merges = []
+        for rcn in self._activation_predictor.predict(enabled_rcns, ccr_rcns):
+            predicted_rcns = OrderedSet(enabled_rcns)
+            predicted_rcns.add(rcn)
+            predicted_rcns = predicted_rcns.to_list()
+            merges.append((self._get_active_ccr_managed_rules(predicted_rcns),
+                           ConfigBasedRuleSetSorter(predicted_rcns)))
+        self._merge_scheduler.prefetch(merges)
+
+    def _load_merge_result(self, merge_result):
+        """
+        Swaps the old ccr grammars for the merged ones.
+
+        :param merge_result: MergeResult
+        """
+        with merge_result.stats.time_stage("grammar_load"):
+            grammars = GrammarManager._create_ccr_grammars(merge_result)
+            for grammar in self._grammars_container.set_ccr(grammars):
+                grammar.load()
+        if self._commands_index is not None:
+            self._commands_index.set_ccr_rules(merge_result.indexed_rules)
+        self._hooks_runner.execute(MergeCompletedEvent(merge_result.stats))
+
+    def _apply_background_merge(self, merge_result):
+        """
+        Called by the MergeScheduler, on the engine thread, once a background merge is done.
+
+        :param merge_result: MergeResult
+        """
+        if not self._ccr_toggle.is_active():
+            return
+        self._load_merge_result(merge_result)
+        enabled_diff = merge_result.rules_enabled_diff
+        if len(enabled_diff.newly_enabled) + len(enabled_diff.newly_disabled) > 0:
+            enabled_diff = self._handle_companion_rules(enabled_diff)
+            self._rewrite_config_file(enabled_diff)
+        self._prefetch_predicted_merges()
+
+    @staticmethod
+    def _create_ccr_grammars(merge_result):
+        """
+        :param merge_result: MergeResult
+        :return: list of Grammar
+        """
+        # rules moved out of ccr by the complexity budget are loaded alongside the ccr rules
+        rules_and_contexts = merge_result.ccr_rules_and_contexts + merge_result.standalone_rules_and_contexts
+        if merge_result.single_grammar:
+            if len(rules_and_contexts) == 0:
+                return []
+            # the rules carry their own contexts
+            grammar = Grammar(name="ccr-" + GrammarManager._get_next_id())
+            for rule, _ in rules_and_contexts:
+                grammar.add_rule(rule)
+            return [grammar]
+
         grammars = []
-        for rule_and_context in merge_result.ccr_rules_and_contexts:
-            rule = rule_and_context[0]
-            context = rule_and_context[1]
+        for rule, context in rules_and_contexts:
             grammar = Grammar(name="ccr-" + GrammarManager._get_next_id(), context=context)
             grammar.add_rule(rule)
             grammars.append(grammar)
-        self._grammars_container.set_ccr(grammars)
-        for grammar in grammars:
-            grammar.load()
-
-        return merge_result.rules_enabled_diff
+        return grammars
 
     def _enable_non_ccr_rule(self, managed_rule, enabled):
         """
@@ -270,13 +552,45 @@ class GrammarManager(object):
         rcn = managed_rule.get_rule_class_name()
         if enabled:
             grammar = self._mapping_rule_maker.create_non_ccr_grammar(managed_rule)
-            self._grammars_container.set_non_ccr(rcn, grammar)
-            grammar.load()
+            # a packed grammar container takes the rule out of its grammar
+            rule = grammar.rules[0]
+            self._load_grammars(self._grammars_container.set_non_ccr(rcn, grammar))
+            self._index_non_ccr_rule(managed_rule, rule)
             return RulesEnabledDiff([rcn], frozenset())
         else:
-            self._grammars_container.set_non_ccr(rcn, None)
+            self._load_grammars(self._grammars_container.set_non_ccr(rcn, None))
+            self._index_non_ccr_rule(managed_rule, None)
             return RulesEnabledDiff(frozenset(), [rcn])
 
+    def _index_non_ccr_rule(self, managed_rule, rule):
+        """
+        :param managed_rule: ManagedRule
+        :param rule: the enabled rule instance, or None if the rule was disabled
+        """
+        if self._commands_index is None:
+            return
+        if rule is not None and not isinstance(rule, MappingRule):
+            rule = None
+        context_name = AvailableCommandsIndex.get_context_name(managed_rule.get_details())
+        self._commands_index.set_non_ccr_rule(managed_rule.get_rule_class_name(), rule, context_name)
+
+    def _load_grammars(self, grammars):
+        """
+        Loads grammars, or in a batch, waits with loading them until the batch is done,
+        since packed grammars may be changed several times per batch.
+
+        :param grammars: list of Grammar
+        """
+        if self._batch_depth > 0:
+            for grammar in grammars:
+                if not any(grammar is pending for pending in self._batch_grammars_to_load):
+                    self._batch_grammars_to_load.append(grammar)
+            return
+        for grammar in grammars:
+            # a grammar may have been emptied by a later change in the batch
+            if not grammar.loaded and len(grammar.rules) > 0:
+                grammar.load()
+
     def receive(self, file_path_changed):
         """
         This being called indicates that the file at file_path_changed has been updated
@@ -296,40 +610,102 @@ class GrammarManager(object):
         if class_name in self._config.get_enabled_rcns_ordered():
             self._delegate_enable_rule(class_name, True)
 
-    def _get_invalidation(self, rule_class, details):
+    def _validate(self, rule_class, details):
         """
-        Attempts to find a reason to invalidate the rule. Return reason if can find one.
+        Validates a rule, reusing the outcome from the validation pool or the validation cache.
+        Rules cached as valid are still instantiated here, since instantiation can fail for
+        reasons outside of the rule's file (eg. a missing module or a corrupt selfmod config).
+
         :param rule_class:
-        :param details: RuleDetails
-        :return:
+        :param details:
+        :return: (ManagedRule, reason to invalidate the rule or None)
         """
+        managed_rule, async_result = ManagedRule(rule_class, details), None
+        pending = self._pending_validations.pop(rule_class.__name__, None)
+        if pending is not None and pending[0].get_rule_class() is rule_class:
+            managed_rule, async_result = pending
 
-        class_name = rule_class.__name__
+        if async_result is not None:
+            invalidation, cacheable = async_result.get()
+        else:
+            entry = self._get_cached_validation(managed_rule)
+            if entry is not None:
+                if entry["invalidation"] is not None:
+                    return managed_rule, entry["invalidation"]
+                return managed_rule, self._get_instantiation_invalidation(managed_rule)
+            invalidation, cacheable = self._get_invalidation(managed_rule)
+
+        file_hash = managed_rule.get_file_hash()
+        if cacheable and self._validation_cache is not None and file_hash is not None:
+            self._validation_cache.put(managed_rule.get_rule_class_name(), file_hash, invalidation)
+            if self._initial_activations_complete:
+                self._validation_cache.save()
+        return managed_rule, invalidation
+
+    def _get_cached_validation(self, managed_rule):
+        """
+        :param managed_rule: ManagedRule
+        :return: ValidationCache entry, or None
+        """
+        if self._validation_cache is None:
+            return None
+        file_hash = managed_rule.get_file_hash()
+        if file_hash is None:
+            return None
+        return self._validation_cache.get(managed_rule.get_rule_class_name(), file_hash)
+
+    def _get_invalidation(self, managed_rule):
+        """
+        Attempts to find a reason to invalidate the rule. Return reason if can find one.
+        The rule is instantiated through the managed rule, so the instance made here
+        becomes its prototype.
+
+        :param managed_rule: ManagedRule
+        :return: (reason or None, whether the outcome only depends on the rule's file);
+            instantiation errors may be down to the environment, so they aren't cached
+        """
+
+        class_name = managed_rule.get_rule_class_name()
+        details = managed_rule.get_details()
 
         '''validate details configuration before anything else'''
         details_invalidation = self._details_validator.validate_details(details)
         if details_invalidation is not None:
-            return "{} rejected due to detail validation errors: {}".format(class_name, details_invalidation)
+            return "{} rejected due to detail validation errors: {}".format(class_name, details_invalidation), True
 
         '''attempt to instantiate the rule'''
-        test_instance = None
-        try:
-            test_instance = rule_class()
-        except:  # ignore warnings on this line-- it's supposed to be broad
-            traceback.print_exc()
-            return "{} rejected due to instantiation errors".format(class_name)
+        instantiation_invalidation = self._get_instantiation_invalidation(managed_rule)
+        if instantiation_invalidation is not None:
+            return instantiation_invalidation, False
+        test_instance = managed_rule.get_rule_instance()
 
         '''if ccr, validate the rule'''
         if details.declared_ccrtype is not None:
             error = self._ccr_rules_validator.validate_rule(test_instance, details.declared_ccrtype)
             if error is not None:
-                return "{} rejected due to rule validation errors: {}".format(class_name, error)
+                return "{} rejected due to rule validation errors: {}".format(class_name, error), True
 
         '''do combo validations'''
         combo_invalidation = self._combo_validator.validate(test_instance, details)
         if combo_invalidation is not None:
-            return "{} rejected due to rule/details combination errors: {}".format(class_name, combo_invalidation)
+            return "{} rejected due to rule/details combination errors: {}".format(class_name, combo_invalidation), True
+
+        return None, True
 
+    @staticmethod
+    def _get_instantiation_invalidation(managed_rule):
+        """
+        Instantiates the rule through the managed rule, so that the instance becomes
+        its prototype and later uses of the rule (eg. its "enable X" trigger) can't fail.
+
+        :param managed_rule: ManagedRule
+        :return: reason to invalidate the rule or None
+        """
+        try:
+            managed_rule.get_rule_instance()
+        except:  # ignore warnings on this line-- it's supposed to be broad
+            traceback.print_exc()
+            return "{} rejected due to instantiation errors".format(managed_rule.get_rule_class_name())
         return None
 
     def load_activation_grammars(self):
@@ -341,17 +717,21 @@ class GrammarManager(object):
         rules = [self._activator.construct_activation_rule(),
                  self._hooks_runner.construct_activation_rule(),
                  self._transformers_runner.construct_activation_rule()]
-        rules = [rule for rule in rules if len(rule[0].mapping) > 0]  # there might not be *any* transformers/hooks
+        rules = [rule for rule in rules if rule is not None]  # there might not be *any* transformers/hooks
         if hasattr(self._reload_observable, "get_loadable"):
             rules.append(self._reload_observable.get_loadable())
 
-        for rc, d in rules:
-            self.register_rule(rc, d)
-            self._change_rule_enabled(rc.__name__, True)
+        with self.batch():
+            for rc, d in rules:
+                # the activation rules themselves can't be de/activated by voice
+                self._register_rule(rc, d, activatable=False)
+                self._change_rule_enabled(rc.__name__, True)
 
     def set_ccr_active(self, active):
         self._ccr_toggle.set_active(active)
         if not self._ccr_toggle.is_active():
+            if self._merge_scheduler is not None:
+                self._merge_scheduler.cancel()
             self._grammars_container.wipe_ccr()
         else:
             self._change_rule_enabled("Numbers", True)
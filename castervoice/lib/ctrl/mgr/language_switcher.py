@@ -0,0 +1,86 @@
+import os
+import time
+
+from dragonfly import get_engine
+
+
+class LanguageSwitcher(object):
+    """
+    Keeps only the CCR language rule for the file being edited enabled, going
+    by the extension of the file name in the foreground window's title.
+
+    The title is polled by an engine timer. A new language is only switched to
+    once its file has stayed in the foreground for the debounce time, so that
+    alt-tabbing through windows doesn't cause a remerge per window. Titles without
+    a known file extension leave the enabled language as it is.
+
+    Switching back to a language which was used recently is a merge result cache
+    hit, since the rest of the enabled rules are usually the same.
+    """
+
+    def __init__(self, grammar_manager, extensions_to_rcns, debounce_seconds=1.0,
+                 title_info_fn=None, time_fn=None):
+        """
+        :param grammar_manager: GrammarManager
+        :param extensions_to_rcns: map of {file extension without the dot: language rule class name}
+        :param debounce_seconds: number, how long a file has to stay in the foreground
+        :param title_info_fn: fn() -> [filename, path folders, title], defaults to utilities.get_window_title_info
+        :param time_fn: fn() -> seconds, defaults to time.time
+        """
+        self._grammar_manager = grammar_manager
+        self._extensions_to_rcns = dict((extension.lower(), rcn) for extension, rcn in extensions_to_rcns.items())
+        self._language_rcns = set(self._extensions_to_rcns.values())
+        self._debounce_seconds = debounce_seconds
+        self._title_info_fn = title_info_fn if title_info_fn is not None else LanguageSwitcher._get_window_title_info
+        self._time_fn = time_fn if time_fn is not None else time.time
+        # (rcn, when it was first seen in the foreground)
+        self._candidate = None
+
+    def start(self, poll_seconds):
+        get_engine().create_timer(lambda: self.update(), poll_seconds)
+
+    def update(self):
+        """
+        Called by the timer, on the engine thread.
+
+        :return: boolean, whether the enabled language was switched
+        """
+        rcn = self.get_language_rcn(self._title_info_fn()[0])
+        if rcn is None:
+            self._candidate = None
+            return False
+        if self._candidate is None or self._candidate[0] != rcn:
+            self._candidate = (rcn, self._time_fn())
+        if self._time_fn() - self._candidate[1] < self._debounce_seconds:
+            return False
+        return self._switch_to(rcn)
+
+    def get_language_rcn(self, filename):
+        """
+        :param filename: str or None
+        :return: the rule class name of the (loaded) language rule for the file, or None
+        """
+        if filename is None:
+            return None
+        extension = os.path.splitext(filename)[1][1:].lower()
+        rcn = self._extensions_to_rcns.get(extension)
+        if rcn is None or not self._grammar_manager.has_rule(rcn):
+            return None
+        return rcn
+
+    def _switch_to(self, rcn):
+        enabled_rcns = self._grammar_manager.get_enabled_rcns_ordered()
+        other_language_rcns = [other_rcn for other_rcn in enabled_rcns
+                               if other_rcn in self._language_rcns and other_rcn != rcn]
+        if rcn in enabled_rcns and len(other_language_rcns) == 0:
+            return False
+        with self._grammar_manager.batch():
+            self._grammar_manager.change_rules_enabled(other_language_rcns, False)
+            if rcn not in enabled_rcns:
+                self._grammar_manager.change_rules_enabled([rcn], True)
+        return True
+
+    @staticmethod
+    def _get_window_title_info():
+        from castervoice.lib import utilities
+        return utilities.get_window_title_info()
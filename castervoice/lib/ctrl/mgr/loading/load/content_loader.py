@@ -18,10 +18,24 @@ class ContentLoader(object):
     Pass result off to GrammarManager.
     """
 
-    def __init__(self, content_request_generator):
+    def __init__(self, content_request_generator, lazy_rules=False, module_finder=None):
+        """
+        :param content_request_generator: ContentRequestGenerator
+        :param lazy_rules: if True, rules which aren't enabled aren't imported by load_everything;
+            their requests are returned instead, to be imported with load_request when they're enabled
+        :param module_finder: an installed ContentModuleFinder to import content modules with,
+            or None to add the content directories to sys.path instead
+        """
         self._content_request_generator = content_request_generator
+        self._lazy_rules = lazy_rules
+        self._module_finder = module_finder
 
-    def load_everything(self, rules_config):
+    def load_everything(self, rules_config, rule_loaded_fn=None):
+        """
+        :param rules_config: RulesConfig
+        :param rule_loaded_fn: fn((rule class, details)), called as soon as each rule is imported, or None
+        :return: FullContentSet
+        """
         # Generate all requests for both starter and user locations
         base_path = settings.SETTINGS["paths"]["BASE_PATH"]
         user_dir = settings.SETTINGS["paths"]["USER_DIR"]
@@ -31,22 +45,32 @@ class ContentLoader(object):
         user_content_requests = self._content_request_generator.get_all_content_modules(user_dir)
 
         # user content should trump starter content
+        # (starter rules try to import user copies of their support packages from here first)
         path.append(user_rules_dir)
         requests = {}
         for item in starter_content_requests:
             requests[item.module_name] = item
         for item in user_content_requests:
             requests[item.module_name] = item
+        if self._module_finder is not None:
+            user_module_names = set(item.module_name for item in user_content_requests)
+            self._register_content(sorted(requests.values(), key=lambda item: item.module_name in user_module_names))
 
         # categorize requests
         rule_requests = []
+        lazy_rule_requests = []
         transformer_requests = []
         hook_requests = []
+        enabled_rcns = set(rules_config.get_enabled_rcns_ordered())
         for module_name in requests:
             request = requests[module_name]
             if request.content_type == ContentType.GET_RULE and \
                     rules_config.load_is_allowed(request.content_class_name):
-                rule_requests.append(request)
+                if self._lazy_rules and request.trigger is not None \
+                        and request.content_class_name not in enabled_rcns:
+                    lazy_rule_requests.append(request)
+                else:
+                    rule_requests.append(request)
             elif request.content_type == ContentType.GET_TRANSFORMER and \
                     request.module_name == "text_replacer":
                 transformer_requests.append(request)
@@ -54,11 +78,21 @@ class ContentLoader(object):
                 hook_requests.append(request)
 
         # attempt to load all content
-        rules = self._process_requests(rule_requests)
+        rules = self._process_requests(rule_requests, rule_loaded_fn)
         transformers = self._process_requests(transformer_requests)
         hooks = self._process_requests(hook_requests)
 
-        return FullContentSet(rules, transformers, hooks)
+        return FullContentSet(rules, transformers, hooks, lazy_rule_requests)
+
+    def load_request(self, request):
+        """
+        Imports the content of a request which load_everything didn't.
+
+        :param request: ContentRequest
+        :return: the content, or None if it couldn't be loaded
+        """
+        results = self._process_requests([request])
+        return results[0] if len(results) > 0 else None
 
     def idem_import_module(self, module_name, fn_name):
         """
@@ -67,9 +101,16 @@ class ContentLoader(object):
         module = None
         if module_name in _MODULES:
             module = _MODULES[module_name]
+            if self._is_other_module(module_name, module):
+                msg = "{} module name is already in use: {}".format(module_name, module.__file__)
+                printer.out(msg)
+                return None
             module = self._reimport_module(module)
         else:
             module = self._import_module(module_name)
+            # the module finder has reported the installed module which was imported instead
+            if module is not None and self._is_other_module(module_name, module):
+                return None
 
         if module is None:
             return None
@@ -97,15 +138,49 @@ class ContentLoader(object):
         not_user = ".caster" not in module.__file__
         return not_starter and not_user
 
-    def _process_requests(self, requests):
+    def _is_other_module(self, module_name, module):
+        """
+        :return: boolean, whether an imported module isn't the content module of that name,
+            which can only be told with a module finder
+        """
+        if self._module_finder is None:
+            return False
+        content_path = self._module_finder.get_module_path(module_name)
+        module_path = getattr(module, "__file__", None)
+        if content_path is None or module_path is None:
+            return False
+        return os.path.splitext(os.path.abspath(module_path))[0] != os.path.splitext(os.path.abspath(content_path))[0]
+
+    def _register_content(self, requests):
+        """
+        Registers the content modules with the module finder, and the helper modules
+        next to them, which content modules import by name.
+
+        :param requests: list of ContentRequest, those which should win name clashes last
+        """
+        directories = []
+        for request in requests:
+            if request.directory not in directories:
+                directories.append(request.directory)
+        for directory in directories:
+            self._module_finder.register_directory(directory)
+        # a helper module never replaces a content module
+        for request in requests:
+            self._module_finder.register(request.module_name, request.directory)
+
+    def _process_requests(self, requests, loaded_fn=None):
         result = []
 
         for request in requests:
-            if request.directory not in path:
+            if self._module_finder is not None:
+                self._module_finder.register(request.module_name, request.directory)
+            elif request.directory not in path:
                 path.append(request.directory)
             content_item = self.idem_import_module(request.module_name, request.content_type)
             if content_item is not None:
                 result.append(content_item)
+                if loaded_fn is not None:
+                    loaded_fn(content_item)
 
         return result
 
@@ -0,0 +1,93 @@
+import os
+
+from castervoice.lib import utilities
+
+
+class ContentManifest(object):
+    """
+    Remembers what the ContentRequestGenerator found in each file across
+    restarts, so that only new or changed files have to be read and scanned.
+
+    Entries are keyed by file path, and are only used while the file's
+    modification time and size are unchanged. Entries for files which
+    have disappeared are dropped the next time their directory is scanned.
+    The manifest is saved to a json file.
+    """
+
+    _VERSION = 2
+
+    def __init__(self, path):
+        """
+        :param path: str, path of the json file
+        """
+        self._path = path
+        # {file path: {"mtime": float, "size": int,
+        #              "content_type": str or None, "content_class_name": str or None, "trigger": str or None}}
+        self._entries = None
+        self._changed = False
+
+    @staticmethod
+    def get_file_stamp(file_path):
+        """
+        :param file_path: str
+        :return: (mtime, size) of the file
+        """
+        stat = os.stat(file_path)
+        return stat.st_mtime, stat.st_size
+
+    def get(self, file_path, stamp):
+        """
+        :param file_path: str
+        :param stamp: (mtime, size), see get_file_stamp
+        :return: dict entry, or None if the file is unknown or changed
+        """
+        self._load()
+        entry = self._entries.get(file_path)
+        if entry is None or (entry["mtime"], entry["size"]) != tuple(stamp):
+            return None
+        return entry
+
+    def put(self, file_path, stamp, content_type, content_class_name, trigger=None):
+        """
+        :param file_path: str
+        :param stamp: (mtime, size), see get_file_stamp
+        :param content_type: ContentType or None
+        :param content_class_name: str or None
+        :param trigger: str or None, what a rule is called in "enable X"
+        """
+        self._load()
+        self._entries[file_path] = {"mtime": stamp[0],
+                                    "size": stamp[1],
+                                    "content_type": content_type,
+                                    "content_class_name": content_class_name,
+                                    "trigger": trigger}
+        self._changed = True
+
+    def retain(self, directory, file_paths):
+        """
+        Drops the entries for files in the directory which aren't in file_paths.
+
+        :param directory: str, a scanned directory
+        :param file_paths: set of str, the files found in it
+        """
+        self._load()
+        prefix = directory.rstrip("/\\") + os.sep
+        for file_path in list(self._entries):
+            if file_path.startswith(prefix) and file_path not in file_paths:
+                del self._entries[file_path]
+                self._changed = True
+
+    def save(self):
+        if not self._changed:
+            return
+        utilities.save_json_file({"version": ContentManifest._VERSION, "files": self._entries}, self._path)
+        self._changed = False
+
+    def _load(self):
+        if self._entries is not None:
+            return
+        data = utilities.load_json_file(self._path)
+        if data.get("version") == ContentManifest._VERSION:
+            self._entries = data.get("files", {})
+        else:
+            self._entries = {}
@@ -0,0 +1,140 @@
+import os
+import sys
+
+from castervoice.lib import printer
+
+
+class ContentModuleFinder(object):
+    """
+    An import hook (sys.meta_path finder and loader) for Caster content modules.
+
+    Content modules are imported by their bare module names, from the rule,
+    transformer and hook directories. Instead of putting each of those
+    directories on sys.path, which every other import would then have to
+    search too, the finder maps module names to the files they were found in.
+    Imports of any other name are passed on with a single dict lookup.
+
+    Registering a module name again replaces its file, so user content
+    registered after starter content overrides it.
+
+    A registered name which can also be imported from sys.path is left to
+    the installed module, as it was when content directories were appended
+    to sys.path: the collision is reported instead.
+    """
+
+    def __init__(self):
+        # {module name: file path}
+        self._module_paths = {}
+        # {module name: file path of the installed module of that name, or None}
+        self._installed_paths = {}
+
+    def install(self):
+        """
+        Puts the finder in front of the standard import machinery, so that
+        content module names don't have to be looked for on sys.path first.
+        """
+        if self not in sys.meta_path:
+            sys.meta_path.insert(0, self)
+
+    def uninstall(self):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def register(self, module_name, directory):
+        """
+        :param module_name: str
+        :param directory: str, the directory containing module_name.py
+        """
+        self._module_paths[module_name] = os.path.join(directory, module_name + ".py")
+        self._installed_paths.pop(module_name, None)
+
+    def register_directory(self, directory):
+        """
+        Registers every module in a directory, so that content modules there
+        can import helper modules next to them by name. Packages aren't
+        registered: those are imported from sys.path.
+
+        :param directory: str
+        """
+        if not os.path.isdir(directory):
+            return
+        for filename in os.listdir(directory):
+            module_name, extension = os.path.splitext(filename)
+            if extension == ".py" and module_name != "__init__":
+                self.register(module_name, directory)
+
+    def get_module_path(self, module_name):
+        """
+        :param module_name: str
+        :return: str, the file of a registered module, or None
+        """
+        return self._module_paths.get(module_name)
+
+    def find_spec(self, fullname, path=None, target=None):
+        """Python 3 finder protocol."""
+        file_path = self._find(fullname, path)
+        if file_path is None:
+            return None
+        from importlib.util import spec_from_file_location
+        return spec_from_file_location(fullname, file_path)
+
+    def find_module(self, fullname, path=None):
+        """Python 2 finder protocol."""
+        if self._find(fullname, path) is None:
+            return None
+        return self
+
+    def load_module(self, fullname):
+        """
+        Python 2 loader protocol. Re-executes the module in place if it's
+        already in sys.modules, which is what reload() expects.
+        """
+        import imp
+        file_path = self._module_paths[fullname]
+        with open(file_path, "U") as module_file:
+            return imp.load_module(fullname, module_file, file_path, (".py", "U", imp.PY_SOURCE))
+
+    def _find(self, fullname, path):
+        # content modules are always top level
+        if path is not None or fullname not in self._module_paths:
+            return None
+        module_path = self._module_paths[fullname]
+        if fullname not in self._installed_paths:
+            installed_path = ContentModuleFinder._find_installed(fullname)
+            # eg. modules in the user rules directory, which is on sys.path
+            if installed_path is not None and ContentModuleFinder._is_same_file(installed_path, module_path):
+                installed_path = None
+            self._installed_paths[fullname] = installed_path
+            if installed_path is not None:
+                printer.out("{} module name is already in use: {}".format(fullname, installed_path))
+        if self._installed_paths[fullname] is not None:
+            return None
+        return module_path
+
+    @staticmethod
+    def _is_same_file(path, other_path):
+        return os.path.splitext(os.path.abspath(path))[0] == os.path.splitext(os.path.abspath(other_path))[0]
+
+    @staticmethod
+    def _find_installed(fullname):
+        """
+        :param fullname: str, a top level module name
+        :return: str, where the module of that name would be imported from without this finder, or None
+        """
+        if fullname in sys.builtin_module_names:
+            return "built-in"
+        try:
+            from importlib.machinery import PathFinder
+        except ImportError:  # Python 2
+            import imp
+            try:
+                module_file, pathname, description = imp.find_module(fullname)
+            except ImportError:
+                return None
+            if module_file is not None:
+                module_file.close()
+            return pathname
+        spec = PathFinder.find_spec(fullname)
+        if spec is None:
+            return None
+        return spec.origin or fullname
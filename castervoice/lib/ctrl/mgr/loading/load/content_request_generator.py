@@ -1,6 +1,7 @@
 import re
 import os
 
+from castervoice.lib.ctrl.mgr.loading.load.content_manifest import ContentManifest
 from castervoice.lib.ctrl.mgr.loading.load.content_request import ContentRequest
 from castervoice.lib.ctrl.mgr.loading.load.content_type import ContentType
 
@@ -10,21 +11,60 @@ class ContentRequestGenerator(object):
     Generates a set of requests from a path.
     """
 
+    _CLASS_PATTERN = re.compile(r"^class\s+(\w+)\s*\((.*)\)")
+    _PRONUNCIATION_PATTERN = re.compile(r"^\s+pronunciation\s*=\s*[\"'](.+?)[\"']")
+    _DETAILS_NAME_PATTERN = re.compile(r"RuleDetails\(\s*[\"'](.+?)[\"']|(?<!\w)name\s*=\s*[\"'](.+?)[\"']")
+
+    def __init__(self, manifest=None):
+        """
+        :param manifest: ContentManifest, to only scan files which are new or changed, or None to scan all
+        """
+        self._manifest = manifest
+
     def get_all_content_modules(self, directory):
         relevant_modules = []
+        file_paths = set()
         for dirpath, dirnames, filenames in self._walk(directory):
             for filename in filenames:
                 file_path = dirpath + os.sep + filename
-                content_type, content_class_name = self._scan_file(file_path)
+                file_paths.add(file_path)
+                content_type, content_class_name, trigger = self._get_file_content(file_path)
                 if content_type is not None:
                     module_name = filename[:-3]
                     request = ContentRequest(content_type,
                                              dirpath,
                                              module_name,
-                                             content_class_name)
+                                             content_class_name,
+                                             trigger)
                     relevant_modules.append(request)
+        if self._manifest is not None:
+            self._manifest.retain(directory, file_paths)
+            self._manifest.save()
         return relevant_modules
 
+    def _get_file_content(self, file_path):
+        """
+        :param file_path: str
+        :return: tuple of (content type, content class name, trigger), see _scan_file
+        """
+        if self._manifest is None or not ContentRequestGenerator._is_scannable(file_path):
+            return self._scan_file(file_path)
+        stamp = self._get_file_stamp(file_path)
+        entry = self._manifest.get(file_path, stamp)
+        if entry is not None:
+            return entry["content_type"], entry["content_class_name"], entry["trigger"]
+        content_type, content_class_name, trigger = self._scan_file(file_path)
+        self._manifest.put(file_path, stamp, content_type, content_class_name, trigger)
+        return content_type, content_class_name, trigger
+
+    def _get_file_stamp(self, file_path):
+        """File i/o broken out for testability"""
+        return ContentManifest.get_file_stamp(file_path)
+
+    @staticmethod
+    def _is_scannable(file_path):
+        return file_path.endswith(".py") and not file_path.endswith("__init__.py")
+
     def _walk(self, directory):
         """File i/o broken out for testability"""
         return os.walk(directory)
@@ -40,13 +80,15 @@ class ContentRequestGenerator(object):
         """
         Reads the whole file, classifies it as rule, transformer, hook, or none.
         Also finds a list of potential names for the loadable content class.
+
+        For rules, also guesses what the rule will be called in "enable X" /
+        "disable X" before it's imported: the RuleDetails name for plain MappingRules,
+        else the class's pronunciation if it sets one, else the class name.
         :param file_path: str
-        :return: str
+        :return: tuple of (content type, content class name, trigger), all None for non-content files
         """
-        if not file_path.endswith(".py"):
-            return None, None
-        if file_path.endswith("__init__.py"):
-            return None, None
+        if not ContentRequestGenerator._is_scannable(file_path):
+            return None, None, None
 
         content = self._get_file_lines(file_path)
 
@@ -56,6 +98,10 @@ class ContentRequestGenerator(object):
 
         content_type = None
         content_class_name = None
+        # {class name: (base classes, pronunciation)}
+        classes = {}
+        class_name = None
+        details_name = None
         for line in content:
             if line.strip().startswith("#") or line.isspace():
                 continue
@@ -71,11 +117,28 @@ class ContentRequestGenerator(object):
                 elif hook_func in line:
                     content_type = ContentType.GET_HOOK
                     break
+                class_match = ContentRequestGenerator._CLASS_PATTERN.match(line)
+                if class_match is not None:
+                    class_name = class_match.group(1)
+                    classes[class_name] = (class_match.group(2), None)
+                pronunciation_match = ContentRequestGenerator._PRONUNCIATION_PATTERN.match(line)
+                if pronunciation_match is not None and class_name is not None:
+                    classes[class_name] = (classes[class_name][0], pronunciation_match.group(1))
             else:
                 ccn = ContentRequestGenerator._extract_class_name(line)
                 if ccn is not None:
                     content_class_name = ccn
-        return content_type, content_class_name
+                details_match = ContentRequestGenerator._DETAILS_NAME_PATTERN.search(line)
+                if details_match is not None and details_name is None:
+                    details_name = details_match.group(1) or details_match.group(2)
+
+        trigger = None
+        if content_type == ContentType.GET_RULE and content_class_name is not None:
+            bases, pronunciation = classes.get(content_class_name, ("", None))
+            trigger = details_name if "MappingRule" in bases else pronunciation
+            if trigger is None:
+                trigger = content_class_name
+        return content_type, content_class_name, trigger
 
     @staticmethod
     def _extract_class_name(line):
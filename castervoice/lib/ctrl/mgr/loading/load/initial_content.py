@@ -2,7 +2,9 @@ class FullContentSet(object):
     """
     Initial content, loaded once when Caster starts.
     """
-    def __init__(self, rules, transformers, hooks):
+    def __init__(self, rules, transformers, hooks, lazy_rule_requests=None):
         self.rules = rules
         self.transformers = transformers
         self.hooks = hooks
+        # ContentRequests for rules which weren't imported yet
+        self.lazy_rule_requests = lazy_rule_requests if lazy_rule_requests is not None else []
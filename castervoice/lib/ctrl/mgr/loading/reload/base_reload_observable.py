@@ -1,7 +1,7 @@
-import hashlib
 import os
 
 from castervoice.lib import printer
+from castervoice.lib.util import file_hash
 
 
 class BaseReloadObservable(object):
@@ -56,8 +56,4 @@ class BaseReloadObservable(object):
         :param file_path:
         :return: hex string hash
         """
-        md5_hasher = hashlib.md5()
-        with open(file_path, 'rb') as module:
-            buf = module.read()
-            md5_hasher.update(buf)
-        return md5_hasher.hexdigest()
+        return file_hash.get_hash_of_file(file_path)
@@ -1,17 +1,78 @@
+import copy
+import threading
+
+from castervoice.lib.merge.selfmod.selfmodrule import BaseSelfModifyingRule
+from castervoice.lib.util import file_hash
+
+
 class ManagedRule(object):
 
     def __init__(self, rule_class, details):
         self._rule_class = rule_class
         self._details = details
+        self._file_hash = None
+        self._generation = 0
+        self._prototype = None
+        # merges and validation run on worker threads: guards _prototype and _generation
+        self._lock = threading.Lock()
 
     def get_rule_class_name(self):
         return self._rule_class.__name__
 
     def get_rule_instance(self):
-        return self._rule_class()
+        """
+        Instantiating a rule compiles all of its specs, so the rule class is only
+        instantiated once (until the rule is invalidated or its class is reloaded,
+        which makes a new ManagedRule). Callers get shallow copies of that prototype,
+        which share its specs, actions and extras but get their own configuration.
+
+        Selfmod rules keep their state on the instance their actions are bound to,
+        so they get the prototype itself.
+
+        :return: rule instance
+        """
+        with self._lock:
+            if self._prototype is None:
+                self._prototype = self._rule_class()
+            prototype = self._prototype
+        if isinstance(prototype, BaseSelfModifyingRule):
+            return prototype
+        return copy.copy(prototype)
 
     def get_rule_class(self):
         return self._rule_class
 
     def get_details(self):
         return self._details
+
+    def get_file_hash(self):
+        """
+        :return: str, the hash of the rule's file, or None if it couldn't be read
+        """
+        if self._file_hash is None:
+            try:
+                self._file_hash = file_hash.get_hash_of_file(self._details.get_filepath())
+            except (IOError, OSError):
+                return None
+        return self._file_hash
+
+    def get_fingerprint(self):
+        """
+        Identifies the content of the rule. Changes when the rule's file changes
+        or when the rule is invalidated.
+
+        :return: str
+        """
+        content_hash = self.get_file_hash() or str(id(self._rule_class))
+        with self._lock:
+            generation = self._generation
+        return "{}:{}:{}".format(self.get_rule_class_name(), content_hash, generation)
+
+    def invalidate(self):
+        """
+        Selfmod rules change without their files changing: this marks
+        anything previously built from this rule as stale.
+        """
+        with self._lock:
+            self._generation += 1
+            self._prototype = None
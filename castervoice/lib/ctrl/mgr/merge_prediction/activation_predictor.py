@@ -0,0 +1,69 @@
+import collections
+
+
+class ActivationPredictor(object):
+    """
+    Guesses which rules are likely to be enabled next, from the recent
+    activation history and the foreground window.
+
+    Every time a rule is enabled, the executable in the foreground and the
+    rule enabled before it are remembered. A rule which isn't enabled
+    scores for each time it was enabled before: more if that happened with
+    the same executable in the foreground (e.g. "enable python" while an
+    editor is focused), or right after the rule which was enabled last.
+    Recent activations count more than older ones.
+    """
+    FOCUS_WEIGHT = 2
+    SEQUENCE_WEIGHT = 2
+
+    def __init__(self, max_predictions=2, history_size=100):
+        """
+        :param max_predictions: int, the most rules to predict at once
+        :param history_size: int, how many activations to remember
+        """
+        self._max_predictions = max_predictions
+        # (executable or None, previously enabled rcn or None, rcn)
+        self._history = collections.deque(maxlen=history_size)
+        self._executable = None
+        self._last_enabled_rcn = None
+
+    def record_activation(self, rcn, enabled):
+        """
+        :param rcn: str, rule class name
+        :param enabled: boolean
+        """
+        if not enabled:
+            return
+        self._history.append((self._executable, self._last_enabled_rcn, rcn))
+        self._last_enabled_rcn = rcn
+
+    def set_foreground(self, executable):
+        """
+        :param executable: str or None
+        :return: boolean, whether the foreground executable changed
+        """
+        if executable == self._executable:
+            return False
+        self._executable = executable
+        return True
+
+    def predict(self, enabled_rcns, candidate_rcns):
+        """
+        :param enabled_rcns: iterable of rule class names which are enabled
+        :param candidate_rcns: iterable of rule class names which may be predicted
+        :return: list of rule class names which aren't enabled, most likely first
+        """
+        enabled_rcns = set(enabled_rcns)
+        candidate_rcns = set(candidate_rcns) - enabled_rcns
+        scores = {}
+        for age, (executable, previous_rcn, rcn) in enumerate(reversed(self._history)):
+            if rcn not in candidate_rcns:
+                continue
+            score = 1
+            if executable is not None and executable == self._executable:
+                score += ActivationPredictor.FOCUS_WEIGHT
+            if previous_rcn is not None and previous_rcn == self._last_enabled_rcn:
+                score += ActivationPredictor.SEQUENCE_WEIGHT
+            scores[rcn] = scores.get(rcn, 0) + float(score) / (age + 1)
+        ranked_rcns = sorted(scores, key=lambda rcn: (-scores[rcn], rcn))
+        return ranked_rcns[:self._max_predictions]
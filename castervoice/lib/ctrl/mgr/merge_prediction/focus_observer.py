@@ -0,0 +1,30 @@
+import os
+
+from dragonfly import RecognitionObserver, Window
+
+
+class FocusObserver(RecognitionObserver):
+    """
+    Reports the foreground executable from when the user started speaking,
+    which is when a window change can matter to which rules get enabled.
+    It's reported once the utterance has been decoded rather than as it
+    starts, so that anything done about it doesn't slow down recognition.
+    """
+
+    def __init__(self, focus_fn):
+        """
+        :param focus_fn: fn(executable name, lowercase and without a path)
+        """
+        RecognitionObserver.__init__(self)
+        self._focus_fn = focus_fn
+        self._executable = None
+
+    def on_begin(self):
+        executable = Window.get_foreground().executable
+        self._executable = os.path.basename(executable).lower() if executable else None
+
+    def on_recognition(self, words):
+        self._focus_fn(self._executable)
+
+    def on_failure(self):
+        self._focus_fn(self._executable)
@@ -0,0 +1,198 @@
+import threading
+import time
+import traceback
+
+from dragonfly import get_engine
+
+from castervoice.lib import printer
+
+
+class MergeScheduler(object):
+    """
+    Runs CCR merges on a worker thread so that the engine thread can keep
+    processing speech while rules are instantiated, transformed, checked
+    and merged.
+
+    Only the newest merge matters: a merge which is still waiting when a
+    newer one is submitted is never started, and the result of a merge
+    which was superseded while it ran is thrown away.
+
+    Finished merges are handed to the apply function on the engine thread,
+    by an engine timer which only runs while there's a merge in progress,
+    since grammars must only be swapped and loaded there.
+
+    While there's nothing else to do, the worker also runs prefetched
+    merges: merges of rule sets which are likely to be asked for next.
+    Their results are never applied; they only warm up the merger's caches.
+    Prefetched merges only start once no newer ones have been asked for for
+    a while, so that they don't compete with speech processing for the CPU
+    while the user is busy. A prefetched merge which has already started
+    delays a submitted merge.
+    """
+
+    def __init__(self, merger, poll_seconds=0.05, timer_factory=None, prefetch_delay_seconds=1.0):
+        """
+        :param merger: CCRMerger2
+        :param poll_seconds: number, how often to check for a finished merge
+        :param timer_factory: fn(callback, seconds) -> Timer, defaults to the engine's create_timer
+        :param prefetch_delay_seconds: number, how long prefetched merges wait before they start
+        """
+        self._merger = merger
+        self._poll_seconds = poll_seconds
+        self._prefetch_delay_seconds = prefetch_delay_seconds
+        self._timer_factory = timer_factory if timer_factory is not None \
+            else lambda callback, seconds: get_engine().create_timer(callback, seconds)
+        self._apply_fn = None
+        #
+        self._condition = threading.Condition()
+        self._generation = 0
+        # (generation, managed rules, rule sorter), waiting for the worker
+        self._pending = None
+        self._running_generation = None
+        # (generation, MergeResult), waiting for the engine thread
+        self._completed = None
+        # list of (managed rules, rule sorter), merged while nothing else is pending
+        self._prefetches = []
+        # time.time() after which the prefetched merges may start
+        self._prefetch_start_time = 0
+        self._worker = None
+        self._timer = None
+
+    def set_apply_fn(self, apply_fn):
+        """
+        :param apply_fn: fn(MergeResult), called on the engine thread
+        """
+        self._apply_fn = apply_fn
+
+    def submit(self, managed_rules, rule_sorter):
+        """
+        Starts a merge in the background, superseding any merge which hasn't been applied yet.
+        Must be called on the engine thread.
+
+        :param managed_rules: list of ManagedRule
+        :param rule_sorter: BaseRuleSetSorter impl
+        :return: int, the generation of the merge
+        """
+        with self._condition:
+            self._generation += 1
+            self._pending = (self._generation, list(managed_rules), rule_sorter)
+            # predictions were made for the rules from before this merge
+            self._prefetches = []
+            self._start_worker()
+            self._condition.notify_all()
+            generation = self._generation
+        if self._timer is None:
+            self._timer = self._timer_factory(self.apply_completed, self._poll_seconds)
+        return generation
+
+    def prefetch(self, merges):
+        """
+        Replaces the prefetched merges which haven't been started yet, and
+        restarts the wait before they start.
+
+        :param merges: list of (managed rules, rule sorter)
+        """
+        with self._condition:
+            self._prefetches = [(list(managed_rules), rule_sorter) for managed_rules, rule_sorter in merges]
+            self._prefetch_start_time = time.time() + self._prefetch_delay_seconds
+            if len(self._prefetches) > 0:
+                self._start_worker()
+                self._condition.notify_all()
+
+    def cancel(self):
+        """
+        Discards any merge which hasn't been applied yet.
+        """
+        with self._condition:
+            self._generation += 1
+            self._pending = None
+            self._completed = None
+            self._prefetches = []
+            self._condition.notify_all()
+
+    def is_idle(self):
+        with self._condition:
+            return self._pending is None and self._running_generation is None and self._completed is None
+
+    def apply_completed(self):
+        """
+        Applies the newest finished merge, if it is still current. Called by the
+        timer, on the engine thread.
+
+        :return: boolean, whether a merge result was applied
+        """
+        with self._condition:
+            completed = self._completed
+            self._completed = None
+            is_current = completed is not None and completed[0] == self._generation
+            idle = self._pending is None and self._running_generation is None
+        if idle and self._timer is not None:
+            self._timer.stop()
+            self._timer = None
+        if is_current:
+            self._apply_fn(completed[1])
+        return is_current
+
+    def wait(self, timeout_seconds=None):
+        """
+        Blocks until no merge is waiting or running, then applies the newest result.
+        Must be called on the engine thread.
+
+        :param timeout_seconds: number or None
+        :return: boolean, whether a merge result was applied
+        """
+        deadline = None if timeout_seconds is None else time.time() + timeout_seconds
+        with self._condition:
+            while self._pending is not None or self._running_generation is not None:
+                remaining_seconds = None if deadline is None else deadline - time.time()
+                if remaining_seconds is not None and remaining_seconds <= 0:
+                    break
+                self._condition.wait(remaining_seconds)
+        return self.apply_completed()
+
+    def _start_worker(self):
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._work, name="CCRMergeWorker")
+            self._worker.daemon = True
+            self._worker.start()
+
+    def _work(self):
+        while True:
+            with self._condition:
+                while self._pending is None:
+                    if len(self._prefetches) == 0:
+                        self._condition.wait()
+                        continue
+                    remaining_seconds = self._prefetch_start_time - time.time()
+                    if remaining_seconds <= 0:
+                        break
+                    self._condition.wait(remaining_seconds)
+                prefetch = None
+                if self._pending is None:
+                    prefetch = self._prefetches.pop(0)
+                else:
+                    generation, managed_rules, rule_sorter = self._pending
+                    self._pending = None
+                    self._running_generation = generation
+            if prefetch is not None:
+                self._prefetch(*prefetch)
+                continue
+
+            merge_result = None
+            try:
+                merge_result = self._merger.merge_rules(managed_rules, rule_sorter)
+            except:  # ignore warnings on this line-- a failed merge must not kill the worker
+                traceback.print_exc()
+                printer.out("CCR merge failed: the previous CCR rules stay loaded.")
+
+            with self._condition:
+                self._running_generation = None
+                if merge_result is not None and generation == self._generation:
+                    self._completed = (generation, merge_result)
+                self._condition.notify_all()
+
+    def _prefetch(self, managed_rules, rule_sorter):
+        try:
+            self._merger.merge_rules(managed_rules, rule_sorter, speculative=True)
+        except:  # ignore warnings on this line-- a failed merge must not kill the worker
+            traceback.print_exc()
@@ -6,6 +6,17 @@ def _set_rdescripts(mapping, rcn):
         _set_the_rdescript(action, spec, rcn)
 
 
+def _set_class_rdescripts(rule_class, rcn):
+    """
+    A class mapping's actions are shared by all instances of the class,
+    so they only need to be described once per class.
+    """
+    if rule_class.__dict__.get("_rdescripts_set", False):
+        return
+    _set_rdescripts(rule_class.mapping, rcn)
+    rule_class._rdescripts_set = True
+
+
 def _set_the_rdescript(action, spec, rcn):
     if hasattr(action, "rdescript") and action.rdescript is None:
         action.rdescript = _create_rdescript(spec, rcn)
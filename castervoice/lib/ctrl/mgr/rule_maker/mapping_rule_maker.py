@@ -9,9 +9,15 @@ class MappingRuleMaker(BaseRuleMaker):
     object, then runs all transformers over it.
     """
 
-    def __init__(self, t_runner, smr_configurer):
+    def __init__(self, t_runner, smr_configurer, context_factory=None):
+        """
+        :param t_runner: TransformersRunner
+        :param smr_configurer: SelfModRuleConfigurer
+        :param context_factory: fn(executable, title) -> Context, defaults to AppContext
+        """
         self._transformers_runner = t_runner
         self._smr_configurer = smr_configurer
+        self._context_factory = context_factory if context_factory is not None else AppContext
         self._name_uniquefier = 0
 
     def create_non_ccr_grammar(self, managed_rule):
@@ -25,7 +31,7 @@ class MappingRuleMaker(BaseRuleMaker):
 
         context = None
         if details.executable is not None or details.title is not None:
-            context = AppContext(executable=details.executable, title=details.title)
+            context = self._context_factory(executable=details.executable, title=details.title)
         self._name_uniquefier += 1
         counter = "g" + str(self._name_uniquefier)
         grammar_name = counter if details.grammar_name is None else details.grammar_name + counter
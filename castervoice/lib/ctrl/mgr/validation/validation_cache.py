@@ -0,0 +1,109 @@
+import hashlib
+import os
+
+from castervoice.lib import utilities
+
+
+class ValidationCache(object):
+    """
+    Remembers the outcome of validating each rule across restarts, so that
+    rules whose files haven't changed don't have to be validated again at
+    startup. Rules cached as valid are still instantiated, as that can fail
+    for reasons outside of their files; failures to instantiate aren't cached.
+
+    Outcomes are keyed by rule class name and rule file hash, and are only
+    kept for the latest version of each rule's file. Everything is forgotten
+    when the validators or the rule base classes change (see
+    get_validators_version). Changes to the support modules which rules
+    import (eg. a shared list of specs) aren't noticed: delete the json file
+    the cache is saved to, or touch the rule's file, to validate again.
+    """
+
+    # what validation outcomes depend on besides the rules' files, relative to castervoice/lib:
+    # the validators, the validator lists built by the Nexus, and the rule base classes
+    _VALIDATION_SOURCES = [os.path.join("ctrl", "mgr", "validation"),
+                           os.path.join("ctrl", "nexus.py"),
+                           os.path.join("ctrl", "mgr", "managed_rule.py"),
+                           os.path.join("merge", "mergerule.py"),
+                           os.path.join("merge", "selfmod", "selfmodrule.py")]
+
+    _VERSION = 1
+
+    def __init__(self, path, validators_version):
+        """
+        :param path: str, path of the json file
+        :param validators_version: str, see get_validators_version
+        """
+        self._path = path
+        self._validators_version = validators_version
+        # {rule class name: {"hash": str, "invalidation": str or None}}
+        self._entries = None
+        self._changed = False
+
+    @staticmethod
+    def get_validators_version(paths=None):
+        """
+        :param paths: list of str, the files and directories of the modules validation
+            depends on, defaults to _VALIDATION_SOURCES
+        :return: str, a hash of their source, which changes whenever any of them does
+        """
+        if paths is None:
+            lib_directory = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                         os.pardir, os.pardir, os.pardir))
+            paths = [os.path.join(lib_directory, path) for path in ValidationCache._VALIDATION_SOURCES]
+        md5_hasher = hashlib.md5()
+        for path in paths:
+            if os.path.isdir(path):
+                for dirpath, dirnames, filenames in sorted(os.walk(path)):
+                    for filename in sorted(filenames):
+                        if filename.endswith(".py"):
+                            ValidationCache._hash_file(md5_hasher, os.path.join(dirpath, filename))
+            elif os.path.isfile(path):
+                ValidationCache._hash_file(md5_hasher, path)
+        return md5_hasher.hexdigest()
+
+    @staticmethod
+    def _hash_file(md5_hasher, path):
+        with open(path, "rb") as f:
+            md5_hasher.update(f.read())
+
+    def get(self, class_name, file_hash):
+        """
+        :param class_name: str
+        :param file_hash: str, the hash of the rule's file
+        :return: dict entry with the "invalidation" (None if the rule was valid),
+            or None if the rule hasn't been validated in this version
+        """
+        self._load()
+        entry = self._entries.get(class_name)
+        if entry is None or entry["hash"] != file_hash:
+            return None
+        return entry
+
+    def put(self, class_name, file_hash, invalidation):
+        """
+        :param class_name: str
+        :param file_hash: str, the hash of the rule's file
+        :param invalidation: str, why the rule was rejected, or None if it was valid
+        """
+        self._load()
+        self._entries[class_name] = {"hash": file_hash, "invalidation": invalidation}
+        self._changed = True
+
+    def save(self):
+        if not self._changed:
+            return
+        utilities.save_json_file({"version": ValidationCache._VERSION,
+                                  "validators_version": self._validators_version,
+                                  "rules": self._entries}, self._path)
+        self._changed = False
+
+    def _load(self):
+        if self._entries is not None:
+            return
+        data = utilities.load_json_file(self._path)
+        if data.get("version") == ValidationCache._VERSION and \
+                data.get("validators_version") == self._validators_version:
+            self._entries = data.get("rules", {})
+        else:
+            self._entries = {}
@@ -1,23 +1,37 @@
+from multiprocessing.pool import ThreadPool
+
 from castervoice.lib.ctrl.mgr.grammar_container.basic_grammar_container import BasicGrammarContainer
+from castervoice.lib.ctrl.mgr.grammar_container.diff_grammar_container import DiffGrammarContainer
+from castervoice.lib.ctrl.mgr.grammar_container.packed_grammar_container import PackedGrammarContainer
 from castervoice.lib.ctrl.mgr.ccr_toggle import CCRToggle
 from castervoice.lib.ctrl.mgr.companion.companion_config import CompanionConfig
+from castervoice.lib.ctrl.mgr.context_dispatch.context_dispatcher import ContextDispatcher
 from castervoice.lib.ctrl.mgr.grammar_activator import GrammarActivator
+from castervoice.lib.ctrl.mgr.language_switcher import LanguageSwitcher
 from castervoice.lib.ctrl.mgr.loading.reload.manual_reload_observable import ManualReloadObservable
 from castervoice.lib.ctrl.mgr.loading.reload.timer_reload_observable import TimerReloadObservable
+from castervoice.lib.ctrl.mgr.merge_prediction.activation_predictor import ActivationPredictor
+from castervoice.lib.ctrl.mgr.merge_prediction.focus_observer import FocusObserver
+from castervoice.lib.ctrl.mgr.merge_scheduler import MergeScheduler
 from castervoice.lib.ctrl.mgr.rule_maker.mapping_rule_maker import MappingRuleMaker
 from castervoice.lib.ctrl.mgr.rules_config import RulesConfig
 from castervoice.lib.ctrl.mgr.validation.combo.combo_validation_delegator import ComboValidationDelegator
 from castervoice.lib.ctrl.mgr.validation.combo.non_empty_validator import RuleNonEmptyValidator
 from castervoice.lib.ctrl.mgr.validation.combo.rule_family_validator import RuleFamilyValidator
 from castervoice.lib.ctrl.mgr.validation.combo.treerule_validator import TreeRuleValidator
+from castervoice.lib.ctrl.mgr.validation.validation_cache import ValidationCache
+from castervoice.lib.merge.ccrmerging2.caching.merge_plan_cache import MergePlanCache
+from castervoice.lib.merge.ccrmerging2.caching.rule_state_cache import RuleStateCache
+from castervoice.lib.merge.ccrmerging2.compatibility.indexed_compat_checker import IndexedCompatibilityChecker
 from castervoice.lib.merge.ccrmerging2.compatibility.simple_compat_checker import SimpleCompatibilityChecker
+from castervoice.lib.merge.ccrmerging2.complexity.complexity_budget import ComplexityBudget
 from castervoice.lib.merge.ccrmerging2.hooks.hooks_config import HooksConfig
 from castervoice.lib.merge.ccrmerging2.hooks.hooks_runner import HooksRunner
 from castervoice.lib.merge.ccrmerging2.sorting.config_ruleset_sorter import ConfigBasedRuleSetSorter
 from castervoice.lib.merge.ccrmerging2.transformers.transformers_config import TransformersConfig
 from castervoice.lib.merge.ccrmerging2.transformers.transformers_runner import TransformersRunner
 from castervoice.lib.merge.mergerule import MergeRule
-from castervoice.lib import settings
+from castervoice.lib import available_commands_index, settings
 from castervoice.lib.ctrl.mgr.validation.details.ccr_app_validator import AppCCRDetailsValidator
 from castervoice.lib.ctrl.mgr.validation.details.ccr_validator import CCRDetailsValidator
 from castervoice.lib.ctrl.mgr.validation.details.details_validation_delegator import DetailsValidationDelegator
@@ -28,10 +42,12 @@ from castervoice.lib.ctrl.mgr.validation.rules.selfmod_validator import CCRSelfM
 from castervoice.lib.merge.communication import Communicator
 from castervoice.lib.merge.selfmod.smr_configurer import SelfModRuleConfigurer
 from castervoice.lib.merge.state.stack import CasterState
+from castervoice.lib.util.lru_cache import LRUCache
 from castervoice.lib.ctrl.mgr.grammar_manager import GrammarManager
 from castervoice.lib.ctrl.mgr.validation.rules.rule_validation_delegator import CCRRuleValidationDelegator
 from castervoice.lib.merge.ccrmerging2.ccrmerger2 import CCRMerger2
 from castervoice.lib.merge.ccrmerging2.merging.classic_merging_strategy import ClassicMergingStrategy
+from castervoice.lib.merge.ccrmerging2.merging.extras_interner import ExtrasInterner
 
 
 class Nexus:
@@ -64,15 +80,21 @@ class Nexus:
         transformers_config = TransformersConfig()
         transformers_runner = TransformersRunner(transformers_config)
 
+        '''classifies the foreground window once for all app contexts'''
+        self.context_dispatcher = Nexus._create_context_dispatcher()
+        context_factory = None
+        if self.context_dispatcher is not None:
+            context_factory = self.context_dispatcher.create_context
+
         '''the ccrmerger -- only merges MergeRules'''
-        self._merger = Nexus._create_merger(smrc, transformers_runner)
+        self._merger = Nexus._create_merger(smrc, transformers_runner, context_factory)
 
         '''unified loading mechanism for [rules, transformers, hooks] 
         from [caster starter locations, user dir]'''
         self._content_loader = content_loader
 
         '''mapping rule maker: like the ccrmerger, but doesn't merge and isn't ccr'''
-        mapping_rule_maker = MappingRuleMaker(transformers_runner, smrc)
+        mapping_rule_maker = MappingRuleMaker(transformers_runner, smrc, context_factory)
 
         '''the grammar manager -- probably needs to get broken apart more'''
         self._grammar_manager = Nexus._create_grammar_manager(self._merger,
@@ -83,14 +105,19 @@ class Nexus:
         self._load_and_register_all_content(rules_config, hooks_runner, transformers_runner)
         self._grammar_manager.initialize()
 
+        '''keeps only the ccr language rule of the file being edited enabled'''
+        self._language_switcher = Nexus._create_language_switcher(self._grammar_manager)
+
     def _load_and_register_all_content(self, rules_config, hooks_runner, transformers_runner):
         """
         all rules go to grammar_manager
         all transformers go to transformers runner
         all hooks go to hooks runner
         """
-        content = self._content_loader.load_everything(rules_config)
+        content = self._content_loader.load_everything(rules_config,
+                                                       lambda rule: self._grammar_manager.prevalidate_rule(*rule))
         [self._grammar_manager.register_rule(rc, d) for rc, d in content.rules]
+        [self._grammar_manager.register_lazy_rule(r) for r in content.lazy_rule_requests]
         [transformers_runner.add_transformer(t) for t in content.transformers]
         [hooks_runner.add_hook(h) for h in content.hooks]
         self._grammar_manager.load_activation_grammars()
@@ -141,18 +168,39 @@ class Nexus:
         ccr_rule_validator = Nexus._create_ccr_rule_validator()
         details_validator = Nexus._create_details_validator()
         combo_validator = Nexus._create_combo_validator()
-        
+        validation_cache = None
+        if settings.settings(["grammar_loading", "validation_cache"]):
+            validation_cache = ValidationCache(settings.settings(["paths", "VALIDATION_CACHE_PATH"]),
+                                               ValidationCache.get_validators_version())
+        validation_pool = None
+        validation_workers = settings.settings(["grammar_loading", "validation_workers"])
+        if validation_workers:
+            validation_pool = ThreadPool(validation_workers)
+
         timer = settings.SETTINGS["grammar_reloading"]["reload_timer_seconds"]
         observable = TimerReloadObservable(timer)
         if settings.SETTINGS["grammar_reloading"]["reload_trigger"] == "manual":
             observable = ManualReloadObservable()
 
         grammars_container = BasicGrammarContainer()
+        if settings.settings(["grammar_loading", "pack_non_ccr_rules"]):
+            grammars_container = PackedGrammarContainer()
+        elif settings.settings(["ccr_merging", "reuse_grammars"]):
+            grammars_container = DiffGrammarContainer()
 
         activator = GrammarActivator(lambda rule: isinstance(rule, MergeRule))
 
         companion_config = CompanionConfig()
 
+        merge_scheduler = None
+        activation_predictor = None
+        if settings.settings(["ccr_merging", "background_merge"]):
+            merge_scheduler = MergeScheduler(merger)
+            # predicted merges are only useful if their results are kept for the real merge
+            predicted_merges = settings.settings(["ccr_merging", "predicted_merges"])
+            if predicted_merges and settings.settings(["ccr_merging", "result_cache_size"]):
+                activation_predictor = ActivationPredictor(predicted_merges)
+
         gm = GrammarManager(rule_config,
                             merger,
                             content_loader,
@@ -167,16 +215,69 @@ class Nexus:
                             smrc,
                             transformers_runner,
                             companion_config,
-                            combo_validator)
+                            combo_validator,
+                            merge_scheduler,
+                            available_commands_index.get_instance(),
+                            activation_predictor,
+                            validation_cache,
+                            validation_pool)
+        if activation_predictor is not None:
+            FocusObserver(gm.set_foreground_executable).register()
         return gm
 
     @staticmethod
-    def _create_merger(smrc, transformers_runner):
-        compat_checker = SimpleCompatibilityChecker()
-        merge_strategy = ClassicMergingStrategy()
+    def _create_language_switcher(grammar_manager):
+        if not settings.settings(["language_switching", "enabled"]):
+            return None
+        language_switcher = LanguageSwitcher(grammar_manager,
+                                             settings.settings(["language_switching", "extensions"], {}),
+                                             settings.settings(["language_switching", "debounce_seconds"], 1.0))
+        language_switcher.start(settings.settings(["language_switching", "poll_seconds"], 0.5))
+        return language_switcher
+
+    @staticmethod
+    def _create_context_dispatcher():
+        # aenea's contexts are matched against the remote machine's windows
+        if settings.settings(["miscellaneous", "use_aenea"]):
+            return None
+        if not settings.settings(["grammar_loading", "dispatch_contexts"]):
+            return None
+        return ContextDispatcher(settings.settings(["grammar_loading", "context_cache_size"]) or 32)
+
+    @staticmethod
+    def _create_merger(smrc, transformers_runner, context_factory=None):
+        if settings.settings(["ccr_merging", "indexed_compat_check"]):
+            compat_checker = IndexedCompatibilityChecker(
+                settings.settings(["ccr_merging", "compat_expansion_limit"]) or 64)
+        else:
+            compat_checker = SimpleCompatibilityChecker()
+        extras_interner = None
+        if settings.settings(["ccr_merging", "intern_extras"]):
+            extras_interner = ExtrasInterner()
+        merge_strategy = ClassicMergingStrategy(extras_interner)
         max_repetitions = settings.settings(["miscellaneous", "max_ccr_repetitions"])
+        rule_state_cache = None
+        if settings.settings(["ccr_merging", "incremental"]):
+            rule_state_cache = RuleStateCache()
+
+        shared_layout = settings.settings(["ccr_merging", "shared_layout"])
+        merge_result_cache = None
+        merge_result_cache_size = settings.settings(["ccr_merging", "result_cache_size"])
+        if merge_result_cache_size:
+            merge_result_cache = LRUCache(merge_result_cache_size)
+        merge_plan_cache = None
+        if settings.settings(["ccr_merging", "plan_cache"]):
+            merge_plan_cache = MergePlanCache(settings.settings(["paths", "MERGE_PLAN_CACHE_PATH"]))
+
+        complexity_budget = None
+        max_complexity = settings.settings(["ccr_merging", "complexity_budget"])
+        if max_complexity:
+            complexity_budget = ComplexityBudget(max_complexity,
+                                                 settings.settings(["ccr_merging", "complexity_action"]))
 
-        return CCRMerger2(transformers_runner, compat_checker, merge_strategy, max_repetitions, smrc)
+        return CCRMerger2(transformers_runner, compat_checker, merge_strategy, max_repetitions, smrc,
+                          rule_state_cache, shared_layout, merge_result_cache, merge_plan_cache,
+                          complexity_budget, context_factory)
 
     def set_ccr_active(self, active):
         self._grammar_manager.set_ccr_active(active)
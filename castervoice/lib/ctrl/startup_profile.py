@@ -0,0 +1,161 @@
+"""
+Profiles Caster's startup: boots the Nexus the way _caster.py does, but against
+dragonfly's text engine, and records how long each phase, rule module, import,
+merge and grammar load took.
+
+Writes <output>.json with the timing tree and an import time breakdown, and
+<output>.folded, which flame graph tools (flamegraph.pl, speedscope) can read.
+Attach both to slow startup bug reports.
+
+The user directory is left as it was: settings aren't saved, and the files
+startup writes (rules config, caches, selfmod data) are copied to a scratch
+directory first, so the profile still starts from the user's real state.
+
+Run from the Caster root with:
+    python -m castervoice.lib.ctrl.startup_profile [--output PATH] [--min-ms MS]
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import traceback
+
+from castervoice.lib import printer
+from castervoice.lib.util.startup_profiler import StartupProfiler, TimingNode
+
+
+def _wrap_startup_steps(profiler):
+    from dragonfly import Grammar
+    from castervoice.lib.ctrl.mgr.grammar_manager import GrammarManager
+    from castervoice.lib.ctrl.mgr.loading.load.content_loader import ContentLoader
+    from castervoice.lib.ctrl.mgr.loading.load.content_request_generator import ContentRequestGenerator
+    from castervoice.lib.merge.ccrmerging2.ccrmerger2 import CCRMerger2
+
+    profiler.wrap(ContentRequestGenerator, "get_all_content_modules",
+                  lambda crg, directory: "scan content " + directory)
+    profiler.wrap(ContentLoader, "load_everything", "load content")
+    profiler.wrap(ContentLoader, "idem_import_module",
+                  lambda content_loader, module_name, fn_name: "content module " + module_name)
+    profiler.wrap(GrammarManager, "register_rule", lambda gm, rule_class, details: "register " + rule_class.__name__)
+    profiler.wrap(GrammarManager, "load_activation_grammars", "activation grammars")
+    profiler.wrap(GrammarManager, "initialize", "initialize rules")
+    profiler.wrap(CCRMerger2, "merge_rules", "merge ccr rules")
+    profiler.wrap(Grammar, "load", lambda grammar: "load grammar " + grammar.name)
+
+
+def _use_scratch_user_files(settings, scratch_dir):
+    """
+    Points the paths of files in the user directory at copies in scratch_dir.
+
+    :param settings: the settings module, initialized
+    :param scratch_dir: str
+    """
+    paths = settings.SETTINGS["paths"]
+    user_dir = paths["USER_DIR"]
+    for key in paths:
+        path = paths[key]
+        if key == "USER_DIR" or os.path.isdir(path):
+            continue
+        try:
+            relative_path = os.path.relpath(path, user_dir)
+        except ValueError:  # another drive
+            continue
+        if relative_path.startswith(os.pardir):
+            continue
+        scratch_path = os.path.join(scratch_dir, relative_path)
+        if not os.path.isdir(os.path.dirname(scratch_path)):
+            os.makedirs(os.path.dirname(scratch_path))
+        if os.path.isfile(path):
+            shutil.copy2(path, scratch_path)
+        paths[key] = scratch_path
+
+
+def boot(profiler, scratch_dir):
+    """
+    :param profiler: StartupProfiler, started
+    :param scratch_dir: str, where to write the files startup would write to the user directory
+    """
+    with profiler.phase("engine"):
+        from dragonfly import get_engine
+        get_engine("text")
+
+    with profiler.phase("dependencies"):
+        from castervoice.lib.ctrl.dependencies import DependencyMan
+        DependencyMan().initialize()
+
+    with profiler.phase("settings"):
+        from castervoice.lib import settings
+        settings.initialize()
+    # the overrides below are for this run only
+    settings.save_config = lambda: None
+    _use_scratch_user_files(settings, scratch_dir)
+    # merge on this thread, so that the first merge is part of the profile
+    # rather than being finished by a timer afterwards
+    settings.SETTINGS["ccr_merging"]["background_merge"] = False
+    # nothing to watch for changes: the profile ends once startup does
+    settings.SETTINGS["grammar_reloading"]["reload_trigger"] = "manual"
+
+    with profiler.phase("update check"):
+        from castervoice.lib.ctrl.updatecheck import UpdateChecker
+        UpdateChecker().initialize()
+
+    with profiler.phase("nexus"):
+        _wrap_startup_steps(profiler)
+        from castervoice.lib import control
+        control.init_nexus(control.create_content_loader())
+
+
+def _print_tree(node, min_seconds, depth=0):
+    if node.kind == TimingNode.IMPORT or (depth > 0 and node.seconds < min_seconds):
+        return
+    count = " x{}".format(node.count) if node.count > 1 else ""
+    printer.out("{:9.1f} ms  {}{}{}".format(node.seconds * 1000, "  " * depth, node.name, count))
+    for child in node.get_children():
+        _print_tree(child, min_seconds, depth + 1)
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="python -m castervoice.lib.ctrl.startup_profile",
+                                     description="Profiles Caster's startup against a stand-in engine.")
+    parser.add_argument("-o", "--output", default="caster_startup_profile",
+                        help="path of the output files, without the .json/.folded extension")
+    parser.add_argument("--min-ms", type=float, default=10.0,
+                        help="leave steps faster than this out of the printed summary")
+    args = parser.parse_args(argv)
+
+    profiler = StartupProfiler()
+    scratch_dir = tempfile.mkdtemp(prefix="caster_startup_profile")
+    profiler.start()
+    error = None
+    try:
+        boot(profiler, scratch_dir)
+    except Exception:
+        error = traceback.format_exc()
+        printer.out(error)
+    finally:
+        profiler.stop()
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+    report = profiler.to_dict()
+    report["engine"] = "text"
+    report["python"] = sys.version
+    report["platform"] = platform.platform()
+    report["error"] = error
+    with open(args.output + ".json", "w") as json_file:
+        json.dump(report, json_file, indent=2)
+    with open(args.output + ".folded", "w") as folded_file:
+        folded_file.write("\n".join(profiler.to_folded()) + "\n")
+
+    _print_tree(profiler.root, args.min_ms / 1000)
+    printer.out("", "slowest imports (self time):")
+    for entry in report["imports"][:15]:
+        printer.out("{:9.1f} ms  {}".format(entry["self_seconds"] * 1000, entry["module"]))
+    printer.out("", "Wrote {0}.json and {0}.folded".format(args.output))
+    return 0 if error is None else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,9 +1,23 @@
+from dragonfly import Choice
+
 from castervoice.lib.ctrl.mgr.errors.base_class_error import DontUseBaseClassError
 
 
 class ActivationRuleGenerator(object):
     def construct_activation_rule(self):
         """
-        Returns a rule which has activation commands.
+        Returns a rule which has activation commands,
+        or None if there is nothing to activate.
         """
-        raise DontUseBaseClassError(self)
\ No newline at end of file
+        raise DontUseBaseClassError(self)
+
+
+def create_activation_choice(name="active"):
+    """
+    Activation rules say "enable X" and "disable X" with one spec,
+    "<active> X", rather than with two specs per X.
+
+    :param name: str, the name of the extra
+    :return: Choice with the values True ("enable") and False ("disable")
+    """
+    return Choice(name, {"enable": True, "disable": False})
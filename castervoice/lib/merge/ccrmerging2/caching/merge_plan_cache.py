@@ -0,0 +1,70 @@
+import hashlib
+import json
+
+from castervoice.lib import utilities
+
+
+class MergePlanCache(object):
+    """
+    Remembers the outcome of sorting and compatibility checking
+    (which rules survive and the order they're merged in) across
+    restarts, so that merging a previously seen set of rules can
+    skip straight to building the merged rules.
+
+    Plans are saved to a json file. Only the most recently used
+    plans are kept: using a plan moves it to the end, and the new
+    order is saved along with the next new plan, since the order
+    only matters once a plan has to be dropped.
+    """
+
+    _VERSION = 1
+
+    def __init__(self, path, max_plans=10):
+        """
+        :param path: str, path of the json file
+        :param max_plans: int
+        """
+        self._path = path
+        self._max_plans = max_plans
+        self._plans = None
+
+    def get_plan(self, key):
+        """
+        :param key: str, see MergePlanCache.create_key
+        :return: list of rule class names in merge order, or None
+        """
+        self._load()
+        for i, plan in enumerate(self._plans):
+            if plan[0] == key:
+                self._plans.append(self._plans.pop(i))
+                return plan[1]
+        return None
+
+    def put_plan(self, key, rcns):
+        """
+        :param key: str, see MergePlanCache.create_key
+        :param rcns: list of rule class names in merge order
+        """
+        self._load()
+        plans = [plan for plan in self._plans if plan[0] != key]
+        plans.append([key, list(rcns)])
+        self._plans = plans[-self._max_plans:]
+        utilities.save_json_file({"version": MergePlanCache._VERSION, "plans": self._plans}, self._path)
+
+    def _load(self):
+        if self._plans is not None:
+            return
+        data = utilities.load_json_file(self._path)
+        if data.get("version") == MergePlanCache._VERSION:
+            self._plans = data.get("plans", [])
+        else:
+            self._plans = []
+
+    @staticmethod
+    def create_key(components):
+        """
+        :param components: json-serializable description of everything which affects the plan
+        :return: str
+        """
+        serialized = json.dumps(components, sort_keys=True)
+        return hashlib.md5(serialized.encode("utf-8")).hexdigest()
@@ -0,0 +1,78 @@
+class RuleStateCache(object):
+    """
+    Holds on to the expensive parts of the last merge so that
+    the next merge only has to rebuild what actually changed.
+
+    Transformed rules are kept per rule class name and are only reused
+    if both the rule class and its fingerprint are unchanged.
+
+    Prepared merged rules are kept per merge group. The key of a group
+    is built from the fingerprints of the rules that went into it, so
+    a group is only rebuilt if one of its rules changed, was added,
+    or was removed. Groups which were not used by the most recent merge
+    are discarded.
+    """
+
+    def __init__(self):
+        # {rcn: (rule class, fingerprint, transformed rule)}
+        self._transformed_rules = {}
+        # {group key: prepared rule}
+        self._prepared_rules = {}
+        self._prepared_rules_in_use = {}
+
+    def get_transformed_rule(self, managed_rule):
+        """
+        :param managed_rule: ManagedRule
+        :return: transformed MergeRule or None
+        """
+        rcn = managed_rule.get_rule_class_name()
+        if rcn not in self._transformed_rules:
+            return None
+        rule_class, fingerprint, rule = self._transformed_rules[rcn]
+        if rule_class is not managed_rule.get_rule_class():
+            return None
+        if fingerprint != managed_rule.get_fingerprint():
+            return None
+        return rule
+
+    def put_transformed_rule(self, managed_rule, rule):
+        self._transformed_rules[managed_rule.get_rule_class_name()] = \
+            (managed_rule.get_rule_class(), managed_rule.get_fingerprint(), rule)
+
+    def get_prepared_rule(self, group_key):
+        """
+        :param group_key: tuple, see RuleStateCache.create_group_key
+        :return: prepared rule or None
+        """
+        if group_key not in self._prepared_rules:
+            return None
+        rule = self._prepared_rules[group_key]
+        self._prepared_rules_in_use[group_key] = rule
+        return rule
+
+    def put_prepared_rule(self, group_key, rule):
+        self._prepared_rules[group_key] = rule
+        self._prepared_rules_in_use[group_key] = rule
+
+    def end_merge(self, discard_unused=True):
+        """
+        Discards merge groups which the last merge didn't use.
+
+        :param discard_unused: False to keep them, for merges which didn't replace the loaded rules
+        """
+        if discard_unused:
+            self._prepared_rules = self._prepared_rules_in_use
+        else:
+            self._prepared_rules.update(self._prepared_rules_in_use)
+        self._prepared_rules_in_use = {}
+
+    @staticmethod
+    def create_group_key(compat_results, rcns_to_fingerprints):
+        """
+        :param compat_results: list of CompatibilityResult, in merge order
+        :param rcns_to_fingerprints: {rcn: fingerprint}
+        :return: tuple
+        """
+        return tuple((rcns_to_fingerprints[cr.rule_class_name()],
+                      tuple(sorted(cr.incompatible_rule_class_names())))
+                     for cr in compat_results)
@@ -1,9 +1,17 @@
+import collections
+
 from dragonfly.grammar.elements import RuleRef, Alternative, Repetition
 from dragonfly.grammar.rule_compound import CompoundRule
+from dragonfly.grammar.rule_mapping import MappingRule
+from castervoice.lib.available_commands_index import AvailableCommandsIndex
 from castervoice.lib.const import CCRType
 from castervoice.lib.context import AppContext
 from castervoice.lib.ctrl.mgr.rules_enabled_diff import RulesEnabledDiff
+from castervoice.lib.merge.ccrmerging2.caching.merge_plan_cache import MergePlanCache
+from castervoice.lib.merge.ccrmerging2.caching.rule_state_cache import RuleStateCache
+from castervoice.lib.merge.ccrmerging2.compatibility.compat_result import CompatibilityResult
 from castervoice.lib.merge.ccrmerging2.merge_result import MergeResult
+from castervoice.lib.merge.ccrmerging2.merge_stats import MergeStats
 
 
 class CCRMerger2(object):
@@ -11,7 +19,9 @@ class CCRMerger2(object):
     _SEQ = "caster_base_sequence"
     _TERMINAL = "terminal"
 
-    def __init__(self, transformers_runner, compatibility_checker, merging_strategy, max_repetitions, smr_configurer):
+    def __init__(self, transformers_runner, compatibility_checker, merging_strategy, max_repetitions, smr_configurer,
+                 rule_state_cache=None, shared_layout=False, merge_result_cache=None, merge_plan_cache=None,
+                 complexity_budget=None, context_factory=None):
         """
         5-Step Merge Process
         ====================
@@ -26,6 +36,13 @@ class CCRMerger2(object):
         :param merging_strategy: BaseMergingStrategy impl
         :param max_repetitions
         :param smr_configurer
+        :param rule_state_cache: RuleStateCache for incremental merging, or None to rebuild everything every merge
+        :param shared_layout: if True, the non-app rules are merged once and shared by all contexts,
+            and each app context only adds its own rules on top; see _create_shared_rules_and_contexts
+        :param merge_result_cache: LRUCache for reusing the merged rules of recently merged rule sets, or None
+        :param merge_plan_cache: MergePlanCache for skipping steps 2 and 3 for previously seen rule sets, or None
+        :param complexity_budget: ComplexityBudget checked between steps 3 and 4, or None
+        :param context_factory: fn(executable, title) -> Context for app rules, defaults to AppContext
         """
         self._transformers_runner = transformers_runner
         self._compatibility_checker = compatibility_checker
@@ -34,34 +51,167 @@ class CCRMerger2(object):
         self._sequence = 0
         self._max_repetitions = int(max_repetitions)
         self._smr_configurer = smr_configurer
+        self._rule_state_cache = rule_state_cache
+        self._shared_layout = shared_layout
+        self._merge_result_cache = merge_result_cache
+        self._merge_plan_cache = merge_plan_cache
+        self._complexity_budget = complexity_budget
+        self._context_factory = context_factory if context_factory is not None else AppContext
 
-    def merge_rules(self, managed_rules, rule_sorter):
+    def merge_rules(self, managed_rules, rule_sorter, speculative=False):
         """
         :param managed_rules: list of ManagedRules
         :param rule_sorter: BaseRuleSetSorter impl
+        :param speculative: True for merges which are only done ahead of time, so that a later
+            merge of the same rules is a merge result cache hit: the merged rules of the
+            current rules are kept cached too, and nothing is saved to the merge plan cache
+            or printed
         :return: MergeResult
         """
+        stats = MergeStats()
         pre_merge_rcns = [mr.get_rule_class_name() for mr in managed_rules]
+        rcns_to_fingerprints = None
+        if self._rule_state_cache is not None or self._merge_result_cache is not None:
+            rcns_to_fingerprints = CCRMerger2._rule_fingerprints_dict(managed_rules)
+
+        # 1-4: reuse the merged rules if this exact set of rules was merged recently
+        merge_result_key = None
+        merged = None
+        if self._merge_result_cache is not None:
+            merge_result_key = CCRMerger2._create_merge_result_key(managed_rules, rule_sorter, rcns_to_fingerprints)
+            merged = self._merge_result_cache.get(merge_result_key)
+            stats.result_cache_hit = merged is not None
+        if merged is None:
+            merged = self._merge_into_prepared_rules(managed_rules, rule_sorter, rcns_to_fingerprints, stats,
+                                                     speculative)
+            if self._merge_result_cache is not None:
+                self._merge_result_cache.put(merge_result_key, merged)
+        prepared_rules_and_contexts, enabled_ordered_rcns, overflow_rules_and_contexts, indexed_rules = merged
+
+        # 5: turn the merged rules into repeat rules
+        rules_and_contexts = []
+        standalone_rules_and_contexts = []
+        with stats.time_stage("repeat"):
+            for prepared_rules, context in prepared_rules_and_contexts:
+                rule_context = context if self._shared_layout else None
+                rules_and_contexts.append((self._create_repeat_rule(prepared_rules, rule_context), context))
+            for rule, context in overflow_rules_and_contexts:
+                rule_context = context if self._shared_layout else None
+                standalone_rules_and_contexts.append((CCRMerger2._create_standalone_rule(rule, rule_context), context))
+
+        stats.rule_count = len(pre_merge_rcns)
+        stats.ko_count = len(pre_merge_rcns) - len(enabled_ordered_rcns)
+        stats.merged_rule_count = len(rules_and_contexts)
+        stats.overflow_count = len(standalone_rules_and_contexts)
+        stats.count_prepared_rules([rule for rules, _ in prepared_rules_and_contexts for rule in rules])
+
+        diff = CCRMerger2._calculate_post_merge_diff(pre_merge_rcns, enabled_ordered_rcns)
+        return MergeResult(rules_and_contexts, list(enabled_ordered_rcns), diff, self._shared_layout, stats,
+                           standalone_rules_and_contexts, indexed_rules)
+
+    def _merge_into_prepared_rules(self, managed_rules, rule_sorter, rcns_to_fingerprints, stats, speculative=False):
+        """
+        Steps 1-4 of the merge process.
+
+        :param managed_rules: list of ManagedRules
+        :param rule_sorter: BaseRuleSetSorter impl
+        :param rcns_to_fingerprints: map of {rule class name: ManagedRule fingerprint}, or None
+        :param stats: MergeStats
+        :param speculative: see merge_rules
+        :return: tuple of (list of (list of prepared rules, context), list of enabled rule class names,
+            list of (rule, context) for rules moved out of CCR by the complexity budget,
+            list of (rule class name, rule, context name) for the available commands index)
+        """
         rcns_to_details = CCRMerger2._rule_details_dict(managed_rules)
-        instantiated_rules = self._instantiate_and_configure_rules(managed_rules)
 
-        # 1: run transformers over rules
-        transformed_rules = self._run_transformers(instantiated_rules, rcns_to_details)
-        # 2: sort rules into the order they'll be merged in
-        sorted_rules = rule_sorter.sort_rules(transformed_rules)
-        # 3: compute compatibility results for all rules vs all rules in O(n) for total specs
-        compat_results = self._compatibility_checker.compatibility_check(sorted_rules)
+        # 1: run transformers over rules (only the ones which changed, if merging incrementally)
+        with stats.time_stage("transform"):
+            transformed_rules = self._get_transformed_rules(managed_rules, rcns_to_details)
+        # 2-3: skip sorting and compatibility checking if these rules were planned before
+        merge_plan_key = None
+        compat_results = None
+        if self._merge_plan_cache is not None:
+            with stats.time_stage("plan"):
+                merge_plan_key = self._create_merge_plan_key(managed_rules, transformed_rules, rule_sorter)
+                compat_results = self._get_planned_compat_results(merge_plan_key, transformed_rules)
+            stats.plan_cache_hit = compat_results is not None
+        if compat_results is None:
+            # 2: sort rules into the order they'll be merged in
+            with stats.time_stage("sort"):
+                sorted_rules = rule_sorter.sort_rules(transformed_rules)
+            # 3: compute compatibility results for all rules vs all rules in O(n) for total specs
+            with stats.time_stage("compat"):
+                if self._shared_layout:
+                    compat_results = self._compatibility_check_per_context(sorted_rules, rcns_to_details)
+                else:
+                    compat_results = self._compatibility_checker.compatibility_check(sorted_rules)
+            # plans are only kept for rules which were actually loaded
+            if self._merge_plan_cache is not None and not speculative:
+                with stats.time_stage("plan"):
+                    surviving_rcns = CCRMerger2._get_surviving_rcns_in_order(compat_results)
+                    self._merge_plan_cache.put_plan(merge_plan_key, surviving_rcns)
+        enabled_ordered_rcns = [cr.rule_class_name() for cr in compat_results]
+        indexed_rules = [(cr.rule_class_name(), cr.rule(),
+                          AvailableCommandsIndex.get_context_name(rcns_to_details[cr.rule_class_name()]))
+                         for cr in compat_results]
+        # 3.5: keep the merged rules under the complexity budget
+        overflow_rules_and_contexts = []
+        if self._complexity_budget is not None:
+            with stats.time_stage("budget"):
+                compat_results, overflow_rules_and_contexts = self._apply_complexity_budget(
+                    compat_results, rcns_to_details, stats, speculative)
         # 4: create one merged rule for each context, plus the no-contexts merged rule
+        with stats.time_stage("merge"):
+            app_crs, non_app_crs = self._separate_app_rules(compat_results, rcns_to_details)
+            if self._shared_layout:
+                prepared_rules_and_contexts = self._create_shared_rules_and_contexts(
+                    app_crs, non_app_crs, rcns_to_details, rcns_to_fingerprints)
+            else:
+                prepared_rules = self._create_prepared_rules(app_crs, non_app_crs, rcns_to_fingerprints)
+                contexts = self._create_contexts(app_crs, rcns_to_details)
+                prepared_rules_and_contexts = [([prepared_rule], context)
+                                               for prepared_rule, context in zip(prepared_rules, contexts)]
+            if self._rule_state_cache is not None:
+                self._rule_state_cache.end_merge(discard_unused=not speculative)
+
+        return prepared_rules_and_contexts, enabled_ordered_rcns, overflow_rules_and_contexts, indexed_rules
+
+    def _apply_complexity_budget(self, compat_results, rcns_to_details, stats, speculative=False):
+        """
+        Checks every merged rule which steps 4 and 5 would create against the budget.
+
+        :param compat_results: list of CompatibilityResult for the surviving rules, in merge order
+        :param rcns_to_details: map of {rule class name: rule details}
+        :param stats: MergeStats
+        :param speculative: see merge_rules
+        :return: tuple of (list of CompatibilityResult to merge,
+            list of (rule, context) for rules moved out of CCR)
+        """
         app_crs, non_app_crs = self._separate_app_rules(compat_results, rcns_to_details)
-        merged_rules = self._create_merged_rules(app_crs, non_app_crs)
-        # 5: turn the merged rules into repeat rules
-        repeat_rules = [self._create_repeat_rule(merged_rule) for merged_rule in merged_rules]
-        contexts = CCRMerger2._create_contexts(app_crs, rcns_to_details)
+        app_cr_groups = collections.OrderedDict()
+        for cr in app_crs:
+            details = rcns_to_details[cr.rule_class_name()]
+            # without the shared layout, each app rule gets its own merged rule
+            group_key = CCRMerger2._get_context_key(details) if self._shared_layout else cr.rule_class_name()
+            app_cr_groups.setdefault(group_key, []).append(cr)
+        # priority is by merge order, app rules included
+        merge_groups = [non_app_crs]
+        for app_cr_group in app_cr_groups.values():
+            merge_groups.append([cr for cr in compat_results if cr in non_app_crs or cr in app_cr_group])
 
-        rules_and_contexts = zip(repeat_rules, contexts)
-        enabled_ordered_rcns = [cr.rule_class_name() for cr in compat_results]
-        diff = CCRMerger2._calculate_post_merge_diff(pre_merge_rcns, enabled_ordered_rcns)
-        return MergeResult(rules_and_contexts, enabled_ordered_rcns, diff)
+        overflow_rcns, stats.complexity = self._complexity_budget.apply(merge_groups, self._max_repetitions,
+                                                                          quiet=speculative)
+        overflow_rcns = set(overflow_rcns)
+        overflow_rules_and_contexts = []
+        for cr in compat_results:
+            if cr.rule_class_name() in overflow_rcns:
+                details = rcns_to_details[cr.rule_class_name()]
+                context = None
+                if details.declared_ccrtype == CCRType.APP:
+                    context = self._context_factory(executable=details.executable, title=details.title)
+                overflow_rules_and_contexts.append((cr.rule(), context))
+        merged_crs = [cr for cr in compat_results if cr.rule_class_name() not in overflow_rcns]
+        return merged_crs, overflow_rules_and_contexts
 
     @staticmethod
     def _calculate_post_merge_diff(pre_merge_rcns, post_merge_rcns):
@@ -87,6 +237,29 @@ class CCRMerger2(object):
 
         return RulesEnabledDiff(newly_enabled, newly_disabled)
 
+    def _get_transformed_rules(self, managed_rules, rcns_to_details):
+        """
+        Instantiates, configures, and transforms the rules. When merging incrementally,
+        rules which haven't changed since the last merge are reused instead.
+
+        :param managed_rules: list of ManagedRule
+        :param rcns_to_details: map of {rule class name: rule details}
+        :return: list of MergeRule
+        """
+        if self._rule_state_cache is None:
+            instantiated_rules = self._instantiate_and_configure_rules(managed_rules)
+            return self._run_transformers(instantiated_rules, rcns_to_details)
+
+        transformed_rules = []
+        for mr in managed_rules:
+            rule = self._rule_state_cache.get_transformed_rule(mr)
+            if rule is None:
+                instantiated_rules = self._instantiate_and_configure_rules([mr])
+                rule = self._run_transformers(instantiated_rules, rcns_to_details)[0]
+                self._rule_state_cache.put_transformed_rule(mr, rule)
+            transformed_rules.append(rule)
+        return transformed_rules
+
     def _instantiate_and_configure_rules(self, managed_rules):
         instantiated_rules = []
         for mr in managed_rules:
@@ -121,19 +294,205 @@ class CCRMerger2(object):
                 non_app_crs.append(cr)
         return app_crs, non_app_crs
 
-    def _create_merged_rules(self, app_crs, non_app_crs):
-        merged_rules = []
-        merged_non_app_crs_rule = self._merging_strategy.merge_into_single(non_app_crs)
-        if merged_non_app_crs_rule is not None:
-            merged_rules.append(merged_non_app_crs_rule)
+    def _create_merge_plan_key(self, managed_rules, transformed_rules, rule_sorter):
+        """
+        The plan only depends on the content of the rules and on the merge settings.
+        Selfmod rules change without their files changing, so their specs are used too.
+
+        :param managed_rules: list of ManagedRule
+        :param transformed_rules: list of MergeRule, in the same order
+        :param rule_sorter: BaseRuleSetSorter impl
+        :return: str
+        """
+        rule_components = []
+        for managed_rule, rule in zip(managed_rules, transformed_rules):
+            details = managed_rule.get_details()
+            specs = None
+            if details.declared_ccrtype == CCRType.SELFMOD:
+                specs = sorted(rule.get_mapping().keys())
+            rule_components.append([managed_rule.get_rule_class_name(), managed_rule.get_file_hash(),
+                                    details.declared_ccrtype, repr(details.executable), repr(details.title),
+                                    specs])
+        return MergePlanCache.create_key([rule_sorter.__class__.__name__,
+                                          self._compatibility_checker.__class__.__name__,
+                                          self._shared_layout,
+                                          self._max_repetitions,
+                                          self._transformers_runner.get_transformer_names(),
+                                          rule_components])
+
+    def _get_planned_compat_results(self, merge_plan_key, transformed_rules):
+        """
+        :param merge_plan_key: str
+        :param transformed_rules: list of MergeRule
+        :return: list of CompatibilityResult for the surviving rules in merge order, or None if there's no plan
+        """
+        planned_rcns = self._merge_plan_cache.get_plan(merge_plan_key)
+        if planned_rcns is None:
+            return None
+        rcns_to_rules = {}
+        for rule in transformed_rules:
+            rcns_to_rules[rule.get_rule_class_name()] = rule
+        for rcn in planned_rcns:
+            if rcn not in rcns_to_rules:
+                return None
+        return [CompatibilityResult(rcns_to_rules[rcn], frozenset()) for rcn in planned_rcns]
+
+    @staticmethod
+    def _get_surviving_rcns_in_order(compat_results):
+        """
+        The merging strategy KOs rules which are incompatible with later rules.
+
+        :param compat_results: list of CompatibilityResult in merge order
+        :return: list of rule class names in merge order
+        """
+        rcns_to_indices = {}
+        for index, cr in enumerate(compat_results):
+            rcns_to_indices[cr.rule_class_name()] = index
+
+        surviving_rcns = []
+        for index, cr in enumerate(compat_results):
+            kos = [rcn for rcn in cr.incompatible_rule_class_names() if rcns_to_indices[rcn] > index]
+            if len(kos) == 0:
+                surviving_rcns.append(cr.rule_class_name())
+        return surviving_rcns
+
+    def _compatibility_check_per_context(self, sorted_rules, rcns_to_details):
+        """
+        App rules with different contexts are never active at the same time, so
+        they only need to be compatible with the non-app rules, not with each other.
+
+        The non-app rules are checked against each other first. Then the app rules
+        of each context are checked against the surviving non-app rules. Within
+        each check, rules which are later in the sort order win.
+
+        :param sorted_rules: list of MergeRule
+        :param rcns_to_details: map of {rule class name: rule details}
+        :return: list of CompatibilityResult for the surviving rules, in sort order
+        """
+        rcns_to_indices = {}
+        non_app_rules = []
+        app_rule_groups = collections.OrderedDict()
+        for rule in sorted_rules:
+            rcn = rule.get_rule_class_name()
+            rcns_to_indices[rcn] = len(rcns_to_indices)
+            details = rcns_to_details[rcn]
+            if details.declared_ccrtype == CCRType.APP:
+                app_rule_groups.setdefault(CCRMerger2._get_context_key(details), []).append(rule)
+            else:
+                non_app_rules.append(rule)
+
+        surviving_rcns = self._get_surviving_rcns(non_app_rules)
+        surviving_non_app_rules = [rule for rule in non_app_rules if rule.get_rule_class_name() in surviving_rcns]
+        surviving_app_rules = []
+        for app_rules in app_rule_groups.values():
+            checked_rules = sorted(surviving_non_app_rules + app_rules,
+                                   key=lambda r: rcns_to_indices[r.get_rule_class_name()])
+            surviving_rcns = self._get_surviving_rcns(checked_rules)
+            # non-app rules are shared by every context, so a KO in one context is a KO in all of them
+            surviving_non_app_rules = [rule for rule in surviving_non_app_rules
+                                       if rule.get_rule_class_name() in surviving_rcns]
+            surviving_app_rules.extend([rule for rule in app_rules if rule.get_rule_class_name() in surviving_rcns])
+
+        surviving_rules = sorted(surviving_non_app_rules + surviving_app_rules,
+                                 key=lambda r: rcns_to_indices[r.get_rule_class_name()])
+        return [CompatibilityResult(rule, frozenset()) for rule in surviving_rules]
+
+    def _get_surviving_rcns(self, sorted_rules):
+        """
+        Rules which are later in the sort order KO the rules they're incompatible with.
+
+        :param sorted_rules: list of MergeRule
+        :return: set of rule class names
+        """
+        compat_results = self._compatibility_checker.compatibility_check(sorted_rules)
+        return set(CCRMerger2._get_surviving_rcns_in_order(compat_results))
+
+    def _create_prepared_rules(self, app_crs, non_app_crs, rcns_to_fingerprints):
+        """
+        Merges and prepares one rule for the non-app rules, plus one more for each
+        app rule. When merging incrementally, a merged rule is only rebuilt if
+        the rules which went into it changed.
+        """
+        merge_groups = [non_app_crs]
         for app_cr in app_crs:
             with_one_app = list(non_app_crs)
             with_one_app.append(app_cr)
-            merged_rules.append(self._merging_strategy.merge_into_single(with_one_app))
-        return merged_rules
+            merge_groups.append(with_one_app)
 
-    @staticmethod
-    def _create_contexts(app_crs, rcns_to_details):
+        prepared_rules = []
+        for merge_group in merge_groups:
+            prepared_rule = self._get_prepared_rule(merge_group, rcns_to_fingerprints)
+            if prepared_rule is not None:
+                prepared_rules.append(prepared_rule)
+        return prepared_rules
+
+    def _create_shared_rules_and_contexts(self, app_crs, non_app_crs, rcns_to_details, rcns_to_fingerprints):
+        """
+        Merges the non-app rules into one prepared rule which every RepeatRule
+        references, so the global commands are only compiled once. Each app context
+        gets a RepeatRule which chains the shared rule with a small "delta" rule
+        made from only that context's app rules.
+
+        The RepeatRules will carry their own contexts so that they can all be
+        loaded into a single grammar.
+
+        :param app_crs: list of CompatibilityResult for app rules
+        :param non_app_crs: list of CompatibilityResult for non-app rules
+        :param rcns_to_details: map of {rule class name: rule details}
+        :param rcns_to_fingerprints: map of {rule class name: ManagedRule fingerprint}
+        :return: list of (list of prepared rules, context) tuples, the non-app one first
+        """
+        shared_rule = self._get_prepared_rule(non_app_crs, rcns_to_fingerprints)
+        shared_rules = [shared_rule] if shared_rule is not None else []
+
+        app_cr_groups = collections.OrderedDict()
+        contexts = {}
+        for cr in app_crs:
+            details = rcns_to_details[cr.rule_class_name()]
+            context_key = CCRMerger2._get_context_key(details)
+            if context_key not in app_cr_groups:
+                app_cr_groups[context_key] = []
+                contexts[context_key] = self._context_factory(executable=details.executable, title=details.title)
+            app_cr_groups[context_key].append(cr)
+
+        prepared_rules_and_contexts = []
+        negation_context = None
+        for context_key, app_cr_group in app_cr_groups.items():
+            context = contexts[context_key]
+            delta_rule = self._get_prepared_rule(app_cr_group, rcns_to_fingerprints, False)
+            prepared_rules_and_contexts.append((shared_rules + [delta_rule], context))
+            if negation_context is None:
+                negation_context = ~context
+            else:
+                negation_context &= ~context
+        if shared_rule is not None:
+            prepared_rules_and_contexts.insert(0, (shared_rules, negation_context))
+        return prepared_rules_and_contexts
+
+    def _get_prepared_rule(self, merge_group, rcns_to_fingerprints, track_available_commands=True):
+        """
+        :param merge_group: list of CompatibilityResult
+        :param rcns_to_fingerprints: map of {rule class name: ManagedRule fingerprint}
+        :param track_available_commands: see MergeRule.prepare_for_merger
+        :return: prepared rule, or None if the group merged to nothing
+        """
+        if self._rule_state_cache is None:
+            return self._merge_and_prepare(merge_group, track_available_commands)
+
+        group_key = RuleStateCache.create_group_key(merge_group, rcns_to_fingerprints)
+        prepared_rule = self._rule_state_cache.get_prepared_rule(group_key)
+        if prepared_rule is None:
+            prepared_rule = self._merge_and_prepare(merge_group, track_available_commands)
+            self._rule_state_cache.put_prepared_rule(group_key, prepared_rule)
+        return prepared_rule
+
+    def _merge_and_prepare(self, merge_group, track_available_commands):
+        merged_rule = self._merging_strategy.merge_into_single(merge_group)
+        if merged_rule is None:
+            return None
+        return merged_rule.prepare_for_merger(track_available_commands)
+
+    def _create_contexts(self, app_crs, rcns_to_details):
         """
         Returns a list of AppContexts, based on 'executable', one for each
         app rule, and if more than zero app rules, the negation context for the
@@ -149,7 +508,7 @@ class CCRMerger2(object):
         negation_context = None
         for cr in app_crs:
             details = rcns_to_details[cr.rule_class_name()]
-            context = AppContext(executable=details.executable, title=details.title)
+            context = self._context_factory(executable=details.executable, title=details.title)
             contexts.append(context)
             if negation_context is None:
                 negation_context = ~context
@@ -158,6 +517,38 @@ class CCRMerger2(object):
         contexts.insert(0, negation_context)
         return contexts
 
+    @staticmethod
+    def _get_context_key(details):
+        """
+        App rules with the same executable and title are active at the same time.
+
+        :param details: RuleDetails
+        :return: hashable
+        """
+        return repr(details.executable), repr(details.title)
+
+    @staticmethod
+    def _create_merge_result_key(managed_rules, rule_sorter, rcns_to_fingerprints):
+        """
+        The same rules, with the same content, in the same order, always merge the same way.
+
+        :return: tuple
+        """
+        return (rule_sorter.__class__.__name__,
+                tuple((mr.get_rule_class_name(), rcns_to_fingerprints[mr.get_rule_class_name()])
+                      for mr in managed_rules))
+
+    @staticmethod
+    def _rule_fingerprints_dict(managed_rules):
+        """
+        :param managed_rules: list of ManagedRule
+        :return: dict of {class name (str): fingerprint (str)}
+        """
+        result = {}
+        for managed_rule in managed_rules:
+            result[managed_rule.get_rule_class_name()] = managed_rule.get_fingerprint()
+        return result
+
     @staticmethod
     def _rule_details_dict(managed_rules):
         """
@@ -169,9 +560,8 @@ class CCRMerger2(object):
             result[managed_rule.get_rule_class_name()] = managed_rule.get_details()
         return result
 
-    def _create_repeat_rule(self, merge_rule):
-        merge_rule = merge_rule.prepare_for_merger()
-        alts = [RuleRef(rule=merge_rule)]  # +[RuleRef(rule=sm) for sm in selfmod]
+    def _create_repeat_rule(self, prepared_rules, context=None):
+        alts = [RuleRef(rule=prepared_rule) for prepared_rule in prepared_rules]
         single_action = Alternative(alts)
         sequence = Repetition(single_action, min=1, max=self._max_repetitions, name=CCRMerger2._SEQ)
         original = Alternative(alts, name=CCRMerger2._ORIGINAL)
@@ -193,7 +583,20 @@ class CCRMerger2(object):
                         action.execute()
                 if _terminal is not None: _terminal.execute()
 
-        return RepeatRule(name=self._get_new_rule_name())
+        return RepeatRule(name=self._get_new_rule_name(), context=context)
+
+    @staticmethod
+    def _create_standalone_rule(rule, context=None):
+        """
+        :param rule: MergeRule which was moved out of CCR
+        :param context: Context for the rule to carry, or None
+        :return: MappingRule
+        """
+        return MappingRule(name=rule.get_rule_class_name(),
+                           mapping=rule.get_mapping(),
+                           extras=rule.get_extras(),
+                           defaults=rule.get_defaults(),
+                           context=context)
 
     def _get_new_rule_name(self):
         self._sequence += 1
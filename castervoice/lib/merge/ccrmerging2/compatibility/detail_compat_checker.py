@@ -1,7 +1,6 @@
 from castervoice.lib.merge.ccrmerging2.compatibility.base_compat_checker import BaseCompatibilityChecker
 from castervoice.lib.merge.ccrmerging2.compatibility.compat_result import CompatibilityResult
 from castervoice.lib.util.bidi_graph import BiDiGraph
-from castervoice.lib.util.hashable_list import HashableList
 
 
 class DetailCompatibilityChecker(BaseCompatibilityChecker):
@@ -48,11 +47,12 @@ class DetailCompatibilityChecker(BaseCompatibilityChecker):
             if len(gomir) == 1:
                 continue
 
-            if gomir.get_string() in previously_computed_groups:
+            group_key = tuple(gomir)
+            if group_key in previously_computed_groups:
                 continue
-            previously_computed_groups.add(gomir.get_string())
+            previously_computed_groups.add(group_key)
 
-            graph.add(*gomir.get_list())
+            graph.add(*gomir)
 
         '''
         3. Convert the incompatibility graph to a list of compat results.
@@ -72,10 +72,11 @@ class DetailCompatibilityChecker(BaseCompatibilityChecker):
         further processing and (B) preserves which specs are responsible,
         in case we want a hook in here or something like that.
 
-        Format is a space delimited string with a leading space
+        Rules are added in the order they are processed, so identical groups
+        end up as identical lists and can be deduplicated as tuples.
         """
 
         for spec in rule_specs:
             if spec not in specs_to_rules:
-                specs_to_rules[spec] = HashableList()
-            specs_to_rules[spec].add(rule.get_rule_class_name())
+                specs_to_rules[spec] = []
+            specs_to_rules[spec].append(rule.get_rule_class_name())
@@ -0,0 +1,102 @@
+from castervoice.lib.merge.ccrmerging2.compatibility.base_compat_checker import BaseCompatibilityChecker
+from castervoice.lib.merge.ccrmerging2.compatibility.compat_result import CompatibilityResult
+from castervoice.lib.merge.ccrmerging2.compatibility import spec_expansion
+
+
+class IndexedCompatibilityChecker(BaseCompatibilityChecker):
+    """
+    Eliminates incompatible rules using the provided order,
+    like SimpleCompatibilityChecker, but:
+
+    1. compares expanded specs rather than raw spec strings, so
+       "[go to] line <n>" and "line <n>" are found to conflict, and
+    2. keeps an index of which rules conflict with which between checks.
+       Only rules which are new or have been reloaded since the last check
+       get their specs expanded and indexed again.
+    """
+
+    def __init__(self, max_expansions=64):
+        """
+        :param max_expansions: int, specs with more expanded forms than this
+            are only compared by their normalized form
+        """
+        self._max_expansions = max_expansions
+        # {rcn: (rule, frozenset of forms)}
+        self._indexed_rules = {}
+        # {form: set of rcns}
+        self._forms_to_rcns = {}
+        # {rcn: {other rcn: number of forms they share}}
+        self._conflicts = {}
+
+    def compatibility_check(self, mergerules):
+        mergerules = list(mergerules)
+        for rule in mergerules:
+            self.update_rule(rule)
+
+        accepted_rcns = set()
+        results = []
+        for rule in reversed(mergerules):
+            rcn = rule.get_rule_class_name()
+            if self._conflicts_with_any(rcn, accepted_rcns):
+                continue
+            accepted_rcns.add(rcn)
+            results.append(CompatibilityResult(rule, frozenset()))
+
+        return list(reversed(results))
+
+    def update_rule(self, rule):
+        """
+        Indexes the specs of a rule, replacing whatever was indexed for
+        its rule class name before. Does nothing if this exact rule
+        instance is already indexed.
+
+        :param rule: MergeRule
+        """
+        rcn = rule.get_rule_class_name()
+        if rcn in self._indexed_rules and self._indexed_rules[rcn][0] is rule:
+            return
+        self.remove_rule(rcn)
+
+        forms = set()
+        for spec in rule.get_mapping().keys():
+            forms.update(spec_expansion.expand_spec(spec, self._max_expansions))
+
+        conflicts = {}
+        for form in forms:
+            rcns = self._forms_to_rcns.setdefault(form, set())
+            for other_rcn in rcns:
+                conflicts[other_rcn] = conflicts.get(other_rcn, 0) + 1
+                other_conflicts = self._conflicts[other_rcn]
+                other_conflicts[rcn] = other_conflicts.get(rcn, 0) + 1
+            rcns.add(rcn)
+
+        self._indexed_rules[rcn] = (rule, frozenset(forms))
+        self._conflicts[rcn] = conflicts
+
+    def remove_rule(self, rcn):
+        """
+        :param rcn: str, rule class name
+        """
+        if rcn not in self._indexed_rules:
+            return
+        _, forms = self._indexed_rules.pop(rcn)
+        for form in forms:
+            rcns = self._forms_to_rcns[form]
+            rcns.discard(rcn)
+            if len(rcns) == 0:
+                del self._forms_to_rcns[form]
+        for other_rcn in self._conflicts.pop(rcn):
+            del self._conflicts[other_rcn][rcn]
+
+    def get_conflicting_rule_class_names(self, rcn):
+        """
+        :param rcn: str, rule class name
+        :return: set of rule class names of indexed rules sharing a spec form with it
+        """
+        return set(self._conflicts.get(rcn, {}))
+
+    def _conflicts_with_any(self, rcn, rcns):
+        conflicts = self._conflicts[rcn]
+        if len(conflicts) < len(rcns):
+            return any(other_rcn in rcns for other_rcn in conflicts)
+        return any(other_rcn in conflicts for other_rcn in rcns)
@@ -0,0 +1,81 @@
+import re
+
+_TOKEN_PATTERN = re.compile(r"\[|\]|\(|\)|\||[^\s\[\]()|]+")
+
+
+class _CannotExpand(Exception):
+    pass
+
+
+def expand_spec(spec, max_forms):
+    """
+    Expands a Dragonfly spec into every word sequence it can match, with
+    [optional] parts both included and left out and each (alternative | choice)
+    taken in turn. Extras like <n> are kept as they are.
+
+    "[go to] line <n>" -> ["go to line <n>", "line <n>"]
+
+    If the spec has more than max_forms expansions, or can't be parsed,
+    only its normalized form is returned.
+
+    :param spec: str
+    :param max_forms: int
+    :return: list of str
+    """
+    tokens = _TOKEN_PATTERN.findall(spec.lower())
+    try:
+        forms, index = _expand_alternatives(tokens, 0, max_forms)
+        if index != len(tokens):
+            raise _CannotExpand()
+    except (_CannotExpand, IndexError):
+        return [normalize_spec(spec)]
+    expanded = []
+    for form in forms:
+        joined = " ".join(form)
+        if len(joined) > 0 and joined not in expanded:
+            expanded.append(joined)
+    return expanded
+
+
+def normalize_spec(spec):
+    """
+    :param spec: str
+    :return: str, lowercased and with consistent whitespace
+    """
+    return " ".join(_TOKEN_PATTERN.findall(spec.lower()))
+
+
+def _expand_alternatives(tokens, index, max_forms):
+    forms, index = _expand_sequence(tokens, index, max_forms)
+    while index < len(tokens) and tokens[index] == "|":
+        more_forms, index = _expand_sequence(tokens, index + 1, max_forms)
+        forms = forms + more_forms
+        if len(forms) > max_forms:
+            raise _CannotExpand()
+    return forms, index
+
+
+def _expand_sequence(tokens, index, max_forms):
+    forms = [()]
+    while index < len(tokens) and tokens[index] not in ("|", ")", "]"):
+        token = tokens[index]
+        if token == "[":
+            item_forms, index = _expand_alternatives(tokens, index + 1, max_forms)
+            item_forms = item_forms + [()]
+            index = _expect(tokens, index, "]")
+        elif token == "(":
+            item_forms, index = _expand_alternatives(tokens, index + 1, max_forms)
+            index = _expect(tokens, index, ")")
+        else:
+            item_forms = [(token,)]
+            index += 1
+        if len(forms) * len(item_forms) > max_forms:
+            raise _CannotExpand()
+        forms = [form + item_form for form in forms for item_form in item_forms]
+    return forms, index
+
+
+def _expect(tokens, index, token):
+    if tokens[index] != token:
+        raise _CannotExpand()
+    return index + 1
@@ -0,0 +1,66 @@
+from castervoice.lib import printer
+from castervoice.lib.merge.ccrmerging2.complexity.complexity_estimator import ComplexityEstimator
+
+
+class ComplexityBudget(object):
+    """
+    Checks the estimated complexity of each merged CCR rule before it is
+    loaded. A merged rule's complexity is the sum of the complexities of
+    the rules in it, times the maximum number of CCR repetitions.
+
+    Over budget, either only a warning with a per-rule breakdown is printed
+    (WARN), or the lowest priority rules (the earliest in the merge order)
+    are moved out of CCR until every merged rule is under budget (SPLIT).
+    Rules which are moved out stay enabled, but can't be chained.
+    """
+    WARN = "warn"
+    SPLIT = "split"
+
+    def __init__(self, max_complexity, action=WARN, estimator=None):
+        """
+        :param max_complexity: int
+        :param action: ComplexityBudget.WARN or ComplexityBudget.SPLIT
+        :param estimator: ComplexityEstimator
+        """
+        self._max_complexity = max_complexity
+        self._action = action
+        self._estimator = estimator if estimator is not None else ComplexityEstimator()
+
+    def apply(self, merge_groups, max_repetitions, quiet=False):
+        """
+        :param merge_groups: list of lists of CompatibilityResult, one list per merged rule, in merge order
+        :param max_repetitions: int
+        :param quiet: boolean, don't print the warnings (eg. for merges which won't be loaded)
+        :return: tuple of (list of rule class names to move out of CCR, highest complexity after moving them)
+        """
+        overflow_rcns = []
+        for merge_group in merge_groups:
+            remaining = [cr for cr in merge_group if cr.rule_class_name() not in overflow_rcns]
+            complexity = self._get_complexity(remaining, max_repetitions)
+            if complexity <= self._max_complexity:
+                continue
+            if not quiet:
+                self._print_breakdown(remaining, complexity)
+            if self._action != ComplexityBudget.SPLIT:
+                continue
+            while complexity > self._max_complexity and len(remaining) > 0:
+                overflow_rcns.append(remaining.pop(0).rule_class_name())
+                complexity = self._get_complexity(remaining, max_repetitions)
+
+        if len(overflow_rcns) > 0 and not quiet:
+            printer.out("Moved out of CCR to stay under the complexity budget: {}".format(", ".join(overflow_rcns)))
+
+        highest_complexity = 0
+        for merge_group in merge_groups:
+            remaining = [cr for cr in merge_group if cr.rule_class_name() not in overflow_rcns]
+            highest_complexity = max(highest_complexity, self._get_complexity(remaining, max_repetitions))
+        return overflow_rcns, highest_complexity
+
+    def _get_complexity(self, compat_results, max_repetitions):
+        return sum(self._estimator.estimate_rule(cr.rule()) for cr in compat_results) * max_repetitions
+
+    def _print_breakdown(self, compat_results, complexity):
+        printer.out("CCR rules are over the complexity budget ({} > {}):".format(complexity, self._max_complexity))
+        scored_rcns = [(self._estimator.estimate_rule(cr.rule()), cr.rule_class_name()) for cr in compat_results]
+        for score, rcn in sorted(scored_rcns, reverse=True):
+            printer.out("    {}: {}".format(rcn, score))
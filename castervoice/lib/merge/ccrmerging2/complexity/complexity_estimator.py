@@ -0,0 +1,62 @@
+from dragonfly import Dictation, ListRef, Literal, Repetition, RuleRef
+
+
+class ComplexityEstimator(object):
+    """
+    Estimates how hard a rule will be for the speech engine, in roughly
+    "compiled words": every word of a literal counts once, each alternative
+    of a Choice counts as much as its words, an integer counts as much as
+    the number words needed to say its range, and a list counts as much
+    as its items. A Repetition counts as much as its child times its
+    maximum number of repetitions. A free dictation slot counts as
+    DICTATION_COST.
+
+    Rules referenced through RuleRefs (including IntegerRefSTs) are compiled
+    once per grammar, so each referenced rule is only counted the first
+    time it is found; later references only cost REFERENCE_COST.
+
+    The scores of MergeRules are kept and reused for as long as the same
+    rule instance keeps being estimated, so unchanged rules are not
+    walked again.
+    """
+    DICTATION_COST = 100
+    REFERENCE_COST = 1
+
+    def __init__(self):
+        # {rcn: (rule, score)}
+        self._rule_scores = {}
+
+    def estimate_rule(self, rule):
+        """
+        :param rule: MergeRule
+        :return: int
+        """
+        rcn = rule.get_rule_class_name()
+        if rcn in self._rule_scores and self._rule_scores[rcn][0] is rule:
+            return self._rule_scores[rcn][1]
+        score = self.estimate_element(rule.element)
+        self._rule_scores[rcn] = (rule, score)
+        return score
+
+    def estimate_element(self, element):
+        """
+        :param element: any Dragonfly element
+        :return: int
+        """
+        return self._estimate(element, set())
+
+    def _estimate(self, element, visited_rules):
+        if isinstance(element, Literal):
+            return len(element.words)
+        if isinstance(element, Dictation):
+            return ComplexityEstimator.DICTATION_COST
+        if isinstance(element, ListRef):
+            return max(len(element.list), 1)
+        if isinstance(element, Repetition):
+            return self._estimate(element._child, visited_rules) * max(element._max - 1, 1)
+        if isinstance(element, RuleRef):
+            if id(element.rule) in visited_rules:
+                return ComplexityEstimator.REFERENCE_COST
+            visited_rules.add(id(element.rule))
+            return ComplexityEstimator.REFERENCE_COST + self._estimate(element.rule.element, visited_rules)
+        return sum(self._estimate(child, visited_rules) for child in element.children)
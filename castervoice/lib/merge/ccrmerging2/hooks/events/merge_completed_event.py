@@ -0,0 +1,11 @@
+from castervoice.lib.merge.ccrmerging2.hooks.events.base_event import BaseHookEvent
+from castervoice.lib.merge.ccrmerging2.hooks.events.event_types import EventType
+
+
+class MergeCompletedEvent(BaseHookEvent):
+    def __init__(self, stats):
+        """
+        :param stats: MergeStats
+        """
+        super(MergeCompletedEvent, self).__init__(EventType.MERGE_COMPLETED)
+        self.stats = stats
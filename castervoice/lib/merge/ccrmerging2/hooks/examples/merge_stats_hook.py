@@ -0,0 +1,27 @@
+from castervoice.lib import printer
+from castervoice.lib.merge.ccrmerging2.hooks.base_hook import BaseHook
+from castervoice.lib.merge.ccrmerging2.hooks.events.event_types import EventType
+
+
+class MergeStatsHook(BaseHook):
+
+    def __init__(self):
+        super(MergeStatsHook, self).__init__(EventType.MERGE_COMPLETED)
+
+    def get_pronunciation(self):
+        return "merge stats"
+
+    def run(self, event):
+        stats = event.stats
+        stages = ", ".join(["{} {:.0f}ms".format(stage, seconds * 1000)
+                            for stage, seconds in stats.stage_seconds.items()])
+        printer.out("CCR merge of {} rules ({} KO'd) into {} rules with {} specs took {:.0f}ms: {}".format(
+            stats.rule_count, stats.ko_count, stats.merged_rule_count, stats.spec_count,
+            stats.get_total_seconds() * 1000, stages))
+        if stats.overflow_count > 0:
+            printer.out("{} rules were moved out of CCR to stay under the complexity budget".format(
+                stats.overflow_count))
+
+
+def get_hook():
+    return MergeStatsHook
@@ -1,9 +1,10 @@
-from dragonfly import Function, MappingRule
+from dragonfly import Function, MappingRule, DictList, DictListRef
 import traceback
 
 from castervoice.lib import printer
 from castervoice.lib.ctrl.mgr.rule_details import RuleDetails
-from castervoice.lib.merge.ccrmerging2.activation_rule_generator import ActivationRuleGenerator
+from castervoice.lib.merge.ccrmerging2.activation_rule_generator import ActivationRuleGenerator, \
+    create_activation_choice
 from castervoice.lib import settings
 
 
@@ -11,6 +12,8 @@ class HooksRunner(ActivationRuleGenerator):
     def __init__(self, config):
         self._hooks = []
         self._hooks_config = config
+        # {pronunciation: hook class name}
+        self._hook_triggers = DictList("hooks")
 
     def add_hook(self, hook_class):
         hook = None
@@ -19,6 +22,7 @@ class HooksRunner(ActivationRuleGenerator):
         try:
             hook = hook_class()
             self._hooks.append(hook)
+            self._hook_triggers[hook.get_pronunciation()] = hook.get_class_name()
         except:
             err = "Error instantiating {}.".format(hook_class.__name__)
             traceback.print_exc()
@@ -37,15 +41,16 @@ class HooksRunner(ActivationRuleGenerator):
         self._hooks_config.save()
 
     def construct_activation_rule(self):
-        m = {}
-        for hook in self._hooks:
-            enable_action = Function(lambda: self._hooks_config.set_hook_active(hook.get_class_name(), True))
-            disable_action = Function(lambda: self._hooks_config.set_hook_active(hook.get_class_name(), False))
-            m["enable {} hook".format(hook.get_pronunciation())] = enable_action
-            m["disable {} hook".format(hook.get_pronunciation())] = disable_action
+        if len(self._hook_triggers) == 0:
+            return None
+        m = {
+            "<active> <hook> hook": Function(lambda active, hook: self._hooks_config.set_hook_active(hook, active))
+        }
+        e = [create_activation_choice(), DictListRef("hook", self._hook_triggers)]
 
         class HooksActivationRule(MappingRule):
             mapping = m
+            extras = e
         details = RuleDetails(name="hooks runner hooks activator rule",
                               watch_exclusion=True)
 
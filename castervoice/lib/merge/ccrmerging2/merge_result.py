@@ -1,11 +1,24 @@
 class MergeResult(object):
 
-    def __init__(self, ccr_rules_and_contexts, all_rule_class_names, rules_enabled_diff):
+    def __init__(self, ccr_rules_and_contexts, all_rule_class_names, rules_enabled_diff, single_grammar=False, stats=None,
+                 standalone_rules_and_contexts=None, indexed_rules=None):
         """
         :param ccr_rules_and_contexts: 1-n RepeatRules and 0-n AppContexts
         :param all_rule_class_names: list of str
         :param rules_enabled_diff: RulesEnabledDiff
+        :param single_grammar: if True, the RepeatRules have their own contexts
+            and should all be loaded into one grammar
+        :param stats: MergeStats
+        :param standalone_rules_and_contexts: 0-n enabled ccr rules which were kept out of the
+            RepeatRules, to be loaded like non-ccr rules, and their AppContexts or None
+        :param indexed_rules: (rule class name, rule, context name) for every enabled ccr rule,
+            for the AvailableCommandsIndex
         """
         self.ccr_rules_and_contexts = ccr_rules_and_contexts
         self.all_rule_class_names = all_rule_class_names
         self.rules_enabled_diff = rules_enabled_diff
+        self.single_grammar = single_grammar
+        self.stats = stats
+        self.standalone_rules_and_contexts = standalone_rules_and_contexts \
+            if standalone_rules_and_contexts is not None else []
+        self.indexed_rules = indexed_rules if indexed_rules is not None else []
@@ -0,0 +1,53 @@
+import collections
+import contextlib
+import time
+
+
+class MergeStats(object):
+    """
+    Measurements of a single CCR merge: how long each stage
+    took and how big the merge was.
+    """
+
+    def __init__(self):
+        self.stage_seconds = collections.OrderedDict()
+        self.rule_count = 0
+        self.ko_count = 0
+        self.merged_rule_count = 0
+        self.spec_count = 0
+        self.extras_count = 0
+        self.overflow_count = 0
+        self.complexity = None
+        self.result_cache_hit = False
+        self.plan_cache_hit = False
+
+    @contextlib.contextmanager
+    def time_stage(self, stage):
+        """
+        Adds the time spent in the with-block to the named stage.
+
+        :param stage: str
+        """
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.add_stage_time(stage, time.time() - start)
+
+    def add_stage_time(self, stage, seconds):
+        self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + seconds
+
+    def get_total_seconds(self):
+        return sum(self.stage_seconds.values())
+
+    def count_prepared_rules(self, prepared_rules):
+        """
+        :param prepared_rules: iterable of prepared rules; rules which are shared are only counted once
+        """
+        counted = set()
+        for prepared_rule in prepared_rules:
+            if id(prepared_rule) in counted:
+                continue
+            counted.add(id(prepared_rule))
+            self.spec_count += len(prepared_rule._mapping)
+            self.extras_count += len(prepared_rule._extras)
@@ -1,4 +1,5 @@
 from castervoice.lib.merge.ccrmerging2.merging.base_merging_strategy import BaseMergingStrategy
+from castervoice.lib.merge.mergerule import MergeRule
 
 
 class ClassicMergingStrategy(BaseMergingStrategy):
@@ -6,6 +7,12 @@ class ClassicMergingStrategy(BaseMergingStrategy):
     This strategy KOs any incompatible rules.
     """
 
+    def __init__(self, extras_interner=None):
+        """
+        :param extras_interner: ExtrasInterner, or None to merge extras by name only
+        """
+        self._extras_interner = extras_interner
+
     def merge_into_single(self, sorted_checked_rules):
         """
         Merge any rules which aren't KO'd by their peers.
@@ -25,7 +32,7 @@ class ClassicMergingStrategy(BaseMergingStrategy):
             indices_map[compat_result.rule_class_name()] = index
 
         # rules with higher indices (activated "later") get priority
-        merged_rule = None
+        surviving_rules = []
         for index in rule_range:
             compat_result = sorted_checked_rules[index]
             ko = False
@@ -37,8 +44,5 @@ class ClassicMergingStrategy(BaseMergingStrategy):
                     ko = True
                     break
             if not ko:
-                if merged_rule is None:
-                    merged_rule = compat_result.rule()
-                else:
-                    merged_rule = merged_rule.merge(compat_result.rule())
-        return merged_rule
+                surviving_rules.append(compat_result.rule())
+        return MergeRule.merge_all(surviving_rules, self._extras_interner)
@@ -0,0 +1,113 @@
+from dragonfly import Choice, Dictation, Integer, ListRef, RuleRef, RuleWrap
+
+from castervoice.lib import printer
+
+
+class ExtrasInterner(object):
+    """
+    Merged rules get the extras of all of their rules. Many rules declare the same
+    extras (e.g. IntegerRefST("n", 1, 50)), each of which would otherwise be compiled
+    separately, or inline in every spec which uses it.
+
+    The interner finds extras which are structurally the same (same type and
+    same range or choices, whatever their names) and makes them all refer to
+    one shared, private rule, which the engine compiles once per grammar.
+    The extras it hands out are kept, so merging the same rules again gives
+    the very same extras.
+
+    When two merged rules have different extras with the same name, the later
+    rule's extra wins, as before, but the conflict is reported (once).
+    """
+
+    def __init__(self):
+        # {signature: Rule}
+        self._shared_rules = {}
+        # {(signature, name, default repr): RuleRef}
+        self._shared_refs = {}
+        # set of (name, rcn, rcn)
+        self._reported_conflicts = set()
+
+    def intern_extras(self, rules):
+        """
+        :param rules: list of MergeRule, in merge order: later rules win
+        :return: list of extras for the merged rule, one per name
+        """
+        extras = {}
+        signatures = {}
+        owners = {}
+        for rule in rules:
+            rcn = rule.get_rule_class_name()
+            for name, element in rule._extras.items():
+                signature = ExtrasInterner.get_signature(element)
+                if name in signatures and signatures[name] != signature:
+                    self._report_conflict(name, owners[name], rcn)
+                extras[name] = self._intern(name, element, signature)
+                signatures[name] = signature
+                owners[name] = rcn
+        return list(extras.values())
+
+    @staticmethod
+    def get_signature(element):
+        """
+        Identifies what an extra recognizes and what value it produces, regardless of its name.
+
+        :param element: any Dragonfly element
+        :return: hashable
+        """
+        if isinstance(element, RuleWrap):
+            content_signature = ExtrasInterner._get_content_signature(element.rule.element)
+            if content_signature is not None:
+                return ("wrapped", content_signature, repr(element.default))
+        elif isinstance(element, Choice):
+            content_signature = ExtrasInterner._get_content_signature(element)
+            if content_signature is not None:
+                return ("wrapped", content_signature, repr(element.default))
+        elif isinstance(element, RuleRef):
+            return "ref", id(element.rule), repr(element.default)
+        elif isinstance(element, ListRef):
+            return "list", id(element.list), repr(element.default)
+        elif isinstance(element, Dictation):
+            return ("dictation", element._format_words, tuple(element._string_methods),
+                    repr(element.default))
+        return "id", id(element)
+
+    @staticmethod
+    def _get_content_signature(element):
+        """
+        :return: hashable, or None if the element can't be shared
+        """
+        if isinstance(element, Integer):
+            return "integer", element._min, element._max, id(element._content)
+        if isinstance(element, Choice) and not element._extras:
+            return "choice", tuple(sorted((spec, repr(value)) for spec, value in element._choices.items()))
+        return None
+
+    def _intern(self, name, element, signature):
+        if signature[0] != "wrapped":
+            return element
+        ref_key = (signature[1], name, signature[2])
+        if ref_key in self._shared_refs:
+            return self._shared_refs[ref_key]
+
+        shared_rule = self._shared_rules.get(signature[1])
+        if shared_rule is None:
+            if isinstance(element, RuleWrap):
+                self._shared_refs[ref_key] = element
+                self._shared_rules[signature[1]] = element.rule
+                return element
+            wrapped = RuleWrap(name, element, default=element.default)
+            self._shared_refs[ref_key] = wrapped
+            self._shared_rules[signature[1]] = wrapped.rule
+            return wrapped
+
+        shared_ref = RuleRef(rule=shared_rule, name=name, default=element.default)
+        self._shared_refs[ref_key] = shared_ref
+        return shared_ref
+
+    def _report_conflict(self, name, rcn, later_rcn):
+        conflict = (name, rcn, later_rcn)
+        if conflict in self._reported_conflicts:
+            return
+        self._reported_conflicts.add(conflict)
+        printer.out("Extra <{}> is defined differently by {} and {}: {}'s is used for both.".format(
+            name, rcn, later_rcn, later_rcn))
@@ -1,11 +1,12 @@
 import traceback
 
-from dragonfly import Function, MappingRule
+from dragonfly import Function, MappingRule, DictList, DictListRef
 
 from castervoice.lib import printer
 from castervoice.lib.ctrl.mgr.errors.invalid_transformation_error import InvalidTransformationError, ITMessage
 from castervoice.lib.ctrl.mgr.rule_details import RuleDetails
-from castervoice.lib.merge.ccrmerging2.activation_rule_generator import ActivationRuleGenerator
+from castervoice.lib.merge.ccrmerging2.activation_rule_generator import ActivationRuleGenerator, \
+    create_activation_choice
 from castervoice.lib.merge.mergerule import MergeRule
 
 
@@ -14,6 +15,8 @@ class TransformersRunner(ActivationRuleGenerator):
     def __init__(self, config):
         self._transformers_config = config
         self._transformers = []
+        # {pronunciation: transformer class name}
+        self._transformer_triggers = DictList("transformers")
 
     def add_transformer(self, transformer_class):
         transformer = None
@@ -34,24 +37,31 @@ class TransformersRunner(ActivationRuleGenerator):
 
         if self._transformers_config.is_transformer_active(transformer.get_class_name()):
             self._transformers.append(transformer)
+            self._transformer_triggers[transformer.get_pronunciation()] = transformer.get_class_name()
 
     def construct_activation_rule(self):
-        m = {}
-        for t in self._transformers:
-            enable_action = \
-                Function(lambda: self._transformers_config.set_transformer_active(t.get_class_name(), True))
-            disable_action = \
-                Function(lambda: self._transformers_config.set_transformer_active(t.get_class_name(), False))
-            m["enable {} transformer".format(t.get_pronunciation())] = enable_action
-            m["disable {} transformer".format(t.get_pronunciation())] = disable_action
+        if len(self._transformer_triggers) == 0:
+            return None
+        m = {
+            "<active> <transformer> transformer": Function(
+                lambda active, transformer: self._transformers_config.set_transformer_active(transformer, active))
+        }
+        e = [create_activation_choice(), DictListRef("transformer", self._transformer_triggers)]
 
         class TransformersActivationRule(MappingRule):
             mapping = m
+            extras = e
         details = RuleDetails(name="transformers runner transformers activator rule",
                               watch_exclusion=True)
 
         return TransformersActivationRule, details
 
+    def get_transformer_names(self):
+        """
+        :return: list of the class names of the active transformers, in the order they run
+        """
+        return [transformer.get_class_name() for transformer in self._transformers]
+
     def transform_rule(self, rule_instance):
         r = rule_instance
         orig_class = TransformersRunner._get_rule_class(r)
@@ -3,8 +3,8 @@ import re
 
 from dragonfly import Function, MappingRule
 
-from castervoice.lib import available_commands_tracker, printer
-from castervoice.lib.ctrl.mgr.rule_formatter import _set_rdescripts
+from castervoice.lib import available_commands_index, printer
+from castervoice.lib.ctrl.mgr.rule_formatter import _set_rdescripts, _set_class_rdescripts
 from castervoice.lib.merge.ccrmerging2.pronounceable import Pronounceable
 
 
@@ -24,7 +24,10 @@ class MergeRule(MappingRule, Pronounceable):
         _mapping = mapping or self.mapping.copy()
         _extras = extras or self.extras[:]
         _defaults = defaults or self.defaults.copy()
-        _set_rdescripts(_mapping, _name)
+        if mapping is None:
+            _set_class_rdescripts(self.__class__, _name)
+        else:
+            _set_rdescripts(_mapping, _name)
         #
         super(MergeRule, self).__init__(name=_name,
                                         mapping=_mapping,
@@ -45,6 +48,47 @@ class MergeRule(MappingRule, Pronounceable):
                          extras=new_extras,
                          defaults=new_defaults)
 
+    @staticmethod
+    def _print_available_commands():
+        index = available_commands_index.get_instance()
+        printer.out(index.format_commands(index.get_commands()))
+
+    @staticmethod
+    def merge_all(rules, extras_interner=None):
+        """
+        Merges any number of rules in a single pass. The result is the same as
+        folding the rules together with merge(), where later rules win, but the
+        mapping, extras, and defaults are each built once and no intermediate
+        rules are created (each of which would copy and re-parse every spec).
+
+        :param rules: list of MergeRule
+        :param extras_interner: ExtrasInterner for sharing identical extras, or None
+        :return: MergeRule, or None if there were no rules
+        """
+        if len(rules) == 0:
+            return None
+        if len(rules) == 1:
+            return rules[0]
+
+        mapping = {}
+        extras = {}
+        defaults = {}
+        for rule in rules:
+            mapping.update(rule._mapping)
+            defaults.update(rule._defaults)
+            if extras_interner is None:
+                extras.update(rule._extras)
+        extras = extras.values() if extras_interner is None else extras_interner.intern_extras(rules)
+
+        # the rules' actions already have their rdescripts, so skip MergeRule.__init__
+        merged_rule = MergeRule.__new__(MergeRule)
+        MappingRule.__init__(merged_rule,
+                             name=merged_rule.get_rule_class_name(),
+                             mapping=mapping,
+                             extras=list(extras),
+                             defaults=defaults)
+        return merged_rule
+
     def to_mapping_rule(self):
         return MappingRule(mapping=self.get_mapping(),
                            extras=self.get_extras(),
@@ -62,14 +106,17 @@ class MergeRule(MappingRule, Pronounceable):
     def get_pronunciation(self):
         return self.pronunciation if self.pronunciation is not None else self._name
 
-    def prepare_for_merger(self):
+    def prepare_for_merger(self, track_available_commands=True):
         """
         The OrderedDict is an optimization for Kaldi engine,
         won't make a difference to other engines.
 
         This is also the appropriate place to add the "list available commands"
-        command, since this happens post-merge.
+        command, since this happens post-merge. The commands themselves are
+        only looked up in the AvailableCommandsIndex when it's spoken.
 
+        :param track_available_commands: False for rules which are only merged
+            on top of another prepared rule, which already has the command
         :return: MergeRule
         """
 
@@ -80,10 +127,9 @@ class MergeRule(MappingRule, Pronounceable):
         for spec in ordered_specs:
             ordered_dict[spec] = self._mapping[spec]
 
-        act = available_commands_tracker.get_instance()
-        act.set_available_commands("\n".join(ordered_specs))
-        # TODO: bring back metarule
-        ordered_dict["list available commands"] = Function(lambda: printer.out(act.get_available_commands()))
+        if track_available_commands:
+            # TODO: bring back metarule
+            ordered_dict["list available commands"] = Function(MergeRule._print_available_commands)
 
         extras_copy = self.get_extras()
         defaults_copy = self.get_defaults()
@@ -93,7 +139,8 @@ class MergeRule(MappingRule, Pronounceable):
             extras = extras_copy
             defaults = defaults_copy
 
-        return PreparedRule()
+        # only ever used through RuleRefs; unique names let several share a grammar
+        return PreparedRule(name="PreparedRule{}".format(MergeRule._get_next_id()), exported=False)
 
     def get_rule_class_name(self):
         return self.__class__.__name__
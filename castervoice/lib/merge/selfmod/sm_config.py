@@ -1,15 +1,52 @@
 import copy
+import os
+
 from castervoice.lib.config.config_toml import TomlConfig
 
 
 class SelfModStateSavingConfig(TomlConfig):
+    """
+    Selfmod rules load their state every time they're instantiated. The state
+    of each file is kept in memory once it's read or saved, and the file is
+    only read again when its modification time or size changes.
+    """
+
+    # {config path: ((mtime, size), config)}
+    _loaded_configs = {}
 
     def __init__(self, config_path):
         super(SelfModStateSavingConfig, self).__init__(config_path)
 
+    def load(self):
+        file_stamp = self._get_file_stamp()
+        loaded = SelfModStateSavingConfig._loaded_configs.get(self._config_path)
+        if file_stamp is not None and loaded is not None and loaded[0] == file_stamp:
+            self._config = copy.deepcopy(loaded[1])
+            return
+        super(SelfModStateSavingConfig, self).load()
+        self._remember()
+
+    def save(self):
+        super(SelfModStateSavingConfig, self).save()
+        self._remember()
+
     def replace(self, config):
         self._config = config
         self.save()
 
     def get_copy(self):
         return copy.deepcopy(self._config.copy())
+
+    def _remember(self):
+        file_stamp = self._get_file_stamp()
+        if file_stamp is None:
+            SelfModStateSavingConfig._loaded_configs.pop(self._config_path, None)
+            return
+        SelfModStateSavingConfig._loaded_configs[self._config_path] = (file_stamp, copy.deepcopy(self._config))
+
+    def _get_file_stamp(self):
+        try:
+            stat = os.stat(self._config_path)
+        except (IOError, OSError):
+            return None
+        return stat.st_mtime, stat.st_size
@@ -252,6 +252,12 @@ def _get_defaults():
                 str(Path(_USER_DIR).joinpath("data/sm_chain_aliases.toml")),
             "SM_HISTORY_PATH":
                 str(Path(_USER_DIR).joinpath("data/sm_history.toml")),
+            "MERGE_PLAN_CACHE_PATH":
+                str(Path(_USER_DIR).joinpath("data/merge_plan_cache.json")),
+            "CONTENT_MANIFEST_PATH":
+                str(Path(_USER_DIR).joinpath("data/content_manifest.json")),
+            "VALIDATION_CACHE_PATH":
+                str(Path(_USER_DIR).joinpath("data/validation_cache.json")),
             "RULES_CONFIG_PATH":
                 str(Path(_USER_DIR).joinpath("settings/rules.toml")),
             "TRANSFORMERS_CONFIG_PATH":
@@ -384,6 +390,66 @@ def _get_defaults():
             "reload_timer_seconds": 5, # seconds
         },
 
+        # grammar loading section
+        "grammar_loading": {
+            "pack_non_ccr_rules": False, # one grammar per context for non-CCR rules; also implies reuse_grammars; a rule which fails to load takes its whole grammar down
+            "dispatch_contexts": True, # classify the foreground window once for all app contexts
+            "context_cache_size": 32, # windows
+            "content_manifest": True, # only scan new or changed content files at startup
+            "lazy_rules": True, # only import disabled rules when they're first enabled
+            "validation_cache": True, # skip validating rules whose files haven't changed
+            "validation_workers": 0, # threads validating rules while the rest are imported; can hang Python 2 startup under Natlink
+        },
+
+        # CCR merging section
+        "ccr_merging": {
+            "incremental": True,  # only rebuild the merged rules affected by a change
+            "shared_layout": False,  # compile global CCR commands once, app CCR rules only add their own; not yet tested on a real engine
+            "result_cache_size": 8,  # recently merged rule sets to keep for instant reuse, 0 to disable
+            "plan_cache": True,  # remember which rules survive merging across restarts
+            "indexed_compat_check": False,  # also catch conflicts hidden by [optional] and (alternative) words; KOs stock rule pairs which used to coexist
+            "compat_expansion_limit": 64,  # specs with more forms than this are only compared as written
+            "complexity_budget": 150000,  # estimated size of a merged CCR rule to warn at, 0 to disable
+            "complexity_action": "warn",  # "warn", or "split" to move the lowest priority rules out of CCR
+            "background_merge": False,  # merge on a worker thread so that speech is still processed meanwhile; not yet measured on Natlink
+            "predicted_merges": 2,  # likely next CCR rule sets to merge ahead of time, 0 to disable; needs background_merge
+            "reuse_grammars": True,  # keep loaded CCR grammars which a merge didn't change
+            "intern_extras": True,  # compile identical extras (e.g. <n> 1-50) once, report conflicting ones
+        },
+
+        # language switching section
+        "language_switching": {
+            "enabled": False,  # keep only the CCR language rule of the file in the window title enabled
+            "poll_seconds": 0.5,  # how often to check the window title
+            "debounce_seconds": 1.0,  # how long a file has to stay in the foreground before switching
+            "extensions": {
+                "py": "Python",
+                "rs": "Rust",
+                "java": "Java",
+                "js": "Javascript",
+                "ts": "Javascript",
+                "c": "CPP",
+                "cpp": "CPP",
+                "h": "CPP",
+                "hpp": "CPP",
+                "cs": "CSharp",
+                "go": "Go",
+                "dart": "Dart",
+                "hx": "Haxe",
+                "html": "HTML",
+                "htm": "HTML",
+                "tex": "LaTeX",
+                "md": "Markdown",
+                "m": "Matlab",
+                "pl": "Prolog",
+                "r": "Rlang",
+                "sh": "Bash",
+                "sql": "SQL",
+                "vhd": "VHDL",
+                "vhdl": "VHDL",
+            },
+        },
+
         "formats": {
             "_default": {
                 "text_format": [5, 0],
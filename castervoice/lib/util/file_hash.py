@@ -0,0 +1,15 @@
+import hashlib
+
+
+def get_hash_of_file(file_path):
+    """
+    Gets the hash of a file.
+
+    :param file_path: str
+    :return: hex string hash
+    """
+    md5_hasher = hashlib.md5()
+    with open(file_path, 'rb') as f:
+        buf = f.read()
+        md5_hasher.update(buf)
+    return md5_hasher.hexdigest()
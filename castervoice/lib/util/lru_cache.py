@@ -0,0 +1,39 @@
+import collections
+
+
+class LRUCache(object):
+    """
+    A bounded dict which evicts the least recently used entry
+    when it's full. Keeps count of hits and misses.
+    """
+
+    def __init__(self, max_size):
+        self._max_size = max(int(max_size), 1)
+        self._entries = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        if key not in self._entries:
+            self.misses += 1
+            return default
+        self.hits += 1
+        value = self._entries.pop(key)
+        self._entries[key] = value
+        return value
+
+    def put(self, key, value):
+        if key in self._entries:
+            del self._entries[key]
+        elif len(self._entries) >= self._max_size:
+            self._entries.popitem(last=False)
+        self._entries[key] = value
+
+    def clear(self):
+        self._entries.clear()
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,210 @@
+import collections
+import contextlib
+import functools
+import sys
+import threading
+import time
+
+try:
+    import __builtin__ as builtins  # Python 2
+except ImportError:
+    import builtins
+
+_clock = getattr(time, "perf_counter", time.time)
+
+
+class TimingNode(object):
+    """
+    One step of a timing tree. Steps with the same name and kind under the
+    same parent are combined, and count how often they ran.
+    """
+
+    PHASE = "phase"
+    IMPORT = "import"
+
+    def __init__(self, name, kind):
+        self.name = name
+        self.kind = kind
+        self.seconds = 0.0
+        self.count = 0
+        self._children = collections.OrderedDict()
+
+    def get_child(self, name, kind):
+        key = (kind, name)
+        if key not in self._children:
+            self._children[key] = TimingNode(name, kind)
+        return self._children[key]
+
+    def has_child(self, name, kind):
+        return (kind, name) in self._children
+
+    def remove_child(self, node):
+        self._children.pop((node.kind, node.name), None)
+
+    def get_children(self):
+        return list(self._children.values())
+
+    def get_label(self):
+        return "import " + self.name if self.kind == TimingNode.IMPORT else self.name
+
+    def get_self_seconds(self):
+        """
+        :return: float, the time spent in this step but not in any of its sub-steps
+        """
+        return max(self.seconds - sum(child.seconds for child in self.get_children()), 0.0)
+
+    def walk(self, labels=()):
+        """
+        :return: generator of (tuple of the labels from the root to the node, node)
+        """
+        labels = labels + (self.get_label(),)
+        yield labels, self
+        for child in self.get_children():
+            for item in child.walk(labels):
+                yield item
+
+    def to_dict(self):
+        return {"name": self.name,
+                "kind": self.kind,
+                "seconds": self.seconds,
+                "self_seconds": self.get_self_seconds(),
+                "count": self.count,
+                "children": [child.to_dict() for child in self.get_children()]}
+
+
+class StartupProfiler(object):
+    """
+    Records a tree of how long each phase of startup took, and nested in it,
+    how long each module took to import.
+
+    Phases are marked with the phase context manager, or by wrapping existing
+    methods with wrap. Imports are timed by replacing __import__ between start
+    and stop; only imports which actually load something are recorded.
+    Only the thread which created the profiler is timed.
+    """
+
+    def __init__(self, clock=None):
+        self._clock = clock if clock is not None else _clock
+        self._thread = threading.current_thread()
+        self.root = TimingNode("startup", TimingNode.PHASE)
+        self._stack = [self.root]
+        self._started = None
+        self._original_import = None
+        # (owner, attribute name, original value or None)
+        self._wrapped = []
+
+    def start(self):
+        self._started = self._clock()
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._timed_import
+
+    def stop(self):
+        """
+        Stops timing imports and restores all wrapped methods.
+        """
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+        for owner, attribute_name, original in reversed(self._wrapped):
+            if original is None:
+                delattr(owner, attribute_name)
+            else:
+                setattr(owner, attribute_name, original)
+        self._wrapped = []
+        if self._started is not None:
+            self.root.seconds = self._clock() - self._started
+            self.root.count = 1
+
+    @contextlib.contextmanager
+    def phase(self, name, kind=TimingNode.PHASE):
+        if threading.current_thread() is not self._thread:
+            yield
+            return
+        node = self._stack[-1].get_child(name, kind)
+        self._stack.append(node)
+        started = self._clock()
+        try:
+            yield
+        finally:
+            node.seconds += self._clock() - started
+            node.count += 1
+            self._stack.pop()
+
+    def wrap(self, owner, attribute_name, name):
+        """
+        Makes a method of a class time itself as a phase until the profiler is stopped.
+
+        :param owner: class
+        :param attribute_name: str, the method's name
+        :param name: str, or fn(same args as the method) -> str, the name of the phase
+        """
+        function = getattr(owner, attribute_name)
+        profiler = self
+
+        @functools.wraps(function)
+        def timed(*args, **kwargs):
+            with profiler.phase(name(*args, **kwargs) if callable(name) else name):
+                return function(*args, **kwargs)
+
+        self._wrapped.append((owner, attribute_name, owner.__dict__.get(attribute_name)))
+        setattr(owner, attribute_name, timed)
+
+    def get_imports(self):
+        """
+        :return: list of dicts of the total and self time of each imported module, slowest first
+        """
+        imports = collections.OrderedDict()
+        for labels, node in self.root.walk():
+            if node.kind != TimingNode.IMPORT:
+                continue
+            entry = imports.setdefault(node.name, {"module": node.name, "seconds": 0.0,
+                                                   "self_seconds": 0.0, "count": 0})
+            entry["seconds"] += node.seconds
+            entry["self_seconds"] += node.get_self_seconds()
+            entry["count"] += node.count
+        return sorted(imports.values(), key=lambda entry: entry["self_seconds"], reverse=True)
+
+    def to_dict(self):
+        return {"total_seconds": self.root.seconds,
+                "phases": self.root.to_dict(),
+                "imports": self.get_imports()}
+
+    def to_folded(self):
+        """
+        :return: list of str, the tree in the "folded stacks" format of flame graph tools,
+            weighted by self time in microseconds
+        """
+        lines = []
+        for labels, node in self.root.walk():
+            microseconds = int(round(node.get_self_seconds() * 1000000))
+            if microseconds > 0:
+                stack = ";".join(label.replace(";", ",") for label in labels)
+                lines.append("{} {}".format(stack, microseconds))
+        return lines
+
+    def _timed_import(self, name, *args, **kwargs):
+        module_name = StartupProfiler._get_absolute_name(name, args, kwargs)
+        if module_name in sys.modules or threading.current_thread() is not self._thread:
+            return self._original_import(name, *args, **kwargs)
+        parent = self._stack[-1]
+        is_new = not parent.has_child(module_name, TimingNode.IMPORT)
+        module_count = len(sys.modules)
+        with self.phase(module_name, TimingNode.IMPORT):
+            node = self._stack[-1]
+            try:
+                return self._original_import(name, *args, **kwargs)
+            finally:
+                # eg. failed optional imports, or python 2 relative import lookups
+                if is_new and len(sys.modules) == module_count and len(node.get_children()) == 0:
+                    parent.remove_child(node)
+
+    @staticmethod
+    def _get_absolute_name(name, args, kwargs):
+        import_globals = args[0] if len(args) > 0 else kwargs.get("globals")
+        level = args[3] if len(args) > 3 else kwargs.get("level", 0)
+        if level <= 0 or not import_globals:
+            return name
+        package = import_globals.get("__package__") or import_globals.get("__name__", "")
+        if level > 1:
+            package = package.rsplit(".", level - 1)[0]
+        return package + "." + name if name else package
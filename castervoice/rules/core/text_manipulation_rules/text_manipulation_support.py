@@ -1,7 +1,7 @@
 import re
 from dragonfly import Window
 from castervoice.lib.context import AppContext
-from castervoice.lib import context
+from castervoice.lib import context, control
 from castervoice.lib.actions import Key
 
 contexts = {
@@ -13,10 +13,17 @@ contexts = {
 
 def get_application():
     window = Window.get_foreground()
+    # the dispatcher has usually classified this window already
+    nexus = control.nexus()
+    dispatcher = nexus.context_dispatcher if nexus is not None else None
     # Check all contexts. Return the name of the first one that matches or
     # "standard" if none matched.
-    for name, context in contexts.items():
-        if context.matches(window.executable, window.title, window.handle):
+    for name, app_context in contexts.items():
+        if dispatcher is not None:
+            matches = dispatcher.matches(app_context, window.executable, window.title, window.handle)
+        else:
+            matches = app_context.matches(window.executable, window.title, window.handle)
+        if matches:
             return name
     return "standard"
 
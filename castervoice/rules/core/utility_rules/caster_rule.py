@@ -1,6 +1,6 @@
-from dragonfly import MappingRule, Function, RunCommand, Playback
+from dragonfly import MappingRule, Function, RunCommand, Playback, Dictation
 
-from castervoice.lib import control
+from castervoice.lib import available_commands_index, control, printer
 from castervoice.lib.ctrl.dependencies import find_pip
 from castervoice.lib.ctrl.updatecheck import update
 from castervoice.lib.ctrl.mgr.rule_details import RuleDetails
@@ -22,6 +22,11 @@ class _DependencyUpdate(RunCommand):
             Playback([(["reboot", "dragon"], 0.0)]).execute()
 
 
+def _print_commands_about(text):
+    index = available_commands_index.get_instance()
+    printer.out(index.format_commands(index.find_commands(text.format())))
+
+
 class CasterRule(MappingRule):
     mapping = {
         # update management
@@ -35,7 +40,14 @@ class CasterRule(MappingRule):
             R(Function(lambda: control.nexus().set_ccr_active(True))),
         "disable c c r":
             R(Function(lambda: control.nexus().set_ccr_active(False))),
+
+        # available commands
+        "what can I say about <text>":
+            R(Function(_print_commands_about)),
     }
+    extras = [
+        Dictation("text"),
+    ]
 
 
 def get_rule():
@@ -0,0 +1,48 @@
+"""
+Compares scanning the Caster content directory for rules, transformers
+and hooks without a content manifest, with an empty manifest (cold: the
+first start, which also writes the manifest), and with the manifest
+written by the cold scan (warm: every later start).
+
+Run from the Caster root with:
+    python -m tests.benchmarks.content_scan_benchmark [directory]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import timeit
+
+from castervoice.lib.ctrl.mgr.loading.load.content_manifest import ContentManifest
+from castervoice.lib.ctrl.mgr.loading.load.content_request_generator import ContentRequestGenerator
+
+
+def _scan(directory, manifest_path=None):
+    manifest = ContentManifest(manifest_path) if manifest_path is not None else None
+    return ContentRequestGenerator(manifest).get_all_content_modules(directory)
+
+
+def run(directory, repeat=5):
+    temp_dir = tempfile.mkdtemp()
+    try:
+        manifest_path = os.path.join(temp_dir, "content_manifest.json")
+
+        def scan_cold():
+            if os.path.exists(manifest_path):
+                os.remove(manifest_path)
+            _scan(directory, manifest_path)
+
+        no_manifest = min(timeit.repeat(lambda: _scan(directory), repeat=repeat, number=1))
+        cold = min(timeit.repeat(scan_cold, repeat=repeat, number=1))
+        warm = min(timeit.repeat(lambda: _scan(directory, manifest_path), repeat=repeat, number=1))
+        requests = _scan(directory, manifest_path)
+    finally:
+        shutil.rmtree(temp_dir)
+
+    print("directory: {} ({} content modules)".format(directory, len(requests)))
+    print("no manifest (s)  cold (s)  warm (s)  speedup")
+    print("{:15.4f}  {:8.4f}  {:8.4f}  {:6.1f}x".format(no_manifest, cold, warm, no_manifest / warm))
+
+
+if __name__ == "__main__":
+    run(sys.argv[1] if len(sys.argv) > 1 else os.path.abspath("castervoice"))
@@ -0,0 +1,42 @@
+"""
+Compares folding rules together one at a time with MergeRule.merge
+against merging them in one pass with MergeRule.merge_all.
+
+Run from the Caster root with:
+    python -m tests.benchmarks.merge_all_benchmark
+"""
+import timeit
+
+from castervoice.lib.merge.mergerule import MergeRule
+from castervoice.lib.merge.state.actions2 import NullAction
+
+
+def _create_rules(rule_count, specs_per_rule):
+    rules = []
+    for r in range(0, rule_count):
+        mapping = {}
+        for s in range(0, specs_per_rule):
+            mapping["rule {} command {}".format(r, s)] = NullAction()
+        rules.append(MergeRule(name="Rule{}".format(r), mapping=mapping))
+    return rules
+
+
+def _merge_pairwise(rules):
+    merged_rule = rules[0]
+    for rule in rules[1:]:
+        merged_rule = merged_rule.merge(rule)
+    return merged_rule
+
+
+def run(rule_counts=(5, 10, 25), specs_per_rule=100, repeat=3, number=3):
+    print("rules  specs  pairwise (s)  merge_all (s)  speedup")
+    for rule_count in rule_counts:
+        rules = _create_rules(rule_count, specs_per_rule)
+        pairwise = min(timeit.repeat(lambda: _merge_pairwise(rules), repeat=repeat, number=number)) / number
+        merge_all = min(timeit.repeat(lambda: MergeRule.merge_all(rules), repeat=repeat, number=number)) / number
+        print("{:5d}  {:5d}  {:12.4f}  {:13.4f}  {:6.1f}x".format(
+            rule_count, rule_count * specs_per_rule, pairwise, merge_all, pairwise / merge_all))
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,229 @@
+"""
+Measures the cost of each stage of a CCRMerger2 merge, plus loading the
+resulting grammars, over synthetic rule sets of varying size. Results are
+printed (or written) as json so that they can be compared between releases.
+
+Run from the Caster root with:
+    python -m tests.benchmarks.merge_benchmark [--quick] [--output results.json]
+
+Memory is the peak traced allocation per stage if tracemalloc is available,
+otherwise the process's resident set size after the stage if psutil is
+available, otherwise null.
+"""
+import argparse
+import collections
+import json
+import platform
+import time
+
+from dragonfly import get_engine, Grammar
+
+from castervoice.lib.const import CCRType
+from castervoice.lib.ctrl.mgr.managed_rule import ManagedRule
+from castervoice.lib.ctrl.mgr.rule_details import RuleDetails
+from castervoice.lib.merge.ccrmerging2.ccrmerger2 import CCRMerger2
+from castervoice.lib.merge.ccrmerging2.compatibility.simple_compat_checker import SimpleCompatibilityChecker
+from castervoice.lib.merge.ccrmerging2.merging.classic_merging_strategy import ClassicMergingStrategy
+from castervoice.lib.merge.ccrmerging2.sorting.config_ruleset_sorter import ConfigBasedRuleSetSorter
+from castervoice.lib.merge.ccrmerging2.transformers.transformers_runner import TransformersRunner
+from castervoice.lib.merge.selfmod.smr_configurer import SelfModRuleConfigurer
+from tests.benchmarks.synthetic_rules import create_rule_class
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+BASELINE = collections.OrderedDict([
+    ("rules", 10),
+    ("specs_per_rule", 20),
+    ("choices_per_spec", 1),
+    ("choice_size", 50),
+    ("app_rules", 2),
+    ("max_repetitions", 8),
+    ("shared_layout", False),
+])
+
+VARIATIONS = collections.OrderedDict([
+    ("rules", [5, 10, 25, 50]),
+    ("specs_per_rule", [10, 20, 50, 100]),
+    ("choices_per_spec", [0, 1, 2, 3]),
+    ("choice_size", [10, 50, 200, 500]),
+    ("app_rules", [0, 2, 5, 10]),
+    ("max_repetitions", [4, 8, 16]),
+    ("shared_layout", [False, True]),
+])
+
+QUICK_VARIATIONS = collections.OrderedDict([
+    ("rules", [5, 10]),
+    ("app_rules", [0, 2]),
+    ("shared_layout", [False, True]),
+])
+
+STAGES = ["transform", "sort", "compat", "merge", "repeat", "grammar_load"]
+
+
+class _MemoryProbe(object):
+
+    def __init__(self):
+        if tracemalloc is not None:
+            self.kind = "tracemalloc_peak"
+            tracemalloc.start()
+        elif psutil is not None:
+            self.kind = "psutil_rss"
+            self._process = psutil.Process()
+        else:
+            self.kind = None
+
+    def begin(self):
+        if self.kind == "tracemalloc_peak":
+            if hasattr(tracemalloc, "reset_peak"):
+                tracemalloc.reset_peak()
+            return tracemalloc.get_traced_memory()[0]
+        return None
+
+    def end(self, begin_value):
+        if self.kind == "tracemalloc_peak":
+            return tracemalloc.get_traced_memory()[1] - begin_value
+        if self.kind == "psutil_rss":
+            return self._process.memory_info().rss
+        return None
+
+
+class _StageRecorder(object):
+    """
+    Wraps the merger's collaborators and stage methods so that
+    time and memory can be attributed to each stage.
+    """
+
+    def __init__(self, memory_probe):
+        self._memory_probe = memory_probe
+        self.stages = collections.OrderedDict()
+        for stage in STAGES:
+            self.stages[stage] = {"seconds": 0.0, "calls": 0, "memory_bytes": None}
+
+    def wrap(self, stage, fn):
+        def wrapper(*args, **kwargs):
+            memory_begin = self._memory_probe.begin()
+            start = time.time()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record = self.stages[stage]
+                record["seconds"] += time.time() - start
+                record["calls"] += 1
+                memory = self._memory_probe.end(memory_begin)
+                if memory is not None:
+                    record["memory_bytes"] = max(record["memory_bytes"] or 0, memory)
+        return wrapper
+
+
+def _create_managed_rules(params):
+    managed_rules = []
+    for i in range(0, params["rules"]):
+        rule_class = create_rule_class("Rule" + str(i), params["specs_per_rule"],
+                                       params["choices_per_spec"], params["choice_size"])
+        if i < params["app_rules"]:
+            details = RuleDetails(ccrtype=CCRType.APP, executable="app" + str(i))
+        else:
+            details = RuleDetails(ccrtype=CCRType.GLOBAL)
+        managed_rules.append(ManagedRule(rule_class, details))
+    return managed_rules
+
+
+def _create_instrumented_merger(recorder, max_repetitions, shared_layout):
+    compat_checker = SimpleCompatibilityChecker()
+    compat_checker.compatibility_check = recorder.wrap("compat", compat_checker.compatibility_check)
+    merger = CCRMerger2(TransformersRunner(None), compat_checker, ClassicMergingStrategy(),
+                        max_repetitions, SelfModRuleConfigurer(), shared_layout=shared_layout)
+    merger._get_transformed_rules = recorder.wrap("transform", merger._get_transformed_rules)
+    merger._merge_and_prepare = recorder.wrap("merge", merger._merge_and_prepare)
+    merger._create_repeat_rule = recorder.wrap("repeat", merger._create_repeat_rule)
+    return merger
+
+
+def _load_grammars(merge_result):
+    grammars = []
+    if merge_result.single_grammar:
+        grammar = Grammar(name="benchmark")
+        for rule, _ in merge_result.ccr_rules_and_contexts:
+            grammar.add_rule(rule)
+        grammars.append(grammar)
+    else:
+        for rule, context in merge_result.ccr_rules_and_contexts:
+            grammar = Grammar(name="benchmark", context=context)
+            grammar.add_rule(rule)
+            grammars.append(grammar)
+    for grammar in grammars:
+        grammar.load()
+    for grammar in grammars:
+        grammar.unload()
+
+
+def run_case(params, memory_probe):
+    """
+    :param params: dict with the same keys as BASELINE
+    :param memory_probe: _MemoryProbe
+    :return: dict
+    """
+    managed_rules = _create_managed_rules(params)
+    recorder = _StageRecorder(memory_probe)
+    merger = _create_instrumented_merger(recorder, params["max_repetitions"], params["shared_layout"])
+    sorter = ConfigBasedRuleSetSorter([mr.get_rule_class_name() for mr in managed_rules])
+    sorter.sort_rules = recorder.wrap("sort", sorter.sort_rules)
+
+    start = time.time()
+    merge_result = merger.merge_rules(managed_rules, sorter)
+    merge_seconds = time.time() - start
+    recorder.wrap("grammar_load", _load_grammars)(merge_result)
+
+    return collections.OrderedDict([
+        ("params", params),
+        ("merge_seconds", merge_seconds),
+        ("total_seconds", time.time() - start),
+        ("merged_rules", len(merge_result.ccr_rules_and_contexts)),
+        ("stages", recorder.stages),
+    ])
+
+
+def run(variations, engine_name="text"):
+    get_engine(engine_name)
+    memory_probe = _MemoryProbe()
+    cases = []
+    for param, values in variations.items():
+        for value in values:
+            params = collections.OrderedDict(BASELINE)
+            params[param] = value
+            case = run_case(params, memory_probe)
+            case["varied"] = param
+            cases.append(case)
+    return collections.OrderedDict([
+        ("python", platform.python_version()),
+        ("engine", engine_name),
+        ("memory_measure", memory_probe.kind),
+        ("baseline", BASELINE),
+        ("cases", cases),
+    ])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the CCR merge pipeline.")
+    parser.add_argument("--quick", action="store_true", help="only run a few small cases")
+    parser.add_argument("--output", help="write the json results to this file instead of printing them")
+    args = parser.parse_args()
+
+    results = run(QUICK_VARIATIONS if args.quick else VARIATIONS)
+    formatted = json.dumps(results, indent=2)
+    if args.output is None:
+        print(formatted)
+    else:
+        with open(args.output, "w") as f:
+            f.write(formatted)
+
+
+if __name__ == "__main__":
+    main()
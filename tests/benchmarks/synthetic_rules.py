@@ -0,0 +1,116 @@
+"""
+Generators for synthetic rules of controllable size, for benchmarking.
+"""
+import random
+
+from dragonfly.grammar.elements import Choice
+
+from castervoice.lib.merge.mergerule import MergeRule
+from castervoice.lib.merge.state.actions2 import NullAction
+
+
+def get_500_words():
+    return [
+        "basin", "return", "picture", "unequaled", "drop", "nonstop", "protective",
+        "ancient", "moldy", "cry", "weigh", "drip", "tow", "cover", "fat", "unsightly",
+        "shade", "puncture", "scissors", "sun", "gamy", "fry", "rabbit", "embarrassed",
+        "ahead", "impress", "answer", "truck", "aloof", "illustrious", "cave", "pumped",
+        "angle", "economic", "knowledgeable", "fuel", "drum", "swim", "scarf", "offer",
+        "vigorous", "sad", "vessel", "cats", "exercise", "sophisticated", "interest",
+        "changeable", "melt", "woozy", "fertile", "light", "bee", "stomach", "panicky",
+        "pump", "stranger", "plucky", "grubby", "black-and-white", "afraid",
+        "descriptive", "house", "jolly", "clammy", "wary", "detail", "grain", "analyse",
+        "zippy", "polish", "verdant", "surround", "scientific", "functional", "place",
+        "detect", "undress", "baseball", "general", "sleep", "oranges", "correct", "walk",
+        "wreck", "rinse", "thought", "hall", "receipt", "massive", "include", "marvelous",
+        "futuristic", "telling", "soft", "nest", "insidious", "curvy", "outstanding",
+        "driving", "elastic", "stew", "crow", "selection", "roll", "debonair", "hand",
+        "country", "languid", "ball", "monkey", "flow", "clever", "seed", "coherent",
+        "match", "scare", "tree", "butter", "draconian", "flower", "untidy", "annoying",
+        "fruit", "upset", "whip", "sneeze", "enormous", "arithmetic", "trashy", "bushes",
+        "unknown", "nutritious", "sudden", "consist", "bone", "occur", "guide", "eager",
+        "strong", "frightening", "church", "nice", "middle", "time", "wicked", "health",
+        "cultured", "crack", "ill", "advice", "mine", "meeting", "toys", "silent", "part",
+        "lively", "threatening", "talented", "wax", "unusual", "profuse", "true", "lucky",
+        "lighten", "piquant", "spoon", "screw", "creepy", "gusty", "week", "pot", "scene",
+        "unsuitable", "cakes", "flag", "recondite", "earth", "prick", "robin", "separate",
+        "paper", "receive", "meaty", "plane", "flash", "grotesque", "arrest", "reading",
+        "stimulating", "spurious", "pocket", "woebegone", "imported", "far-flung", "wood",
+        "stroke", "grieving", "clip", "knit", "frame", "cracker", "prose", "carry",
+        "watch", "stop", "earn", "end", "married", "night", "obsequious", "tooth",
+        "range", "jar", "lush", "quickest", "shivering", "fearful", "reflect",
+        "agonizing", "great", "spare", "jam", "dizzy", "rely", "smoggy", "argue", "pull",
+        "glow", "unequal", "torpid", "optimal", "breakable", "thread", "satisfy",
+        "blushing", "pollution", "capable", "gold", "suffer", "store", "false",
+        "maddening", "zip", "sister", "wry", "anger", "fear", "intend", "eatable",
+        "magenta", "hope", "shaggy", "pathetic", "bite", "honorable", "shave", "trail",
+        "noisy", "cheese", "spot", "legal", "oatmeal", "porter", "curve", "wrathful",
+        "wiry", "fix", "sofa", "dust", "lake", "aquatic", "bored", "slimy", "infamous",
+        "nest", "beds", "cooperative", "zealous", "crayon", "produce", "market", "three",
+        "dispensable", "earsplitting", "helpless", "switch", "memory", "rich", "absorbed",
+        "sore", "representative", "preserve", "depend", "careless", "science", "train",
+        "eggs", "expansion", "volleyball", "learn", "free", "trouble", "salty", "spotted",
+        "branch", "approve", "concentrate", "pointless", "shop", "shame", "remove",
+        "protect", "disagreeable", "kill", "territory", "lumpy", "gabby", "behavior",
+        "maniacal", "mate", "pale", "knot", "abrupt", "applaud", "tangible", "mourn",
+        "abounding", "amuse", "part", "deer", "class", "fire", "picayune", "suspect",
+        "borrow", "squealing", "late", "lonely", "proud", "pass", "material", "broad",
+        "harbor", "veil", "absurd", "trot", "advise", "noiseless", "land", "zany",
+        "entertain", "good", "recognise", "uninterested", "school", "connect", "watch",
+        "towering", "filthy", "day", "invent", "complex", "tip", "frogs", "refuse",
+        "reaction", "room", "icicle", "sin", "awesome", "disgusting", "pretty",
+        "instinctive", "mouth", "toad", "hesitant", "basket", "volatile", "dinner",
+        "sniff", "road", "trousers", "accidental", "miss", "morning", "weight",
+        "condemned", "youthful", "advertisement", "finicky", "dramatic", "radiate",
+        "shelter", "floor", "toe", "burly", "instruct", "unable", "venomous", "poison",
+        "drop", "airport", "cough", "wool", "pat", "ticket", "shape", "efficient", "eye",
+        "flimsy", "voice", "surprise", "treatment", "sound", "panoramic", "domineering",
+        "trace", "square", "curious", "uppity", "crush", "teaching", "ants", "fool",
+        "outgoing", "testy", "double", "pear", "man", "striped", "tasty", "mask",
+        "marble", "hard", "unadvised", "effect", "screeching", "hope", "canvas",
+        "redundant", "men", "cabbage", "club", "sock", "hot", "sassy", "passenger",
+        "admire", "cub", "home", "workable", "dapper", "cruel", "toothbrush", "credit",
+        "cloudy", "plant", "psychedelic", "spicy", "strange", "dashing", "design",
+        "abusive", "shirt", "care", "drunk", "cooing", "smoke", "muddled", "festive",
+        "useful", "raspy", "vegetable", "peace", "tangy", "grease", "plan", "lettuce",
+        "hook", "transport", "milk", "exciting", "license", "back", "turn", "yummy",
+        "secretive", "measure", "salt", "delicate", "greedy", "spotless", "mark", "rain",
+        "fascinated", "harsh", "abaft", "versed", "sheet"
+    ]
+
+
+def get_giant_choice(name, size=500):
+    """
+    :param name: str, the extra's name
+    :param size: int, number of choices, up to 500
+    :return: Choice
+    """
+    choices = {}
+    for word in get_500_words()[:size]:
+        choices[word] = random.randint(1, 100000)
+    return Choice(name, choices)
+
+
+def create_rule_class(name, num_specs, num_choices=0, choice_size=500):
+    """
+    Creates a MergeRule class whose specs are unique to it, so that
+    rules created by this function never conflict with each other.
+
+    :param name: str, class name of the rule
+    :param num_specs: int, up to 500
+    :param num_choices: int, number of Choice extras referenced by every spec
+    :param choice_size: int, number of choices in each Choice
+    :return: MergeRule class
+    """
+    extras = []
+    spec_base = ""
+    for k in range(0, num_choices):
+        extra_name = "giant_" + str(k)
+        spec_base += " <" + extra_name + ">"
+        extras.append(get_giant_choice(extra_name, choice_size))
+
+    mapping = {}
+    for word in get_500_words()[:num_specs]:
+        mapping[name.lower() + " " + word + spec_base] = NullAction()
+
+    return type(name, (MergeRule,), {"mapping": mapping, "extras": extras, "defaults": {}})
@@ -0,0 +1,96 @@
+from unittest import TestCase
+
+from dragonfly import Context
+from mock import Mock
+
+from castervoice.lib.const import CCRType
+from castervoice.lib.ctrl.mgr.context_dispatch.context_dispatcher import ContextDispatcher
+from castervoice.lib.ctrl.mgr.context_dispatch.dispatched_context import DispatchedAppContext, \
+    DispatchedNegationContext
+from castervoice.lib.ctrl.mgr.managed_rule import ManagedRule
+from castervoice.lib.ctrl.mgr.rule_details import RuleDetails
+from castervoice.lib.merge.ccrmerging2.ccrmerger2 import CCRMerger2
+from castervoice.lib.merge.ccrmerging2.compatibility.simple_compat_checker import SimpleCompatibilityChecker
+from castervoice.lib.merge.ccrmerging2.merging.classic_merging_strategy import ClassicMergingStrategy
+from castervoice.lib.merge.ccrmerging2.sorting.config_ruleset_sorter import ConfigBasedRuleSetSorter
+from castervoice.lib.merge.ccrmerging2.transformers.transformers_runner import TransformersRunner
+from tests.lib.merge.ccrmerging2.fake_rules import FakeRuleOne, FakeRuleTwo, FakeRuleThree
+
+
+class _CountingContext(Context):
+
+    def __init__(self, name, matching_executable):
+        Context.__init__(self)
+        self._str = name
+        self._matching_executable = matching_executable
+        self.match_count = 0
+
+    def matches(self, executable, title, handle):
+        self.match_count += 1
+        return executable == self._matching_executable
+
+
+class TestContextDispatcher(TestCase):
+
+    def setUp(self):
+        self._dispatcher = ContextDispatcher(2)
+
+    def test_created_context_matches_like_app_context(self):
+        context = self._dispatcher.create_context(executable="notepad")
+
+        self.assertIsInstance(context, DispatchedAppContext)
+        self.assertTrue(context.matches("C:\\Windows\\notepad.exe", "untitled", 1))
+        self.assertFalse(context.matches("C:\\Windows\\explorer.exe", "untitled", 2))
+        self.assertEqual("DispatchedAppContext(AppContext(['notepad'], None, False))", str(context))
+
+    def test_window_classified_once(self):
+        counting_context = _CountingContext("counting", "notepad")
+        key = self._dispatcher.register(counting_context)
+
+        for _ in range(3):
+            self.assertEqual(frozenset([key]), self._dispatcher.classify("notepad", "untitled", 1))
+        self.assertEqual(1, counting_context.match_count)
+
+        self.assertEqual(frozenset([key]), self._dispatcher.classify("notepad", "other title", 1))
+        self.assertEqual(frozenset(), self._dispatcher.classify("code", "other title", 2))
+        self.assertEqual(3, counting_context.match_count)
+
+    def test_new_context_forgets_classifications(self):
+        counting_context = _CountingContext("counting", "notepad")
+        self._dispatcher.register(counting_context)
+        self._dispatcher.classify("notepad", "untitled", 1)
+
+        self._dispatcher.register(counting_context)
+        self._dispatcher.classify("notepad", "untitled", 1)
+        self.assertEqual(1, counting_context.match_count)
+
+        self._dispatcher.create_context(executable="code")
+        self._dispatcher.classify("notepad", "untitled", 1)
+        self.assertEqual(2, counting_context.match_count)
+
+    def test_negations_combine_into_one_context(self):
+        notepad = self._dispatcher.create_context(executable="notepad")
+        code = self._dispatcher.create_context(executable="code")
+        negation = ~notepad
+        negation &= ~code
+
+        self.assertIsInstance(negation, DispatchedNegationContext)
+        self.assertFalse(negation.matches("notepad", "", 1))
+        self.assertFalse(negation.matches("code", "", 2))
+        self.assertTrue(negation.matches("explorer", "", 3))
+
+    def test_merger_uses_context_factory(self):
+        merger = CCRMerger2(TransformersRunner(Mock()), SimpleCompatibilityChecker(),
+                            ClassicMergingStrategy(), 2, Mock(),
+                            context_factory=self._dispatcher.create_context)
+        managed_rules = [ManagedRule(FakeRuleOne, RuleDetails(ccrtype=CCRType.GLOBAL)),
+                         ManagedRule(FakeRuleTwo, RuleDetails(ccrtype=CCRType.APP, executable="notepad")),
+                         ManagedRule(FakeRuleThree, RuleDetails(ccrtype=CCRType.APP, executable="code"))]
+        sorter = ConfigBasedRuleSetSorter([mr.get_rule_class_name() for mr in managed_rules])
+        result = merger.merge_rules(managed_rules, sorter)
+
+        contexts = [context for _, context in result.ccr_rules_and_contexts]
+        self.assertIsInstance(contexts[0], DispatchedNegationContext)
+        self.assertTrue(all(isinstance(context, DispatchedAppContext) for context in contexts[1:]))
+        self.assertFalse(contexts[0].matches("notepad", "", 1))
+        self.assertTrue(contexts[0].matches("explorer", "", 2))
@@ -14,14 +14,17 @@ class FakeGrammarContainer(object):
         if grammar is not None:
             grammar.load = lambda: self._pass()
             self.non_ccr[rcn] = grammar
+            return [grammar]
         else:
             del self.non_ccr[rcn]
+            return []
 
     def set_ccr(self, ccr_grammars):
         for grammar in ccr_grammars:
             grammar.load = lambda: self._pass()
 
         self.ccr = ccr_grammars
+        return ccr_grammars
 
     def wipe_ccr(self):
         pass
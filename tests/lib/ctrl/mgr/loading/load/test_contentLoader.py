@@ -1,4 +1,9 @@
-from mock import Mock
+import os
+import shutil
+import sys
+import tempfile
+
+from mock import Mock, patch
 
 from castervoice.lib.ctrl.mgr.loading.load import content_loader
 from castervoice.lib.ctrl.mgr.loading.load.content_request_generator import ContentRequestGenerator
@@ -29,6 +34,13 @@ class _FakeContent(object):
     pass
 
 
+def _write_file(file_path, content):
+    if not os.path.isdir(os.path.dirname(file_path)):
+        os.makedirs(os.path.dirname(file_path))
+    with open(file_path, "w") as f:
+        f.write(content)
+
+
 def _raise(_):
     raise Exception("Test Exception")
 
@@ -58,6 +70,113 @@ class TestContentLoader(SettingsEnabledTestCase):
         # TODO: this test
         pass
 
+    def test_load_everything_lazy_rules(self):
+        from castervoice.lib.ctrl.mgr.loading.load.content_request import ContentRequest
+        enabled_request = ContentRequest(ContentType.GET_RULE, "/mock/base/path", "rule_one", "MockRuleOne", "one")
+        disabled_request = ContentRequest(ContentType.GET_RULE, "/mock/base/path", "rule_three", "MockRuleThree",
+                                          "three")
+        self.crg_mock.get_all_content_modules = Mock(side_effect=[[enabled_request, disabled_request], []])
+        self.rc_mock._config[RulesConfig._WHITELISTED]["MockRuleThree"] = True
+        self.rc_mock._config[RulesConfig._ENABLED_ORDERED] = ["MockRuleOne"]
+        self.cl = content_loader.ContentLoader(self.crg_mock, lazy_rules=True)
+        self.cl.idem_import_module = Mock(return_value=_FakeContent)
+
+        rule_loaded_fn = Mock()
+        content = self.cl.load_everything(self.rc_mock, rule_loaded_fn)
+        self.assertEqual([_FakeContent], content.rules)
+        rule_loaded_fn.assert_called_once_with(_FakeContent)
+        self.assertEqual([disabled_request], content.lazy_rule_requests)
+        self.cl.idem_import_module.assert_called_once_with("rule_one", ContentType.GET_RULE)
+
+        self.assertEqual(_FakeContent, self.cl.load_request(disabled_request))
+        self.cl.idem_import_module.assert_called_with("rule_three", ContentType.GET_RULE)
+
+    def test_process_requests_registers_with_module_finder(self):
+        from sys import path
+        from castervoice.lib.ctrl.mgr.loading.load.content_module_finder import ContentModuleFinder
+        from castervoice.lib.ctrl.mgr.loading.load.content_request import ContentRequest
+        finder = ContentModuleFinder()
+        self.cl = content_loader.ContentLoader(self.crg_mock, module_finder=finder)
+        self.cl.idem_import_module = Mock(return_value=_FakeContent)
+        request = ContentRequest(ContentType.GET_RULE, "/mock/content/dir", "rule_one", "MockRuleOne")
+
+        self.assertEqual(_FakeContent, self.cl.load_request(request))
+        self.assertEqual(os.path.join("/mock/content/dir", "rule_one.py"), finder.get_module_path("rule_one"))
+        self.assertNotIn("/mock/content/dir", path)
+
+    def test_user_support_package_overrides_starter_one(self):
+        from castervoice.lib.ctrl.mgr.loading.load.content_module_finder import ContentModuleFinder
+        from castervoice.lib.ctrl.mgr.loading.load.content_request import ContentRequest
+        base_dir = tempfile.mkdtemp()
+        user_dir = tempfile.mkdtemp()
+        starter_rules_dir = os.path.join(base_dir, "rules", "caster_test_alphabet_rules")
+        user_rules_dir = os.path.join(user_dir, "rules")
+        # like the starter rules: the user's copy of the support package first, else the one next to the rule
+        _write_file(os.path.join(starter_rules_dir, "caster_test_alphabet.py"),
+                    "try:\n"
+                    "    from caster_test_alphabet_rules import caster_test_alphabet_support\n"
+                    "except ImportError:\n"
+                    "    import caster_test_alphabet_support\n"
+                    "def get_rule():\n"
+                    "    return caster_test_alphabet_support.VALUE\n")
+        _write_file(os.path.join(starter_rules_dir, "caster_test_alphabet_support.py"), "VALUE = 'starter'\n")
+        _write_file(os.path.join(user_rules_dir, "caster_test_alphabet_rules", "__init__.py"), "")
+        _write_file(os.path.join(user_rules_dir, "caster_test_alphabet_rules", "caster_test_alphabet_support.py"),
+                    "VALUE = 'user'\n")
+        self._set_setting(["paths", "USER_DIR"], user_dir)
+        request = ContentRequest(ContentType.GET_RULE, starter_rules_dir, "caster_test_alphabet", "MockRuleOne")
+        self.crg_mock.get_all_content_modules = Mock(side_effect=[[request], [], [request], []])
+        finder = ContentModuleFinder()
+        finder.install()
+        self.cl = content_loader.ContentLoader(self.crg_mock, module_finder=finder)
+        try:
+            with patch.object(content_loader, "_MODULES", {}):
+                content = self.cl.load_everything(self.rc_mock)
+            self.assertEqual(["user"], content.rules)
+
+            shutil.rmtree(os.path.join(user_rules_dir, "caster_test_alphabet_rules"))
+            for module_name in ["caster_test_alphabet", "caster_test_alphabet_rules",
+                                "caster_test_alphabet_rules.caster_test_alphabet_support"]:
+                sys.modules.pop(module_name, None)
+            with patch.object(content_loader, "_MODULES", {}):
+                self.assertEqual(["starter"], self.cl.load_everything(self.rc_mock).rules)
+        finally:
+            finder.uninstall()
+            while user_rules_dir in sys.path:
+                sys.path.remove(user_rules_dir)
+            for module_name in ["caster_test_alphabet", "caster_test_alphabet_support", "caster_test_alphabet_rules",
+                                "caster_test_alphabet_rules.caster_test_alphabet_support"]:
+                sys.modules.pop(module_name, None)
+            shutil.rmtree(base_dir)
+            shutil.rmtree(user_dir)
+
+    def test_idem_import_module_name_in_use(self):
+        from castervoice.lib.ctrl.mgr.loading.load.content_module_finder import ContentModuleFinder
+        finder = ContentModuleFinder()
+        finder.register(TestContentLoader._HOOK_NAME, "/mock/content/dir")
+        self.cl = content_loader.ContentLoader(self.crg_mock, module_finder=finder)
+        hook_module = _FakeImportedHookModule(_FakeContent)
+        hook_module.__file__ = "/site-packages/hook_module.pyc"
+        content_loader._MODULES = {TestContentLoader._HOOK_NAME: hook_module}
+        spy = printer_mocking.printer_spy()
+        self.assertIsNone(self.cl.idem_import_module(TestContentLoader._HOOK_NAME, ContentType.GET_HOOK))
+        self.assertEqual("hook_module module name is already in use: /site-packages/hook_module.pyc", spy.get_first())
+
+    def test_idem_import_module_installed_module_imported(self):
+        from castervoice.lib.ctrl.mgr.loading.load.content_module_finder import ContentModuleFinder
+        finder = ContentModuleFinder()
+        finder.register(TestContentLoader._HOOK_NAME, "/mock/content/dir")
+        self.cl = content_loader.ContentLoader(self.crg_mock, module_finder=finder)
+        self.cl._get_load_fn = Mock()
+        hook_module = _FakeImportedHookModule(_FakeContent)
+        hook_module.__file__ = "/site-packages/hook_module.pyc"
+        self.cl._get_load_fn.side_effect = [lambda x: hook_module]
+        content_loader._MODULES = {}
+        spy = printer_mocking.printer_spy()
+        self.assertIsNone(self.cl.idem_import_module(TestContentLoader._HOOK_NAME, ContentType.GET_HOOK))
+        # the module finder reports the collision when it declines the name
+        self.assertEqual([], spy.printed)
+
     def test_idem_import_module_reimport_success(self):
         rule_module = _FakeImportedRuleModule(_FakeContent)
         content_loader._MODULES = {TestContentLoader._RULE_MODULE_NAME: rule_module}
@@ -0,0 +1,77 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from mock import patch
+
+from castervoice.lib import utilities
+from castervoice.lib.ctrl.mgr.loading.load.content_manifest import ContentManifest
+from castervoice.lib.ctrl.mgr.loading.load.content_type import ContentType
+
+
+class TestContentManifest(TestCase):
+
+    def setUp(self):
+        self._dir = tempfile.mkdtemp()
+        self._path = os.path.join(self._dir, "manifest.json")
+        self._stored = {}
+        load_patcher = patch.object(utilities, "load_json_file", side_effect=lambda path: self._stored.get(path, {}))
+        save_patcher = patch.object(utilities, "save_json_file",
+                                    side_effect=lambda data, path: self._stored.__setitem__(path, data))
+        load_patcher.start()
+        save_patcher.start()
+        self.addCleanup(load_patcher.stop)
+        self.addCleanup(save_patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self._dir)
+
+    def _file_path(self, name):
+        return os.sep.join(["", "rules", name])
+
+    def test_entry_used_until_file_changes(self):
+        manifest = ContentManifest(self._path)
+        manifest.put(self._file_path("a.py"), (1.0, 10), ContentType.GET_RULE, "A")
+
+        self.assertEqual("A", manifest.get(self._file_path("a.py"), (1.0, 10))["content_class_name"])
+        self.assertIsNone(manifest.get(self._file_path("a.py"), (2.0, 10)))
+        self.assertIsNone(manifest.get(self._file_path("a.py"), (1.0, 11)))
+        self.assertIsNone(manifest.get(self._file_path("b.py"), (1.0, 10)))
+
+    def test_saved_and_reloaded(self):
+        manifest = ContentManifest(self._path)
+        manifest.put(self._file_path("a.py"), (1.0, 10), ContentType.GET_HOOK, None)
+        manifest.save()
+
+        entry = ContentManifest(self._path).get(self._file_path("a.py"), [1.0, 10])
+        self.assertEqual(ContentType.GET_HOOK, entry["content_type"])
+
+    def test_only_saved_if_changed(self):
+        manifest = ContentManifest(self._path)
+        manifest.save()
+        self.assertNotIn(self._path, self._stored)
+
+    def test_other_version_ignored(self):
+        self._stored[self._path] = {"version": -1, "files": {self._file_path("a.py"): {
+            "mtime": 1.0, "size": 10, "content_type": ContentType.GET_RULE, "content_class_name": "A"}}}
+        self.assertIsNone(ContentManifest(self._path).get(self._file_path("a.py"), (1.0, 10)))
+
+    def test_retain_drops_missing_files_in_directory_only(self):
+        manifest = ContentManifest(self._path)
+        manifest.put(self._file_path("a.py"), (1.0, 10), None, None)
+        manifest.put(self._file_path("b.py"), (1.0, 10), None, None)
+        manifest.put(os.sep.join(["", "other", "c.py"]), (1.0, 10), None, None)
+        manifest.retain(os.sep + "rules", {self._file_path("a.py")})
+
+        self.assertIsNotNone(manifest.get(self._file_path("a.py"), (1.0, 10)))
+        self.assertIsNone(manifest.get(self._file_path("b.py"), (1.0, 10)))
+        self.assertIsNotNone(manifest.get(os.sep.join(["", "other", "c.py"]), (1.0, 10)))
+
+    def test_file_stamp(self):
+        file_path = os.path.join(self._dir, "a.py")
+        with open(file_path, "w") as f:
+            f.write("abc")
+        mtime, size = ContentManifest.get_file_stamp(file_path)
+        self.assertEqual(3, size)
+        self.assertEqual(os.path.getmtime(file_path), mtime)
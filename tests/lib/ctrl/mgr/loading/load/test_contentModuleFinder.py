@@ -0,0 +1,90 @@
+import importlib
+import os
+import shutil
+import sys
+import tempfile
+from unittest import TestCase
+
+from mock import patch
+
+from castervoice.lib.ctrl.mgr.loading.load.content_module_finder import ContentModuleFinder
+
+
+class TestContentModuleFinder(TestCase):
+
+    _MODULE_NAME = "caster_test_content_module"
+
+    def setUp(self):
+        self._starter_dir = tempfile.mkdtemp()
+        self._user_dir = tempfile.mkdtemp()
+        self._path = list(sys.path)
+        self._finder = ContentModuleFinder()
+        self._finder.install()
+
+    def tearDown(self):
+        self._finder.uninstall()
+        sys.modules.pop(TestContentModuleFinder._MODULE_NAME, None)
+        sys.modules.pop("caster_test_helper_module", None)
+        shutil.rmtree(self._starter_dir)
+        shutil.rmtree(self._user_dir)
+
+    def _write_module(self, directory, value, module_name=None):
+        module_name = module_name or TestContentModuleFinder._MODULE_NAME
+        with open(os.path.join(directory, module_name + ".py"), "w") as module_file:
+            module_file.write("VALUE = {!r}\n".format(value))
+
+    def test_imports_registered_module_without_sys_path(self):
+        self._write_module(self._starter_dir, "starter")
+        self._finder.register(TestContentModuleFinder._MODULE_NAME, self._starter_dir)
+        module = importlib.import_module(TestContentModuleFinder._MODULE_NAME)
+        self.assertEqual("starter", module.VALUE)
+        self.assertEqual(self._path, sys.path)
+
+    def test_later_registration_overrides(self):
+        self._write_module(self._starter_dir, "starter")
+        self._write_module(self._user_dir, "user")
+        self._finder.register(TestContentModuleFinder._MODULE_NAME, self._starter_dir)
+        self._finder.register(TestContentModuleFinder._MODULE_NAME, self._user_dir)
+        module = importlib.import_module(TestContentModuleFinder._MODULE_NAME)
+        self.assertEqual("user", module.VALUE)
+
+    def test_reload_reads_changed_file(self):
+        self._write_module(self._starter_dir, "first")
+        self._finder.register(TestContentModuleFinder._MODULE_NAME, self._starter_dir)
+        module = importlib.import_module(TestContentModuleFinder._MODULE_NAME)
+        self._write_module(self._starter_dir, "second!")
+        try:
+            reload_fn = reload
+        except NameError:
+            from importlib import reload as reload_fn
+        self.assertIs(module, reload_fn(module))
+        self.assertEqual("second!", module.VALUE)
+
+    def test_register_directory(self):
+        self._write_module(self._user_dir, "helper", "caster_test_helper_module")
+        self._finder.register_directory(self._user_dir)
+        self._finder.register_directory(os.path.join(self._user_dir, "missing"))
+        module = importlib.import_module("caster_test_helper_module")
+        self.assertEqual("helper", module.VALUE)
+
+    def test_unregistered_names_not_found(self):
+        self.assertIsNone(self._finder.find_module(TestContentModuleFinder._MODULE_NAME))
+        self._finder.register(TestContentModuleFinder._MODULE_NAME, self._starter_dir)
+        self.assertIsNone(self._finder.find_module(TestContentModuleFinder._MODULE_NAME, ["/some/package"]))
+
+    @patch("castervoice.lib.printer.out")
+    def test_installed_module_not_shadowed(self, out):
+        installed_dir = tempfile.mkdtemp()
+        sys.path.append(installed_dir)
+        try:
+            self._write_module(installed_dir, "installed")
+            self._write_module(self._user_dir, "user")
+            self._finder.register_directory(self._user_dir)
+            module = importlib.import_module(TestContentModuleFinder._MODULE_NAME)
+        finally:
+            sys.path.remove(installed_dir)
+            shutil.rmtree(installed_dir)
+
+        self.assertEqual("installed", module.VALUE)
+        out.assert_called_once()
+        self.assertIn("caster_test_content_module module name is already in use", out.call_args[0][0])
@@ -27,6 +27,24 @@ class TestContentRequestGenerator(TestCase):
                                                  "  return Abc, RuleDetails(name=\"test\")"]]
         self._do_assertions(ContentType.GET_RULE, "some_rule", "Abc")
 
+    def test_rule_trigger(self):
+        self.crg._walk.side_effect = [[("/relevant/path", [], ["merge_rule.py", "named_rule.py", "mapping_rule.py"])]]
+        self.crg._get_file_lines.side_effect = [["class Abc(MergeRule):",
+                                                 "    mapping = {}",
+                                                 "def get_rule():",
+                                                 "  return Abc, RuleDetails(ccrtype=CCRType.GLOBAL)"],
+                                                ["class Def(MergeRule):",
+                                                 "    pronunciation = \"dee\"",
+                                                 "def get_rule():",
+                                                 "  return Def, RuleDetails(ccrtype=CCRType.GLOBAL)"],
+                                                ["class Ghi(MappingRule):",
+                                                 "    pronunciation = \"ignored\"",
+                                                 "def get_rule():",
+                                                 "  details = RuleDetails(grammar_name=\"x\", name=\"gee\")",
+                                                 "  return Ghi, details"]]
+        results = self.crg.get_all_content_modules("test_dir")
+        self.assertEqual(["Abc", "dee", "gee"], [r.trigger for r in results])
+
     def test_get_transformer(self):
         self.crg._walk.side_effect = [[("/some/path", [], ["__init__.py", "something.pyc"]),
                                        ("/relevant/path", [], ["some_transformer.py"])]]
@@ -53,3 +71,22 @@ class TestContentRequestGenerator(TestCase):
         self.assertEqual(class_name, req.content_class_name)
         self.assertEqual("/relevant/path", req.directory)
         self.assertEqual(module_name, req.module_name)
+
+    def test_manifest_skips_unchanged_files(self):
+        manifest = Mock()
+        manifest.get.side_effect = [None, {"content_type": ContentType.GET_HOOK, "content_class_name": None,
+                                                 "trigger": None}]
+        self.crg._manifest = manifest
+        self.crg._get_file_stamp = Mock(return_value=(1.0, 10))
+        self.crg._walk.side_effect = [[("/some/path", [], ["__init__.py", "something.pyc"]),
+                                       ("/relevant/path", [], ["some_rule.py", "some_hook.py"])]]
+        self.crg._get_file_lines.side_effect = [["def get_rule():",
+                                                 "  return Abc, RuleDetails(name=\"test\")"]]
+        results = self.crg.get_all_content_modules("/relevant")
+
+        self.assertEqual(["some_rule", "some_hook"], [r.module_name for r in results])
+        self.assertEqual(["Abc", None], [r.content_class_name for r in results])
+        self.assertEqual(1, self.crg._get_file_lines.call_count)
+        manifest.put.assert_called_once_with("/relevant/path/some_rule.py", (1.0, 10),
+                                             ContentType.GET_RULE, "Abc", "Abc")
+        manifest.save.assert_called_once_with()
@@ -0,0 +1,46 @@
+from unittest import TestCase
+
+from castervoice.lib.ctrl.mgr.merge_prediction.activation_predictor import ActivationPredictor
+
+
+class TestActivationPredictor(TestCase):
+
+    def setUp(self):
+        self._predictor = ActivationPredictor(max_predictions=2)
+
+    def _enable_in(self, executable, *rcns):
+        self._predictor.set_foreground(executable)
+        for rcn in rcns:
+            self._predictor.record_activation(rcn, True)
+
+    def test_nothing_predicted_without_history(self):
+        self.assertEqual([], self._predictor.predict([], ["Python", "Java"]))
+
+    def test_enabled_and_non_candidate_rules_not_predicted(self):
+        self._enable_in("code.exe", "Python", "Java", "Bash")
+        self.assertEqual(["Java"], self._predictor.predict(["Python"], ["Python", "Java"]))
+
+    def test_disabling_not_recorded(self):
+        self._predictor.record_activation("Python", False)
+        self.assertEqual([], self._predictor.predict([], ["Python"]))
+
+    def test_foreground_executable_predicts(self):
+        self._enable_in("code.exe", "Python")
+        self._enable_in("idea64.exe", "Java")
+        self._enable_in("code.exe")
+        self.assertEqual(["Python", "Java"], self._predictor.predict([], ["Python", "Java"]))
+        self._enable_in("idea64.exe")
+        self.assertEqual(["Java", "Python"], self._predictor.predict([], ["Python", "Java"]))
+
+    def test_previous_activation_predicts(self):
+        self._enable_in(None, "Bash", "Python", "Java", "Bash")
+        # Python followed Bash last time, while Java is the more recent rule
+        self.assertEqual(["Python", "Java"], self._predictor.predict(["Bash"], ["Python", "Java"]))
+
+    def test_max_predictions(self):
+        self._enable_in(None, "A", "B", "C", "D")
+        self.assertEqual(2, len(self._predictor.predict([], ["A", "B", "C", "D"])))
+
+    def test_set_foreground_reports_changes(self):
+        self.assertTrue(self._predictor.set_foreground("code.exe"))
+        self.assertFalse(self._predictor.set_foreground("code.exe"))
@@ -0,0 +1,68 @@
+from unittest import TestCase
+
+from dragonfly import Grammar, get_engine
+
+from castervoice.lib.const import CCRType
+from castervoice.lib.ctrl.mgr.grammar_activator import GrammarActivator
+from castervoice.lib.ctrl.mgr.managed_rule import ManagedRule
+from castervoice.lib.ctrl.mgr.rule_details import RuleDetails
+from castervoice.lib.merge.mergerule import MergeRule
+from castervoice.lib.merge.state.actions2 import NullAction
+
+
+class _ActivatorRuleOne(MergeRule):
+    pronunciation = "activator zulu"
+    mapping = {"zulu": NullAction()}
+
+
+class _ActivatorRuleTwo(MergeRule):
+    pronunciation = "activator yankee"
+    mapping = {"yankee": NullAction()}
+
+
+class _ActivatorRuleThree(MergeRule):
+    pronunciation = "activator x-ray"
+    mapping = {"x-ray": NullAction()}
+
+
+class TestGrammarActivator(TestCase):
+
+    def setUp(self):
+        self._activations = []
+        self._batch_activations = []
+        self._activator = GrammarActivator(lambda rule: isinstance(rule, MergeRule))
+        self._activator.set_activation_fn(lambda rcn, active: self._activations.append((rcn, active)))
+        self._activator.set_batch_activation_fn(lambda rcns, active: self._batch_activations.append((rcns, active)))
+        for rule_class in [_ActivatorRuleOne, _ActivatorRuleTwo, _ActivatorRuleThree]:
+            self._activator.register_rule(ManagedRule(rule_class, RuleDetails(ccrtype=CCRType.GLOBAL)))
+        rule_class, _ = self._activator.construct_activation_rule()
+        self._grammar = Grammar("activator test")
+        self._grammar.add_rule(rule_class())
+        self._grammar.load()
+
+    def tearDown(self):
+        self._grammar.unload()
+
+    def test_enable_one(self):
+        get_engine().mimic("enable activator zulu")
+        self.assertEqual([("_ActivatorRuleOne", True)], self._activations)
+        self.assertEqual([], self._batch_activations)
+
+    def test_enable_several(self):
+        get_engine().mimic("enable activator zulu and activator x-ray and activator yankee")
+        self.assertEqual([], self._activations)
+        self.assertEqual([(["_ActivatorRuleOne", "_ActivatorRuleThree", "_ActivatorRuleTwo"], True)],
+                         self._batch_activations)
+
+    def test_disable_several(self):
+        get_engine().mimic("disable activator yankee and activator zulu")
+        self.assertEqual([(["_ActivatorRuleTwo", "_ActivatorRuleOne"], False)], self._batch_activations)
+
+    def test_rule_registered_after_loading(self):
+        class _ActivatorRuleFour(MergeRule):
+            pronunciation = "activator whiskey"
+            mapping = {"whiskey": NullAction()}
+
+        self._activator.register_rule(ManagedRule(_ActivatorRuleFour, RuleDetails(ccrtype=CCRType.GLOBAL)))
+        get_engine().mimic("disable activator whiskey")
+        self.assertEqual([("_ActivatorRuleFour", False)], self._activations)
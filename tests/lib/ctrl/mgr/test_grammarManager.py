@@ -113,21 +113,22 @@ class TestGrammarManager(SettingsEnabledTestCase):
         activator = GrammarActivator(lambda rule: isinstance(rule, MergeRule))
         companion_config = CompanionConfig()
 
-        self._gm = GrammarManager(self._rule_config,
-                                  merger,
-                                  self._content_loader,
-                                  ccr_rule_validator,
-                                  details_validator,
-                                  observable,
-                                  activator,
-                                  mapping_rule_maker,
-                                  grammars_container,
-                                  self._hooks_runner,
-                                  ccr_toggle,
-                                  smrc,
-                                  self._transformers_runner,
-                                  companion_config,
-                                  combo_validator)
+        self._gm_args = [self._rule_config,
+                         merger,
+                         self._content_loader,
+                         ccr_rule_validator,
+                         details_validator,
+                         observable,
+                         activator,
+                         mapping_rule_maker,
+                         grammars_container,
+                         self._hooks_runner,
+                         ccr_toggle,
+                         smrc,
+                         self._transformers_runner,
+                         companion_config,
+                         combo_validator]
+        self._gm = GrammarManager(*self._gm_args)
 
     def test_empty_initialize(self):
         """
@@ -296,3 +297,228 @@ class TestGrammarManager(SettingsEnabledTestCase):
 
         # simulate a spoken "enable" command from the GrammarActivator:
         self._gm._change_rule_enabled("Python", False)
+
+    def test_lazy_rule_loaded_when_enabled(self):
+        from castervoice.lib.ctrl.mgr.loading.load.content_request import ContentRequest
+        from castervoice.lib.ctrl.mgr.loading.load.content_type import ContentType
+        from castervoice.lib.ctrl.mgr.rules_config import RulesConfig
+        from castervoice.rules.ccr.java_rules import java
+        from castervoice.rules.ccr.python_rules import python
+
+        self._setup_rules_config_file(loadable_true=["Java", "Python"], enabled=["Java"])
+        self._initialize(FullContentSet([java.get_rule()], [], []))
+        request = ContentRequest(ContentType.GET_RULE, "/mock/path", "python", "Python", "python")
+        self._gm.register_lazy_rule(request)
+        self._content_loader.load_request.side_effect = [python.get_rule()]
+        self.assertTrue(self._gm.has_rule("Python"))
+
+        # disabling a rule which was never loaded doesn't load it
+        self._gm._change_rule_enabled("Python", False)
+        self._content_loader.load_request.assert_not_called()
+
+        self._gm._change_rule_enabled("Python", True)
+        self._content_loader.load_request.assert_called_once_with(request)
+        self.assertIn("Python", self._gm._managed_rules)
+        enabled = self._rule_config._config[RulesConfig._ENABLED_ORDERED]
+        self.assertIn("Python", enabled)
+        self.assertNotIn("Java", enabled)
+
+    def test_merge_publishes_merge_completed_event(self):
+        from castervoice.lib.merge.ccrmerging2.hooks.base_hook import BaseHook
+        from castervoice.lib.merge.ccrmerging2.hooks.events.event_types import EventType
+        from castervoice.rules.core.alphabet_rules import alphabet
+
+        events = []
+
+        class RecordingHook(BaseHook):
+            def __init__(self):
+                super(RecordingHook, self).__init__(EventType.MERGE_COMPLETED)
+
+            def get_pronunciation(self):
+                return "recording"
+
+            def run(self, event):
+                events.append(event)
+
+        self._set_setting(["hooks", "default_hooks"], ["RecordingHook"])
+        self._setup_rules_config_file(loadable_true=["Alphabet"], enabled=["Alphabet"])
+        self._initialize(FullContentSet([alphabet.get_rule()], [], [RecordingHook]))
+
+        self.assertEqual(1, len(events))
+        stats = events[0].stats
+        self.assertEqual(1, stats.rule_count)
+        self.assertEqual(0, stats.ko_count)
+        self.assertEqual(1, stats.merged_rule_count)
+        self.assertGreater(stats.spec_count, 0)
+        self.assertEqual(["transform", "sort", "compat", "merge", "repeat", "grammar_load"],
+                         list(stats.stage_seconds.keys()))
+
+    def test_background_merge_applied_on_poll(self):
+        from castervoice.lib import utilities
+        from castervoice.lib.ctrl.mgr.grammar_manager import GrammarManager
+        from castervoice.lib.ctrl.mgr.merge_scheduler import MergeScheduler
+        from castervoice.lib.ctrl.mgr.rules_config import RulesConfig
+        from castervoice.rules.ccr.java_rules import java
+        from castervoice.rules.ccr.python_rules import python
+
+        merge_scheduler = MergeScheduler(self._gm_args[1], timer_factory=Mock())
+        self._gm = GrammarManager(*self._gm_args, merge_scheduler=merge_scheduler)
+        self._setup_rules_config_file(loadable_true=["Java", "Python"], enabled=["Java"])
+        self._initialize(FullContentSet([java.get_rule(), python.get_rule()], [], []))
+        merge_scheduler.wait(5)
+        self.assertEqual(1, len(self._gm._grammars_container.ccr))
+
+        # simulate a spoken "enable" command from the GrammarActivator:
+        self._gm._change_rule_enabled("Python", True)
+        config = utilities.load_toml_file(TestGrammarManager._MOCK_PATH_RULES_CONFIG)
+        self.assertIn("Java", config[RulesConfig._ENABLED_ORDERED])
+
+        # Java is only KO'd once the merge is applied
+        self.assertTrue(merge_scheduler.wait(5))
+        config = utilities.load_toml_file(TestGrammarManager._MOCK_PATH_RULES_CONFIG)
+        self.assertNotIn("Java", config[RulesConfig._ENABLED_ORDERED])
+        self.assertIn("Python", config[RulesConfig._ENABLED_ORDERED])
+
+    def test_predicted_merge_prefetched(self):
+        from castervoice.lib.ctrl.mgr.grammar_manager import GrammarManager
+        from castervoice.lib.ctrl.mgr.merge_prediction.activation_predictor import ActivationPredictor
+        from castervoice.lib.ctrl.mgr.merge_scheduler import MergeScheduler
+        from castervoice.rules.ccr.java_rules import java
+        from castervoice.rules.ccr.python_rules import python
+        from castervoice.rules.core.alphabet_rules import alphabet
+
+        merge_scheduler = MergeScheduler(self._gm_args[1], timer_factory=Mock())
+        merge_scheduler.prefetch = Mock()
+        self._gm = GrammarManager(*self._gm_args, merge_scheduler=merge_scheduler,
+                                  activation_predictor=ActivationPredictor(1))
+        self._setup_rules_config_file(loadable_true=["Alphabet", "Java", "Python"], enabled=["Alphabet"])
+        self._initialize(FullContentSet([alphabet.get_rule(), java.get_rule(), python.get_rule()], [], []))
+        merge_scheduler.wait(5)
+
+        # Python was enabled while code.exe was in the foreground
+        self._gm.set_foreground_executable("code.exe")
+        self._gm._change_rule_enabled("Python", True)
+        merge_scheduler.wait(5)
+        self._gm._change_rule_enabled("Python", False)
+        merge_scheduler.wait(5)
+        self._gm.set_foreground_executable("explorer.exe")
+        merge_scheduler.prefetch.reset_mock()
+
+        self._gm.set_foreground_executable("code.exe")
+        merges = merge_scheduler.prefetch.call_args[0][0]
+        self.assertEqual(1, len(merges))
+        self.assertEqual(["Alphabet", "Python"], [mr.get_rule_class_name() for mr in merges[0][0]])
+
+    def test_cached_validation_outcome_used(self):
+        from castervoice.lib.ctrl.mgr.grammar_manager import GrammarManager
+        from castervoice.rules.core.alphabet_rules import alphabet
+        from castervoice.rules.core.punctuation_rules import punctuation
+
+        validation_cache = Mock()
+        validation_cache.get.side_effect = lambda rcn, file_hash: \
+            {"invalidation": "Punctuation rejected"} if rcn == "Punctuation" else None
+        self._gm = GrammarManager(*self._gm_args, validation_cache=validation_cache)
+        self._setup_rules_config_file(loadable_true=["Alphabet", "Punctuation"], enabled=["Alphabet"])
+        self._initialize(FullContentSet([alphabet.get_rule(), punctuation.get_rule()], [], []))
+
+        self.assertNotIn("Punctuation", self._gm._managed_rules)
+        alphabet_hash = self._gm._managed_rules["Alphabet"].get_file_hash()
+        validation_cache.put.assert_any_call("Alphabet", alphabet_hash, None)
+        self.assertNotIn("Punctuation", [c[0][0] for c in validation_cache.put.call_args_list])
+        validation_cache.save.assert_called_once_with()
+
+    def test_rule_cached_as_valid_still_instantiated(self):
+        from castervoice.lib.ctrl.mgr.grammar_manager import GrammarManager
+        from castervoice.rules.core.alphabet_rules import alphabet
+
+        class Alphabet(alphabet.Alphabet):
+            def __init__(self):
+                raise RuntimeError("support module missing")
+
+        validation_cache = Mock()
+        validation_cache.get.return_value = {"invalidation": None}
+        self._gm = GrammarManager(*self._gm_args, validation_cache=validation_cache)
+        self._setup_rules_config_file(loadable_true=["Alphabet"], enabled=["Alphabet"])
+        self._initialize(FullContentSet([(Alphabet, alphabet.get_rule()[1])], [], []))
+
+        self.assertNotIn("Alphabet", self._gm._managed_rules)
+        validation_cache.put.assert_not_called()
+
+    def test_prevalidated_rule_validated_on_pool(self):
+        from multiprocessing.pool import ThreadPool
+        from castervoice.lib.ctrl.mgr.grammar_manager import GrammarManager
+        from castervoice.rules.core.alphabet_rules import alphabet
+
+        validation_pool = ThreadPool(1)
+        self._gm = GrammarManager(*self._gm_args, validation_pool=validation_pool)
+        self._setup_rules_config_file(loadable_true=["Alphabet"], enabled=["Alphabet"])
+        rule_class, details = alphabet.get_rule()
+        self._gm.prevalidate_rule(rule_class, details)
+        managed_rule, async_result = self._gm._pending_validations["Alphabet"]
+        self.assertEqual((None, True), async_result.get(5))
+
+        self._initialize(FullContentSet([(rule_class, details)], [], []))
+        self.assertIs(managed_rule, self._gm._managed_rules["Alphabet"])
+        self.assertIsNone(self._gm._validation_pool)
+        self.assertEqual({}, self._gm._pending_validations)
+        self.assertEqual(1, len(self._gm._grammars_container.ccr))
+
+    def test_non_ccr_rules_indexed_with_packed_grammars(self):
+        from castervoice.lib.ctrl.mgr.grammar_container.packed_grammar_container import PackedGrammarContainer
+        from castervoice.lib.ctrl.mgr.grammar_manager import GrammarManager
+        from castervoice.rules.core.utility_rules import caster_rule
+
+        gm_args = list(self._gm_args)
+        gm_args[8] = PackedGrammarContainer()
+        commands_index = Mock()
+        self._gm = GrammarManager(*gm_args, commands_index=commands_index)
+        self._setup_rules_config_file(loadable_true=["CasterRule"], enabled=["CasterRule"])
+        self._initialize(FullContentSet([caster_rule.get_rule()], [], []))
+
+        indexed = dict((c[0][0], c[0][1]) for c in commands_index.set_non_ccr_rule.call_args_list)
+        self.assertIsNotNone(indexed["ManualGrammarReloadRule"])
+        self.assertIsNotNone(indexed["CasterRule"])
+
+    def test_batch_merges_and_saves_once(self):
+        from castervoice.lib import utilities
+        from castervoice.lib.ctrl.mgr.rules_config import RulesConfig
+        from castervoice.rules.ccr.java_rules import java
+        from castervoice.rules.ccr.python_rules import python
+        from castervoice.rules.core.alphabet_rules import alphabet
+        from castervoice.rules.core.punctuation_rules import punctuation
+
+        self._setup_rules_config_file(loadable_true=["Alphabet", "Punctuation", "Java", "Python"],
+                                      enabled=["Java"])
+        self._initialize(FullContentSet([alphabet.get_rule(), punctuation.get_rule(),
+                                         java.get_rule(), python.get_rule()], [], []))
+        self._gm._merger.merge_rules = Mock(wraps=self._gm._merger.merge_rules)
+        self._rule_config.save = Mock(wraps=self._rule_config.save)
+
+        with self._gm.batch():
+            self._gm._change_rule_enabled("Alphabet", True)
+            with self._gm.batch():
+                self._gm._change_rule_enabled("Python", True)
+            self._gm._change_rule_enabled("Punctuation", True)
+            self._gm._change_rule_enabled("Punctuation", False)
+            self.assertEqual(0, self._gm._merger.merge_rules.call_count)
+
+        self.assertEqual(1, self._gm._merger.merge_rules.call_count)
+        self.assertEqual(1, self._rule_config.save.call_count)
+        config = utilities.load_toml_file(TestGrammarManager._MOCK_PATH_RULES_CONFIG)
+        enabled_ordered = config[RulesConfig._ENABLED_ORDERED]
+        self.assertEqual(["Alphabet", "Python"], [rcn for rcn in enabled_ordered
+                                                  if rcn in ["Alphabet", "Punctuation", "Java", "Python"]])
+
+    def test_change_rules_enabled(self):
+        from castervoice.rules.core.alphabet_rules import alphabet
+        from castervoice.rules.core.punctuation_rules import punctuation
+
+        self._setup_rules_config_file(loadable_true=["Alphabet", "Punctuation"], enabled=[])
+        self._initialize(FullContentSet([alphabet.get_rule(), punctuation.get_rule()], [], []))
+        self._gm._merger.merge_rules = Mock(wraps=self._gm._merger.merge_rules)
+
+        self._gm.change_rules_enabled(["Alphabet", "Punctuation"], True)
+        self.assertEqual(1, self._gm._merger.merge_rules.call_count)
+        self.assertEqual(1, len(self._gm._grammars_container.ccr))
+        self.assertEqual(["Alphabet", "Punctuation"],
+                         [mr.get_rule_class_name() for mr in self._gm._merger.merge_rules.call_args[0][0]])
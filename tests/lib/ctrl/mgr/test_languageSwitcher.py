@@ -0,0 +1,91 @@
+import contextlib
+from unittest import TestCase
+
+from mock import Mock, patch
+
+from castervoice.lib.ctrl.mgr.language_switcher import LanguageSwitcher
+
+
+class _FakeGrammarManager(object):
+
+    def __init__(self, rcns, enabled_rcns):
+        self.rcns = rcns
+        self.enabled_rcns = list(enabled_rcns)
+        self.batches = 0
+
+    def has_rule(self, class_name):
+        return class_name in self.rcns
+
+    def get_enabled_rcns_ordered(self):
+        return list(self.enabled_rcns)
+
+    @contextlib.contextmanager
+    def batch(self):
+        self.batches += 1
+        yield
+
+    def change_rules_enabled(self, class_names, enabled):
+        for rcn in class_names:
+            if enabled:
+                self.enabled_rcns.append(rcn)
+            else:
+                self.enabled_rcns.remove(rcn)
+
+
+class TestLanguageSwitcher(TestCase):
+
+    def setUp(self):
+        self._gm = _FakeGrammarManager(["Python", "Rust", "Java", "Alphabet"], ["Alphabet", "Java"])
+        self._filename = None
+        self._now = 100.0
+        self._switcher = LanguageSwitcher(self._gm, {"py": "Python", "RS": "Rust", "java": "Java", "kt": "Kotlin"},
+                                          debounce_seconds=1.0,
+                                          title_info_fn=lambda: [self._filename, [], ""],
+                                          time_fn=lambda: self._now)
+
+    def _focus(self, filename, seconds):
+        self._filename = filename
+        self._switcher.update()
+        self._now += seconds
+        return self._switcher.update()
+
+    def test_switches_after_debounce(self):
+        self._filename = "main.py"
+        self.assertFalse(self._switcher.update())
+        self._now += 0.5
+        self.assertFalse(self._switcher.update())
+        self._now += 0.5
+        self.assertTrue(self._switcher.update())
+        self.assertEqual(["Alphabet", "Python"], self._gm.enabled_rcns)
+        self.assertEqual(1, self._gm.batches)
+
+    def test_brief_focus_doesnt_switch(self):
+        self._focus("main.py", 0.5)
+        self._focus("lib.rs", 0.5)
+        self.assertEqual(["Alphabet", "Java"], self._gm.enabled_rcns)
+        self.assertFalse(self._switcher.update())
+        self._now += 0.5
+        self.assertTrue(self._switcher.update())
+        self.assertEqual(["Alphabet", "Rust"], self._gm.enabled_rcns)
+
+    def test_unknown_files_keep_language(self):
+        self._focus("main.py", 1)
+        self.assertFalse(self._focus(None, 5))
+        self.assertFalse(self._focus("notes.txt", 5))
+        self.assertEqual(["Alphabet", "Python"], self._gm.enabled_rcns)
+
+    def test_no_switch_if_language_already_only_one(self):
+        self.assertFalse(self._focus("Main.JAVA", 1))
+        self.assertEqual(0, self._gm.batches)
+
+    def test_unloaded_language_ignored(self):
+        self.assertIsNone(self._switcher.get_language_rcn("main.kt"))
+        self.assertEqual("Rust", self._switcher.get_language_rcn("lib.rs"))
+        self.assertFalse(self._focus("main.kt", 5))
+
+    def test_start_creates_timer(self):
+        engine = Mock()
+        with patch("castervoice.lib.ctrl.mgr.language_switcher.get_engine", return_value=engine):
+            self._switcher.start(0.5)
+        callback, seconds = engine.create_timer.call_args[0]
+        self.assertEqual(0.5, seconds)
@@ -0,0 +1,84 @@
+import os
+import shutil
+import tempfile
+import threading
+from unittest import TestCase
+
+from castervoice.lib.actions import Text
+from castervoice.lib.ctrl.mgr.managed_rule import ManagedRule
+from castervoice.lib.ctrl.mgr.rule_details import RuleDetails
+from castervoice.lib.merge.mergerule import MergeRule
+from castervoice.lib.merge.selfmod.selfmodrule import BaseSelfModifyingRule
+
+
+class _CountingRule(MergeRule):
+    instantiations = 0
+    mapping = {"counting rule": Text("counted")}
+
+    def __init__(self):
+        _CountingRule.instantiations += 1
+        super(_CountingRule, self).__init__()
+
+
+class _SelfModRule(BaseSelfModifyingRule):
+    config_path = None
+
+    def __init__(self):
+        super(_SelfModRule, self).__init__(_SelfModRule.config_path)
+
+    def _deserialize(self):
+        self._smr_mapping = {"self mod rule": Text("self mod")}
+
+    def _refresh(self, *args):
+        self.reset()
+
+
+class TestManagedRule(TestCase):
+
+    def setUp(self):
+        _CountingRule.instantiations = 0
+        self._managed_rule = ManagedRule(_CountingRule, RuleDetails(ccrtype=None, name="counting rule"))
+
+    def test_class_instantiated_once(self):
+        first = self._managed_rule.get_rule_instance()
+        second = self._managed_rule.get_rule_instance()
+
+        self.assertEqual(1, _CountingRule.instantiations)
+        self.assertIsNot(first, second)
+        self.assertIsInstance(second, _CountingRule)
+        self.assertEqual(first.get_mapping(), second.get_mapping())
+
+    def test_copies_have_own_attributes(self):
+        first = self._managed_rule.get_rule_instance()
+        first.some_configuration = True
+
+        self.assertFalse(hasattr(self._managed_rule.get_rule_instance(), "some_configuration"))
+
+    def test_invalidate_instantiates_again(self):
+        self._managed_rule.get_rule_instance()
+        self._managed_rule.invalidate()
+        self._managed_rule.get_rule_instance()
+
+        self.assertEqual(2, _CountingRule.instantiations)
+
+    def test_selfmod_rule_not_copied(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            _SelfModRule.config_path = os.path.join(temp_dir, "selfmod.toml")
+            managed_rule = ManagedRule(_SelfModRule, RuleDetails(ccrtype=None, name="self mod rule"))
+
+            first = managed_rule.get_rule_instance()
+            self.assertIs(first, managed_rule.get_rule_instance())
+            managed_rule.invalidate()
+            self.assertIsNot(first, managed_rule.get_rule_instance())
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_concurrent_first_use_instantiates_once(self):
+        threads = [threading.Thread(target=self._managed_rule.get_rule_instance) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(1, _CountingRule.instantiations)
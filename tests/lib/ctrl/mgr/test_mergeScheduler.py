@@ -0,0 +1,127 @@
+import threading
+from unittest import TestCase
+
+from mock import Mock
+
+from castervoice.lib.ctrl.mgr.merge_scheduler import MergeScheduler
+
+
+class TestMergeScheduler(TestCase):
+
+    def setUp(self):
+        self._merger = Mock()
+        self._merger.merge_rules.side_effect = lambda managed_rules, sorter: "result of " + sorter
+        self._timer_factory = Mock()
+        self._applied = []
+        self._scheduler = MergeScheduler(self._merger, timer_factory=self._timer_factory, prefetch_delay_seconds=0)
+        self._scheduler.set_apply_fn(self._applied.append)
+
+    def _block_merges(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def merge_rules(managed_rules, sorter):
+            started.set()
+            release.wait(5)
+            return "result of " + sorter
+        self._merger.merge_rules.side_effect = merge_rules
+        return started, release
+
+    def test_merge_applied(self):
+        self._scheduler.submit([], "a")
+        self.assertTrue(self._scheduler.wait(5))
+        self.assertEqual(["result of a"], self._applied)
+        self.assertTrue(self._scheduler.is_idle())
+
+    def test_nothing_applied_until_polled(self):
+        started, release = self._block_merges()
+        self._scheduler.submit([], "a")
+        started.wait(5)
+        self.assertFalse(self._scheduler.apply_completed())
+        release.set()
+        self._scheduler.wait(5)
+        self.assertEqual(["result of a"], self._applied)
+
+    def test_superseded_merges_cancelled(self):
+        started, release = self._block_merges()
+        self._scheduler.submit([], "a")
+        started.wait(5)
+        self._scheduler.submit([], "b")
+        self._scheduler.submit([], "c")
+        release.set()
+        self._scheduler.wait(5)
+
+        # "a" was already running and is discarded, "b" never starts
+        self.assertEqual(["result of c"], self._applied)
+        self.assertEqual(["a", "c"], [call[0][1] for call in self._merger.merge_rules.call_args_list])
+
+    def test_cancel(self):
+        started, release = self._block_merges()
+        self._scheduler.submit([], "a")
+        started.wait(5)
+        self._scheduler.cancel()
+        release.set()
+        self.assertFalse(self._scheduler.wait(5))
+        self.assertEqual([], self._applied)
+
+    def test_failed_merge_keeps_worker(self):
+        self._merger.merge_rules.side_effect = [Exception("oops"), "result of b"]
+        self._scheduler.submit([], "a")
+        self.assertFalse(self._scheduler.wait(5))
+        self._scheduler.submit([], "b")
+        self.assertTrue(self._scheduler.wait(5))
+        self.assertEqual(["result of b"], self._applied)
+
+    def test_timer_only_runs_while_merging(self):
+        self._scheduler.submit([], "a")
+        self._scheduler.submit([], "b")
+        self.assertEqual(1, self._timer_factory.call_count)
+        callback, seconds = self._timer_factory.call_args[0]
+        self.assertEqual(self._scheduler.apply_completed, callback)
+
+        self._scheduler.wait(5)
+        self._timer_factory.return_value.stop.assert_called_once_with()
+        self._scheduler.submit([], "c")
+        self.assertEqual(2, self._timer_factory.call_count)
+
+    def test_prefetched_merges_not_applied(self):
+        prefetched = threading.Event()
+
+        def merge_rules(managed_rules, sorter, speculative=False):
+            if speculative:
+                prefetched.set()
+            return "result of " + sorter
+        self._merger.merge_rules.side_effect = merge_rules
+        self._scheduler.prefetch([([], "a")])
+        self.assertTrue(prefetched.wait(5))
+
+        self.assertFalse(self._scheduler.wait(5))
+        self.assertEqual([], self._applied)
+        self.assertTrue(self._scheduler.is_idle())
+        self.assertEqual(0, self._timer_factory.call_count)
+
+    def test_prefetched_merges_wait_for_newer_ones(self):
+        prefetched = threading.Event()
+
+        def merge_rules(managed_rules, sorter, speculative=False):
+            prefetched.set()
+            return "result of " + sorter
+        self._merger.merge_rules.side_effect = merge_rules
+        scheduler = MergeScheduler(self._merger, timer_factory=self._timer_factory, prefetch_delay_seconds=0.2)
+        scheduler.prefetch([([], "a")])
+        scheduler.prefetch([([], "b")])
+        self.assertTrue(prefetched.wait(5))
+
+        self.assertEqual(["b"], [call[0][1] for call in self._merger.merge_rules.call_args_list])
+
+    def test_submit_discards_prefetched_merges(self):
+        started, release = self._block_merges()
+        self._scheduler.submit([], "a")
+        started.wait(5)
+        self._scheduler.prefetch([([], "b"), ([], "c")])
+        self._scheduler.submit([], "d")
+        release.set()
+        self._scheduler.wait(5)
+
+        self.assertEqual(["result of d"], self._applied)
+        self.assertEqual(["a", "d"], [call[0][1] for call in self._merger.merge_rules.call_args_list])
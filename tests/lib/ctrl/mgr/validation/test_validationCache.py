@@ -0,0 +1,87 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from mock import patch
+
+from castervoice.lib import utilities
+from castervoice.lib.ctrl.mgr.validation.validation_cache import ValidationCache
+
+
+class TestValidationCache(TestCase):
+
+    _PATH = "/mock/validation_cache.json"
+
+    def setUp(self):
+        self._stored = {}
+        load_patcher = patch.object(utilities, "load_json_file", side_effect=lambda path: self._stored.get(path, {}))
+        save_patcher = patch.object(utilities, "save_json_file",
+                                    side_effect=lambda data, path: self._stored.__setitem__(path, data))
+        load_patcher.start()
+        save_patcher.start()
+        self.addCleanup(load_patcher.stop)
+        self.addCleanup(save_patcher.stop)
+
+    def test_entry_used_until_file_changes(self):
+        cache = ValidationCache(TestValidationCache._PATH, "v1")
+        cache.put("Alphabet", "hash1", None)
+        cache.put("Broken", "hash2", "Broken rejected")
+
+        self.assertIsNone(cache.get("Alphabet", "hash1")["invalidation"])
+        self.assertEqual("Broken rejected", cache.get("Broken", "hash2")["invalidation"])
+        self.assertIsNone(cache.get("Alphabet", "hash3"))
+        self.assertIsNone(cache.get("Punctuation", "hash1"))
+
+    def test_only_latest_file_kept(self):
+        cache = ValidationCache(TestValidationCache._PATH, "v1")
+        cache.put("Alphabet", "hash1", None)
+        cache.put("Alphabet", "hash2", None)
+        self.assertIsNone(cache.get("Alphabet", "hash1"))
+        self.assertIsNotNone(cache.get("Alphabet", "hash2"))
+
+    def test_saved_and_reloaded(self):
+        cache = ValidationCache(TestValidationCache._PATH, "v1")
+        cache.put("Alphabet", "hash1", None)
+        cache.save()
+        self.assertIsNotNone(ValidationCache(TestValidationCache._PATH, "v1").get("Alphabet", "hash1"))
+
+    def test_only_saved_if_changed(self):
+        ValidationCache(TestValidationCache._PATH, "v1").save()
+        self.assertNotIn(TestValidationCache._PATH, self._stored)
+
+    def test_other_validators_version_ignored(self):
+        cache = ValidationCache(TestValidationCache._PATH, "v1")
+        cache.put("Alphabet", "hash1", None)
+        cache.save()
+        self.assertIsNone(ValidationCache(TestValidationCache._PATH, "v2").get("Alphabet", "hash1"))
+
+    def test_validators_version_changes_with_source(self):
+        directory = tempfile.mkdtemp()
+        try:
+            with open(os.path.join(directory, "validator.py"), "w") as f:
+                f.write("a = 1\n")
+            version = ValidationCache.get_validators_version([directory])
+            self.assertEqual(version, ValidationCache.get_validators_version([directory]))
+            with open(os.path.join(directory, "validator.py"), "w") as f:
+                f.write("a = 2\n")
+            self.assertNotEqual(version, ValidationCache.get_validators_version([directory]))
+        finally:
+            shutil.rmtree(directory)
+        self.assertIsNotNone(ValidationCache.get_validators_version())
+
+    def test_validators_version_covers_single_modules(self):
+        directory = tempfile.mkdtemp()
+        try:
+            os.mkdir(os.path.join(directory, "validation"))
+            with open(os.path.join(directory, "validation", "validator.py"), "w") as f:
+                f.write("a = 1\n")
+            paths = [os.path.join(directory, "validation"), os.path.join(directory, "mergerule.py")]
+            with open(paths[1], "w") as f:
+                f.write("b = 1\n")
+            version = ValidationCache.get_validators_version(paths)
+            with open(paths[1], "w") as f:
+                f.write("b = 2\n")
+            self.assertNotEqual(version, ValidationCache.get_validators_version(paths))
+        finally:
+            shutil.rmtree(directory)
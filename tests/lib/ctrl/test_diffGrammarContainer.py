@@ -0,0 +1,78 @@
+from unittest import TestCase
+
+from dragonfly import Grammar, MappingRule, Function
+from mock import Mock
+
+from castervoice.lib.const import CCRType
+from castervoice.lib.context import AppContext
+from castervoice.lib.ctrl.mgr.grammar_container.diff_grammar_container import DiffGrammarContainer
+from castervoice.lib.ctrl.mgr.grammar_manager import GrammarManager
+from castervoice.lib.ctrl.mgr.managed_rule import ManagedRule
+from castervoice.lib.ctrl.mgr.rule_details import RuleDetails
+from castervoice.lib.merge.ccrmerging2.caching.rule_state_cache import RuleStateCache
+from castervoice.lib.merge.ccrmerging2.ccrmerger2 import CCRMerger2
+from castervoice.lib.merge.ccrmerging2.compatibility.simple_compat_checker import SimpleCompatibilityChecker
+from castervoice.lib.merge.ccrmerging2.merging.classic_merging_strategy import ClassicMergingStrategy
+from castervoice.lib.merge.ccrmerging2.sorting.config_ruleset_sorter import ConfigBasedRuleSetSorter
+from castervoice.lib.merge.ccrmerging2.transformers.transformers_runner import TransformersRunner
+from tests.lib.merge.ccrmerging2.fake_rules import FakeRuleOne, FakeRuleThree
+
+
+class TestDiffGrammarContainer(TestCase):
+
+    def setUp(self):
+        self._container = DiffGrammarContainer()
+        self._merger = CCRMerger2(TransformersRunner(Mock()), SimpleCompatibilityChecker(),
+                                  ClassicMergingStrategy(), 2, Mock(), rule_state_cache=RuleStateCache())
+        self._global_mr = ManagedRule(FakeRuleOne, RuleDetails(ccrtype=CCRType.GLOBAL))
+        self._app_mr = ManagedRule(FakeRuleThree, RuleDetails(ccrtype=CCRType.APP, executable="notepad"))
+
+    def tearDown(self):
+        self._container.wipe_ccr()
+
+    def _merge_and_set(self, managed_rules):
+        sorter = ConfigBasedRuleSetSorter([mr.get_rule_class_name() for mr in managed_rules])
+        grammars = GrammarManager._create_ccr_grammars(self._merger.merge_rules(managed_rules, sorter))
+        grammars_to_load = self._container.set_ccr(grammars)
+        for grammar in grammars_to_load:
+            grammar.load()
+        return grammars_to_load
+
+    def test_unchanged_grammars_kept(self):
+        loaded = self._merge_and_set([self._global_mr, self._app_mr])
+        self.assertEqual(2, len(loaded))
+
+        self.assertEqual([], self._merge_and_set([self._global_mr, self._app_mr]))
+        self.assertEqual(loaded, self._container._ccr_grammars)
+        self.assertTrue(all(grammar.loaded for grammar in loaded))
+
+    def test_changed_grammar_replaced(self):
+        global_grammar, app_grammar = self._merge_and_set([self._global_mr, self._app_mr])
+
+        self._app_mr.invalidate()
+        loaded = self._merge_and_set([self._global_mr, self._app_mr])
+        self.assertEqual(1, len(loaded))
+        self.assertEqual([global_grammar, loaded[0]], self._container._ccr_grammars)
+        self.assertTrue(global_grammar.loaded)
+        self.assertFalse(app_grammar.loaded)
+
+    def test_removed_grammar_unloaded(self):
+        global_grammar, app_grammar = self._merge_and_set([self._global_mr, self._app_mr])
+
+        # the global grammar's context no longer has to exclude the app's, so it changes too
+        loaded = self._merge_and_set([self._global_mr])
+        self.assertEqual(loaded, self._container._ccr_grammars)
+        self.assertFalse(global_grammar.loaded)
+        self.assertFalse(app_grammar.loaded)
+
+    def test_context_is_part_of_fingerprint(self):
+        action = Function(lambda: None)
+
+        def create_grammar(context):
+            grammar = Grammar("diff test", context=context)
+            grammar.add_rule(MappingRule(name="same", mapping={"same spec": action}))
+            return grammar
+
+        self._container.set_ccr([create_grammar(AppContext(executable="notepad"))])
+        self.assertEqual(0, len(self._container.set_ccr([create_grammar(AppContext(executable="notepad"))])))
+        self.assertEqual(1, len(self._container.set_ccr([create_grammar(AppContext(executable="code"))])))
@@ -0,0 +1,100 @@
+from unittest import TestCase
+
+from dragonfly import Grammar, MappingRule, Function
+
+from castervoice.lib.context import AppContext
+from castervoice.lib.ctrl.mgr.grammar_container.packed_grammar_container import PackedGrammarContainer
+
+
+def _do_nothing():
+    pass
+
+
+class _RuleOne(MappingRule):
+    mapping = {"packed one": Function(_do_nothing)}
+
+
+class _RuleTwo(MappingRule):
+    mapping = {"packed two": Function(_do_nothing)}
+
+
+class TestPackedGrammarContainer(TestCase):
+
+    def setUp(self):
+        self._container = PackedGrammarContainer()
+
+    def tearDown(self):
+        for grammar in self._container._packed_grammars.values():
+            grammar.unload()
+        for grammar in self._container._non_ccr_grammars.values():
+            grammar.unload()
+
+    def _set(self, rcn, rule_class, executable=None, rule_name=None):
+        context = AppContext(executable=executable) if executable is not None else None
+        grammar = Grammar(name="g" + rcn, context=context)
+        grammar.add_rule(rule_class(name=rule_name if rule_name is not None else rcn))
+        return self._load(self._container.set_non_ccr(rcn, grammar))
+
+    def _load(self, grammars):
+        for grammar in grammars:
+            grammar.load()
+        return grammars
+
+    def test_same_context_rules_share_grammar(self):
+        first = self._set("RuleOne", _RuleOne)
+        second = self._set("RuleTwo", _RuleTwo)
+
+        self.assertEqual(1, len(second))
+        self.assertEqual(1, len(self._container._packed_grammars))
+        self.assertEqual(["RuleOne", "RuleTwo"], [rule.name for rule in second[0].rules if rule.exported])
+        self.assertTrue(second[0].loaded)
+        self.assertFalse(first[0].loaded)
+
+    def test_different_contexts_get_different_grammars(self):
+        self._set("RuleOne", _RuleOne)
+        self._set("RuleTwo", _RuleTwo, executable="notepad")
+
+        self.assertEqual(2, len(self._container._packed_grammars))
+
+    def test_disable_and_enable_in_place(self):
+        self._set("RuleOne", _RuleOne)
+        self._set("RuleTwo", _RuleTwo)
+        pack = self._container._packed_grammars[str(None)]
+        rule_one = pack.rules[0]
+
+        self.assertEqual([], self._container.set_non_ccr("RuleOne", None))
+        self.assertFalse(rule_one.enabled)
+        self.assertTrue(pack.loaded)
+
+        self.assertEqual([], self._set("RuleOne", _RuleOne))
+        self.assertTrue(rule_one.enabled)
+        self.assertIs(pack, self._container._packed_grammars[str(None)])
+
+    def test_changed_rule_rebuilds_pack(self):
+        self._set("RuleOne", _RuleOne)
+        old_pack = self._set("RuleTwo", _RuleTwo)[0]
+
+        new_pack = self._set("RuleTwo", _RuleOne, rule_name="RuleTwo")[0]
+        self.assertIsNot(old_pack, new_pack)
+        self.assertFalse(old_pack.loaded)
+        self.assertEqual(0, len(old_pack.rules))
+        self.assertEqual(["RuleOne", "RuleTwo"], [rule.name for rule in new_pack.rules if rule.exported])
+
+    def test_context_change_moves_rule(self):
+        self._set("RuleOne", _RuleOne)
+        self._set("RuleTwo", _RuleTwo)
+
+        loaded = self._set("RuleTwo", _RuleTwo, executable="notepad")
+        self.assertEqual(2, len(loaded))
+        self.assertEqual(2, len(self._container._packed_grammars))
+        for grammar in loaded:
+            self.assertEqual(1, len([rule for rule in grammar.rules if rule.exported]))
+
+    def test_name_collision_falls_back_to_own_grammar(self):
+        self._set("RuleOne", _RuleOne)
+        loaded = self._set("RuleTwo", _RuleTwo, rule_name="RuleOne")
+
+        self.assertEqual(1, len(self._container._packed_grammars))
+        self.assertEqual([loaded[0]], list(self._container._non_ccr_grammars.values()))
+        self.assertEqual([], self._container.set_non_ccr("RuleTwo", None))
+        self.assertFalse(loaded[0].loaded)
@@ -0,0 +1,44 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from mock import Mock
+
+from castervoice.lib.ctrl import startup_profile
+
+
+class TestStartupProfile(TestCase):
+
+    def setUp(self):
+        self._user_dir = tempfile.mkdtemp()
+        self._scratch_dir = tempfile.mkdtemp()
+        os.mkdir(os.path.join(self._user_dir, "settings"))
+        with open(os.path.join(self._user_dir, "settings", "rules.toml"), "w") as f:
+            f.write("enabled_ordered = []\n")
+
+    def tearDown(self):
+        shutil.rmtree(self._user_dir)
+        shutil.rmtree(self._scratch_dir)
+
+    def test_user_files_copied_to_scratch_dir(self):
+        settings = Mock()
+        outside_path = os.path.join(self._scratch_dir, "elsewhere.toml")
+        settings.SETTINGS = {"paths": {
+            "USER_DIR": self._user_dir,
+            "RULES_CONFIG_PATH": os.path.join(self._user_dir, "settings", "rules.toml"),
+            "VALIDATION_CACHE_PATH": os.path.join(self._user_dir, "data", "validation_cache.json"),
+            "SIKULI_SCRIPTS_PATH": self._user_dir,
+            "GIT_REPO_LOCAL_REMOTE_DEFAULT_PATH": outside_path}}
+        startup_profile._use_scratch_user_files(settings, self._scratch_dir)
+
+        paths = settings.SETTINGS["paths"]
+        self.assertEqual(self._user_dir, paths["USER_DIR"])
+        self.assertEqual(self._user_dir, paths["SIKULI_SCRIPTS_PATH"])
+        self.assertEqual(outside_path, paths["GIT_REPO_LOCAL_REMOTE_DEFAULT_PATH"])
+        self.assertEqual(os.path.join(self._scratch_dir, "settings", "rules.toml"), paths["RULES_CONFIG_PATH"])
+        with open(paths["RULES_CONFIG_PATH"]) as f:
+            self.assertEqual("enabled_ordered = []\n", f.read())
+        self.assertEqual(os.path.join(self._scratch_dir, "data", "validation_cache.json"),
+                         paths["VALIDATION_CACHE_PATH"])
+        self.assertTrue(os.path.isdir(os.path.join(self._scratch_dir, "data")))
@@ -0,0 +1,98 @@
+from mock import Mock, patch
+
+from castervoice.lib.const import CCRType
+from castervoice.lib.ctrl.mgr.managed_rule import ManagedRule
+from castervoice.lib.ctrl.mgr.rule_details import RuleDetails
+from castervoice.lib.merge.ccrmerging2.caching.merge_plan_cache import MergePlanCache
+from castervoice.lib.merge.ccrmerging2.ccrmerger2 import CCRMerger2
+from castervoice.lib.merge.ccrmerging2.compatibility.simple_compat_checker import SimpleCompatibilityChecker
+from castervoice.lib.merge.ccrmerging2.merging.classic_merging_strategy import ClassicMergingStrategy
+from castervoice.lib.merge.ccrmerging2.sorting.config_ruleset_sorter import ConfigBasedRuleSetSorter
+from castervoice.lib.merge.ccrmerging2.transformers.transformers_runner import TransformersRunner
+from tests.lib.merge.ccrmerging2.fake_rules import FakeRuleOne, FakeRuleTwo, FakeRuleThree
+from tests.test_util.settings_mocking import SettingsEnabledTestCase
+
+
+@patch("castervoice.lib.utilities.save_json_file")
+@patch("castervoice.lib.utilities.load_json_file", return_value={})
+class TestMergePlanCache(SettingsEnabledTestCase):
+
+    @staticmethod
+    def _create_managed_rule(rule_class):
+        return ManagedRule(rule_class, RuleDetails(ccrtype=CCRType.GLOBAL))
+
+    def setUp(self):
+        self.sorter = ConfigBasedRuleSetSorter(["FakeRuleOne", "FakeRuleTwo", "FakeRuleThree"])
+        self.managed_rules = [TestMergePlanCache._create_managed_rule(FakeRuleOne),
+                              TestMergePlanCache._create_managed_rule(FakeRuleTwo),
+                              TestMergePlanCache._create_managed_rule(FakeRuleThree)]
+
+    def _create_merger(self, merge_plan_cache):
+        self.compat_checker = Mock(wraps=SimpleCompatibilityChecker())
+        return CCRMerger2(TransformersRunner(Mock()), self.compat_checker, ClassicMergingStrategy(), 4, Mock(),
+                          merge_plan_cache=merge_plan_cache)
+
+    def test_get_missing_plan(self, load, save):
+        cache = MergePlanCache("path")
+        self.assertIsNone(cache.get_plan("key"))
+
+    def test_put_plan_saves(self, load, save):
+        cache = MergePlanCache("path")
+        cache.put_plan("key", ["FakeRuleTwo"])
+
+        self.assertEqual(["FakeRuleTwo"], cache.get_plan("key"))
+        save.assert_called_once_with({"version": 1, "plans": [["key", ["FakeRuleTwo"]]]}, "path")
+
+    def test_keeps_most_recent_plans(self, load, save):
+        cache = MergePlanCache("path", max_plans=2)
+        cache.put_plan("a", [])
+        cache.put_plan("b", [])
+        cache.put_plan("a", [])
+        cache.put_plan("c", [])
+
+        self.assertIsNone(cache.get_plan("b"))
+        self.assertEqual([], cache.get_plan("a"))
+        self.assertEqual([], cache.get_plan("c"))
+
+    def test_used_plans_kept(self, load, save):
+        load.return_value = {"version": 1, "plans": [["a", []], ["b", []]]}
+        cache = MergePlanCache("path", max_plans=2)
+        self.assertEqual([], cache.get_plan("a"))
+        save.assert_not_called()
+        cache.put_plan("c", [])
+
+        self.assertIsNone(cache.get_plan("b"))
+        save.assert_called_once_with({"version": 1, "plans": [["a", []], ["c", []]]}, "path")
+
+    def test_ignores_other_versions(self, load, save):
+        load.return_value = {"version": 0, "plans": [["key", []]]}
+        self.assertIsNone(MergePlanCache("path").get_plan("key"))
+
+    def test_warm_merge_skips_compatibility_check(self, load, save):
+        """
+        A merge after a restart uses the saved plan instead of checking compatibility again.
+        """
+        cold_merger = self._create_merger(MergePlanCache("path"))
+        cold_result = cold_merger.merge_rules(self.managed_rules, self.sorter)
+        self.assertEqual(1, self.compat_checker.compatibility_check.call_count)
+
+        load.return_value = save.call_args[0][0]
+        warm_merger = self._create_merger(MergePlanCache("path"))
+        warm_result = warm_merger.merge_rules(self.managed_rules, self.sorter)
+
+        self.assertEqual(0, self.compat_checker.compatibility_check.call_count)
+        self.assertEqual(["FakeRuleTwo", "FakeRuleThree"], cold_result.all_rule_class_names)
+        self.assertEqual(cold_result.all_rule_class_names, warm_result.all_rule_class_names)
+
+    def test_changed_rules_are_replanned(self, load, save):
+        merger = self._create_merger(MergePlanCache("path"))
+        merger.merge_rules(self.managed_rules, self.sorter)
+        merger.merge_rules(self.managed_rules[:2], self.sorter)
+
+        self.assertEqual(2, self.compat_checker.compatibility_check.call_count)
+
+    def test_speculative_merge_not_planned(self, load, save):
+        merger = self._create_merger(MergePlanCache("path"))
+        merger.merge_rules(self.managed_rules, self.sorter, speculative=True)
+
+        save.assert_not_called()
@@ -0,0 +1,65 @@
+from mock import Mock
+
+from castervoice.lib.const import CCRType
+from castervoice.lib.ctrl.mgr.managed_rule import ManagedRule
+from castervoice.lib.ctrl.mgr.rule_details import RuleDetails
+from castervoice.lib.ctrl.nexus import Nexus
+from castervoice.lib.merge.ccrmerging2.sorting.config_ruleset_sorter import ConfigBasedRuleSetSorter
+from castervoice.lib.merge.ccrmerging2.transformers.transformers_runner import TransformersRunner
+from tests.lib.merge.ccrmerging2.fake_rules import FakeRuleOne, FakeRuleTwo, FakeRuleThree
+from tests.test_util.settings_mocking import SettingsEnabledTestCase
+
+
+class TestMergeResultCache(SettingsEnabledTestCase):
+
+    @staticmethod
+    def _create_managed_rule(rule_class):
+        return ManagedRule(rule_class, RuleDetails(ccrtype=CCRType.GLOBAL))
+
+    def setUp(self):
+        self._set_setting(["miscellaneous", "max_ccr_repetitions"], "4")
+        self._set_setting(["ccr_merging", "result_cache_size"], 2)
+        self.sorter = ConfigBasedRuleSetSorter(["FakeRuleOne", "FakeRuleTwo", "FakeRuleThree"])
+        self.merger = Nexus._create_merger(Mock(), TransformersRunner(Mock()))
+        self.one_mr = TestMergeResultCache._create_managed_rule(FakeRuleOne)
+        self.two_mr = TestMergeResultCache._create_managed_rule(FakeRuleTwo)
+        self.three_mr = TestMergeResultCache._create_managed_rule(FakeRuleThree)
+
+    def tearDown(self):
+        self._set_setting(["ccr_merging", "result_cache_size"], 0)
+
+    def _get_prepared_rule(self, merge_result):
+        repeat_rule = merge_result.ccr_rules_and_contexts[0][0]
+        return repeat_rule._extras["caster_base_sequence"]._child._children[0]._rule
+
+    def test_switching_back_reuses_merged_rules(self):
+        """
+        Going back to a recently merged rule set reuses its merged rule, but not its RepeatRule.
+        """
+        first = self.merger.merge_rules([self.one_mr], self.sorter)
+        self.merger.merge_rules([self.one_mr, self.three_mr], self.sorter)
+        third = self.merger.merge_rules([self.one_mr], self.sorter)
+
+        self.assertIs(self._get_prepared_rule(first), self._get_prepared_rule(third))
+        self.assertIsNot(first.ccr_rules_and_contexts[0][0], third.ccr_rules_and_contexts[0][0])
+        self.assertEqual(1, self.merger._merge_result_cache.hits)
+
+    def test_cached_result_has_fresh_diff(self):
+        """
+        Callers modify the returned diff, so it can't be shared between merges.
+        """
+        first = self.merger.merge_rules([self.one_mr, self.two_mr], self.sorter)
+        first.rules_enabled_diff.newly_enabled.append("FakeRuleTwo")
+        second = self.merger.merge_rules([self.one_mr, self.two_mr], self.sorter)
+
+        self.assertEqual(["FakeRuleTwo"], second.all_rule_class_names)
+        self.assertEqual([], second.rules_enabled_diff.newly_enabled)
+        self.assertEqual(set(["FakeRuleOne"]), second.rules_enabled_diff.newly_disabled)
+
+    def test_changed_rule_is_not_reused(self):
+        first = self.merger.merge_rules([self.one_mr], self.sorter)
+        self.one_mr.invalidate()
+        second = self.merger.merge_rules([self.one_mr], self.sorter)
+
+        self.assertIsNot(self._get_prepared_rule(first), self._get_prepared_rule(second))
+        self.assertEqual(0, self.merger._merge_result_cache.hits)
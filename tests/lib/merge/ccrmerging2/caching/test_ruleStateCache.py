@@ -0,0 +1,114 @@
+from mock import Mock
+
+from castervoice.lib.const import CCRType
+from castervoice.lib.ctrl.mgr.managed_rule import ManagedRule
+from castervoice.lib.ctrl.mgr.rule_details import RuleDetails
+from castervoice.lib.ctrl.nexus import Nexus
+from castervoice.lib.merge.ccrmerging2.caching.rule_state_cache import RuleStateCache
+from castervoice.lib.merge.ccrmerging2.sorting.config_ruleset_sorter import ConfigBasedRuleSetSorter
+from castervoice.lib.merge.ccrmerging2.transformers.transformers_runner import TransformersRunner
+from tests.lib.merge.ccrmerging2.fake_rules import FakeRuleOne, FakeRuleTwo, FakeRuleThree
+from tests.test_util.settings_mocking import SettingsEnabledTestCase
+
+
+class TestRuleStateCache(SettingsEnabledTestCase):
+
+    @staticmethod
+    def _create_managed_rule(rule_class, ccrtype=CCRType.GLOBAL, executable=None):
+        return ManagedRule(rule_class, RuleDetails(ccrtype=ccrtype, executable=executable))
+
+    def setUp(self):
+        self._set_setting(["miscellaneous", "max_ccr_repetitions"], "4")
+        self._set_setting(["ccr_merging", "incremental"], True)
+        self.sorter = ConfigBasedRuleSetSorter(["FakeRuleOne", "FakeRuleTwo", "FakeRuleThree"])
+        self.transformers_runner = TransformersRunner(Mock())
+        self.merger = Nexus._create_merger(Mock(), self.transformers_runner)
+
+    def tearDown(self):
+        self._set_setting(["ccr_merging", "incremental"], False)
+
+    def _get_prepared_rules(self, merge_result):
+        return [rr._extras["caster_base_sequence"]._child._children[0]._rule
+                for rr, _ in merge_result.ccr_rules_and_contexts]
+
+    def test_transformed_rule_reused_if_unchanged(self):
+        cache = RuleStateCache()
+        mr = TestRuleStateCache._create_managed_rule(FakeRuleOne)
+        rule = FakeRuleOne()
+        cache.put_transformed_rule(mr, rule)
+
+        self.assertIs(rule, cache.get_transformed_rule(mr))
+
+    def test_transformed_rule_discarded_if_invalidated(self):
+        cache = RuleStateCache()
+        mr = TestRuleStateCache._create_managed_rule(FakeRuleOne)
+        cache.put_transformed_rule(mr, FakeRuleOne())
+        mr.invalidate()
+
+        self.assertIsNone(cache.get_transformed_rule(mr))
+
+    def test_transformed_rule_discarded_if_class_replaced(self):
+        cache = RuleStateCache()
+        cache.put_transformed_rule(TestRuleStateCache._create_managed_rule(FakeRuleOne), FakeRuleOne())
+        reloaded_class = type("FakeRuleOne", (FakeRuleOne,), {})
+
+        self.assertIsNone(cache.get_transformed_rule(TestRuleStateCache._create_managed_rule(reloaded_class)))
+
+    def test_end_merge_discards_unused_groups(self):
+        cache = RuleStateCache()
+        cache.put_prepared_rule(("a",), "rule a")
+        cache.end_merge()
+        cache.put_prepared_rule(("b",), "rule b")
+        cache.end_merge()
+
+        self.assertIsNone(cache.get_prepared_rule(("a",)))
+        self.assertEqual("rule b", cache.get_prepared_rule(("b",)))
+
+    def test_end_speculative_merge_keeps_unused_groups(self):
+        cache = RuleStateCache()
+        cache.put_prepared_rule(("a",), "rule a")
+        cache.end_merge()
+        cache.put_prepared_rule(("b",), "rule b")
+        cache.end_merge(discard_unused=False)
+
+        self.assertEqual("rule a", cache.get_prepared_rule(("a",)))
+        self.assertEqual("rule b", cache.get_prepared_rule(("b",)))
+
+    def test_remerge_reuses_unchanged_merged_rule(self):
+        """
+        Merging the same rules twice shouldn't merge them again.
+        """
+        managed_rules = [TestRuleStateCache._create_managed_rule(FakeRuleOne),
+                         TestRuleStateCache._create_managed_rule(FakeRuleThree)]
+        first = self.merger.merge_rules(managed_rules, self.sorter)
+        second = self.merger.merge_rules(managed_rules, self.sorter)
+
+        self.assertIs(self._get_prepared_rules(first)[0], self._get_prepared_rules(second)[0])
+
+    def test_remerge_rebuilds_changed_merged_rule(self):
+        """
+        Adding a rule must produce a new merged rule which includes it.
+        """
+        one_mr = TestRuleStateCache._create_managed_rule(FakeRuleOne)
+        three_mr = TestRuleStateCache._create_managed_rule(FakeRuleThree)
+        first = self.merger.merge_rules([one_mr], self.sorter)
+        second = self.merger.merge_rules([one_mr, three_mr], self.sorter)
+
+        first_rule = self._get_prepared_rules(first)[0]
+        second_rule = self._get_prepared_rules(second)[0]
+        self.assertIsNot(first_rule, second_rule)
+        self.assertNotIn("c", first_rule._mapping)
+        self.assertIn("c", second_rule._mapping)
+
+    def test_remerge_respects_incompatibility(self):
+        """
+        KO'd rules stay KO'd when merged rules are reused.
+        """
+        one_mr = TestRuleStateCache._create_managed_rule(FakeRuleOne)
+        two_mr = TestRuleStateCache._create_managed_rule(FakeRuleTwo)
+        self.merger.merge_rules([one_mr, two_mr], self.sorter)
+        result = self.merger.merge_rules([one_mr, two_mr], self.sorter)
+
+        merged_rule = self._get_prepared_rules(result)[0]
+        self.assertIn("two exclusive", merged_rule._mapping)
+        self.assertNotIn("one exclusive", merged_rule._mapping)
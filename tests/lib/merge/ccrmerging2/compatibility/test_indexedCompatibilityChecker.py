@@ -0,0 +1,110 @@
+from unittest import TestCase
+
+from dragonfly import IntegerRef
+
+from castervoice.lib.merge.ccrmerging2.compatibility.indexed_compat_checker import IndexedCompatibilityChecker
+from castervoice.lib.merge.mergerule import MergeRule
+from castervoice.lib.merge.state.actions2 import NullAction
+from tests.lib.merge.ccrmerging2.fake_rules import FakeRuleOne, FakeRuleTwo, FakeRuleThree
+
+
+class _GoToLineRule(MergeRule):
+    mapping = {
+        "[go to] line <n>": NullAction()
+    }
+    extras = [IntegerRef("n", 1, 100)]
+
+
+class _LineRule(MergeRule):
+    mapping = {
+        "line <n>": NullAction()
+    }
+    extras = [IntegerRef("n", 1, 100)]
+
+
+class _PlainLineRule(MergeRule):
+    mapping = {
+        "line": NullAction()
+    }
+
+
+class _ManyOptionalsRule(MergeRule):
+    mapping = {
+        "[a] [b] [c] [d] line": NullAction()
+    }
+
+
+class TestIndexedCompatibilityChecker(TestCase):
+
+    def setUp(self):
+        self._compat_checker = IndexedCompatibilityChecker()
+
+    def test_elimination(self):
+        a = FakeRuleOne()
+        b = FakeRuleTwo()
+        results = self._compat_checker.compatibility_check([a, b])
+        self.assertEqual(1, len(results))
+        self.assertIs(b, results[0].rule())
+
+    def test_order_preservation(self):
+        a = FakeRuleOne()
+        b = FakeRuleThree()
+
+        results = self._compat_checker.compatibility_check([a, b])
+        self.assertIs(a, results[0].rule())
+        self.assertIs(b, results[1].rule())
+
+        results = self._compat_checker.compatibility_check([b, a])
+        self.assertIs(b, results[0].rule())
+        self.assertIs(a, results[1].rule())
+
+    def test_optional_words_conflict(self):
+        a = _GoToLineRule()
+        b = _LineRule()
+        results = self._compat_checker.compatibility_check([a, b])
+        self.assertEqual(1, len(results))
+        self.assertIs(b, results[0].rule())
+
+    def test_expansion_limit(self):
+        a = _PlainLineRule()
+        b = _ManyOptionalsRule()
+        self.assertEqual(1, len(self._compat_checker.compatibility_check([a, b])))
+
+        limited_checker = IndexedCompatibilityChecker(max_expansions=8)
+        self.assertEqual(2, len(limited_checker.compatibility_check([a, b])))
+
+    def test_only_present_rules_eliminate(self):
+        self._compat_checker.compatibility_check([FakeRuleOne(), FakeRuleTwo()])
+        a = FakeRuleOne()
+        results = self._compat_checker.compatibility_check([a, FakeRuleThree()])
+        self.assertEqual(2, len(results))
+        self.assertIs(a, results[0].rule())
+
+    def test_unchanged_rule_not_reindexed(self):
+        a = FakeRuleOne()
+        self._compat_checker.compatibility_check([a])
+        forms = self._compat_checker._indexed_rules["FakeRuleOne"][1]
+        self._compat_checker.compatibility_check([a])
+        self.assertIs(forms, self._compat_checker._indexed_rules["FakeRuleOne"][1])
+
+    def test_new_instance_reindexed(self):
+        a = FakeRuleOne()
+        self._compat_checker.compatibility_check([a, FakeRuleTwo()])
+        self.assertEqual(set(["FakeRuleTwo"]),
+                         self._compat_checker.get_conflicting_rule_class_names("FakeRuleOne"))
+
+        class FakeRuleOne2(MergeRule):
+            mapping = {
+                "one exclusive": NullAction()
+            }
+        replacement = FakeRuleOne2()
+        replacement.get_rule_class_name = lambda: "FakeRuleOne"
+        self._compat_checker.update_rule(replacement)
+        self.assertEqual(set(), self._compat_checker.get_conflicting_rule_class_names("FakeRuleOne"))
+        self.assertEqual(set(), self._compat_checker.get_conflicting_rule_class_names("FakeRuleTwo"))
+
+    def test_remove_rule(self):
+        self._compat_checker.compatibility_check([FakeRuleOne(), FakeRuleTwo()])
+        self._compat_checker.remove_rule("FakeRuleOne")
+        self.assertEqual(set(), self._compat_checker.get_conflicting_rule_class_names("FakeRuleTwo"))
+        self.assertNotIn("one exclusive", self._compat_checker._forms_to_rcns)
@@ -0,0 +1,37 @@
+from unittest import TestCase
+
+from castervoice.lib.merge.ccrmerging2.compatibility.spec_expansion import expand_spec, normalize_spec
+
+
+class TestSpecExpansion(TestCase):
+
+    def test_plain_spec(self):
+        self.assertEqual(["sauce wally"], expand_spec("sauce wally", 64))
+
+    def test_optional(self):
+        self.assertEqual(["go to line <n>", "line <n>"], expand_spec("[go to] line <n>", 64))
+
+    def test_alternatives(self):
+        self.assertEqual(["a c", "b c"], expand_spec("(a | b) c", 64))
+
+    def test_nested(self):
+        forms = expand_spec("(a | b) [c (d | e)]", 64)
+        self.assertEqual(set(["a", "b", "a c d", "a c e", "b c d", "b c e"]), set(forms))
+
+    def test_normalizes_case_and_whitespace(self):
+        self.assertEqual(["sauce wally"], expand_spec("Sauce   Wally", 64))
+
+    def test_duplicate_forms_removed(self):
+        self.assertEqual(["a"], expand_spec("(a | a)", 64))
+
+    def test_empty_form_dropped(self):
+        self.assertEqual(["a"], expand_spec("[a]", 64))
+
+    def test_limit_falls_back_to_normalized_spec(self):
+        spec = "[a] [b] [c] [d] [e] [f] [g]"
+        self.assertEqual(127, len(expand_spec(spec, 128)))
+        self.assertEqual([normalize_spec(spec)], expand_spec(spec, 64))
+
+    def test_unbalanced_spec_falls_back_to_normalized_spec(self):
+        self.assertEqual(["a [ b"], expand_spec("a [b", 64))
+        self.assertEqual(["a ) b"], expand_spec("a) b", 64))
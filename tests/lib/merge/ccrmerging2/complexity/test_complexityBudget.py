@@ -0,0 +1,124 @@
+from mock import Mock, patch
+
+from castervoice.lib.const import CCRType
+from castervoice.lib.context import AppContext
+from castervoice.lib.ctrl.mgr.managed_rule import ManagedRule
+from castervoice.lib.ctrl.mgr.rule_details import RuleDetails
+from castervoice.lib.merge.ccrmerging2.ccrmerger2 import CCRMerger2
+from castervoice.lib.merge.ccrmerging2.compatibility.compat_result import CompatibilityResult
+from castervoice.lib.merge.ccrmerging2.compatibility.simple_compat_checker import SimpleCompatibilityChecker
+from castervoice.lib.merge.ccrmerging2.complexity.complexity_budget import ComplexityBudget
+from castervoice.lib.merge.ccrmerging2.merging.classic_merging_strategy import ClassicMergingStrategy
+from castervoice.lib.merge.ccrmerging2.sorting.config_ruleset_sorter import ConfigBasedRuleSetSorter
+from castervoice.lib.merge.ccrmerging2.transformers.transformers_runner import TransformersRunner
+from castervoice.lib.merge.mergerule import MergeRule
+from castervoice.lib.merge.state.actions2 import NullAction
+from tests.test_util.settings_mocking import SettingsEnabledTestCase
+
+
+class _SmallRule(MergeRule):
+    mapping = {
+        "small": NullAction()
+    }
+
+
+class _MediumRule(MergeRule):
+    mapping = {
+        "medium one": NullAction(),
+        "medium two": NullAction()
+    }
+
+
+class _LargeRule(MergeRule):
+    mapping = {
+        "large one two three": NullAction(),
+        "large four five six": NullAction()
+    }
+
+
+class _AppRule(MergeRule):
+    mapping = {
+        "app one two": NullAction()
+    }
+
+
+class TestComplexityBudget(SettingsEnabledTestCase):
+
+    def setUp(self):
+        self._set_setting(["miscellaneous", "max_ccr_repetitions"], "2")
+
+    @staticmethod
+    def _create_merger(budget, shared_layout=False):
+        return CCRMerger2(TransformersRunner(Mock()), SimpleCompatibilityChecker(), ClassicMergingStrategy(),
+                          2, Mock(), shared_layout=shared_layout, complexity_budget=budget)
+
+    @staticmethod
+    def _merge(merger, managed_rules):
+        sorter = ConfigBasedRuleSetSorter([mr.get_rule_class_name() for mr in managed_rules])
+        return merger.merge_rules(managed_rules, sorter)
+
+    @staticmethod
+    def _create_managed_rules():
+        return [ManagedRule(_SmallRule, RuleDetails(ccrtype=CCRType.GLOBAL)),
+                ManagedRule(_MediumRule, RuleDetails(ccrtype=CCRType.GLOBAL)),
+                ManagedRule(_LargeRule, RuleDetails(ccrtype=CCRType.GLOBAL))]
+
+    def test_under_budget(self):
+        budget = ComplexityBudget(100, ComplexityBudget.SPLIT)
+        crs = [CompatibilityResult(_SmallRule(), frozenset()), CompatibilityResult(_LargeRule(), frozenset())]
+        overflow_rcns, complexity = budget.apply([crs], 2)
+        self.assertEqual([], overflow_rcns)
+        self.assertEqual((1 + 8) * 2, complexity)
+
+    @patch("castervoice.lib.printer.out")
+    def test_warn_keeps_rules(self, out):
+        budget = ComplexityBudget(10, ComplexityBudget.WARN)
+        crs = [CompatibilityResult(_SmallRule(), frozenset()), CompatibilityResult(_LargeRule(), frozenset())]
+        overflow_rcns, complexity = budget.apply([crs], 2)
+        self.assertEqual([], overflow_rcns)
+        self.assertEqual(18, complexity)
+        # the breakdown lists the biggest rule first
+        self.assertIn("_LargeRule: 8", out.call_args_list[1][0][0])
+        self.assertIn("_SmallRule: 1", out.call_args_list[2][0][0])
+
+    @patch("castervoice.lib.printer.out")
+    def test_quiet_prints_nothing(self, out):
+        budget = ComplexityBudget(16, ComplexityBudget.SPLIT)
+        crs = [CompatibilityResult(_SmallRule(), frozenset()), CompatibilityResult(_LargeRule(), frozenset())]
+        overflow_rcns, complexity = budget.apply([crs], 2, quiet=True)
+        self.assertEqual(["_SmallRule"], overflow_rcns)
+        out.assert_not_called()
+
+    @patch("castervoice.lib.printer.out")
+    def test_split_moves_lowest_priority_rules(self, out):
+        budget = ComplexityBudget(20, ComplexityBudget.SPLIT)
+        result = TestComplexityBudget._merge(TestComplexityBudget._create_merger(budget),
+                                             TestComplexityBudget._create_managed_rules())
+
+        # (1 + 4 + 8) * 2 is over budget: the small rule and then the medium rule have to go
+        self.assertEqual(1, len(result.ccr_rules_and_contexts))
+        self.assertEqual(["_SmallRule", "_MediumRule"],
+                         [rule.name for rule, _ in result.standalone_rules_and_contexts])
+        self.assertEqual(2, result.stats.overflow_count)
+        self.assertEqual(16, result.stats.complexity)
+        # moved out rules are still enabled
+        self.assertEqual(["_SmallRule", "_MediumRule", "_LargeRule"], result.all_rule_class_names)
+        self.assertEqual(0, len(result.rules_enabled_diff.newly_disabled))
+
+    @patch("castervoice.lib.printer.out")
+    def test_split_app_rule_keeps_context(self, out):
+        budget = ComplexityBudget(20, ComplexityBudget.SPLIT)
+        managed_rules = [ManagedRule(_LargeRule, RuleDetails(ccrtype=CCRType.GLOBAL)),
+                         ManagedRule(_AppRule, RuleDetails(ccrtype=CCRType.APP, executable="notepad"))]
+        result = TestComplexityBudget._merge(TestComplexityBudget._create_merger(budget, True), managed_rules)
+
+        # (8 + 3) * 2 is over budget in the app context only, and the large rule comes first
+        self.assertEqual(["_LargeRule"], [rule.name for rule, _ in result.standalone_rules_and_contexts])
+        self.assertIsNone(result.standalone_rules_and_contexts[0][1])
+
+        managed_rules.reverse()
+        result = TestComplexityBudget._merge(TestComplexityBudget._create_merger(budget, True), managed_rules)
+        rule, context = result.standalone_rules_and_contexts[0]
+        self.assertEqual("_AppRule", rule.name)
+        self.assertIsInstance(context, AppContext)
+        self.assertIs(context, rule._context)
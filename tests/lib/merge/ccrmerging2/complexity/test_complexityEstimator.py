@@ -0,0 +1,67 @@
+from unittest import TestCase
+
+from dragonfly import Choice, Dictation, IntegerRef, Literal, Repetition, RuleRef
+
+from castervoice.lib.merge.ccrmerging2.complexity.complexity_estimator import ComplexityEstimator
+from castervoice.lib.merge.mergerule import MergeRule
+from castervoice.lib.merge.state.actions2 import NullAction
+
+
+class _ChoiceRule(MergeRule):
+    mapping = {
+        "go <direction>": NullAction()
+    }
+    extras = [Choice("direction", {"up": "up", "down": "down", "far left": "left"})]
+
+
+class _NumbersRule(MergeRule):
+    mapping = {
+        "line <n>": NullAction(),
+        "page <n>": NullAction()
+    }
+    extras = [IntegerRef("n", 1, 10)]
+
+
+class TestComplexityEstimator(TestCase):
+
+    def setUp(self):
+        self._estimator = ComplexityEstimator()
+
+    def test_literal(self):
+        self.assertEqual(2, self._estimator.estimate_element(Literal("go to")))
+
+    def test_dictation(self):
+        self.assertEqual(ComplexityEstimator.DICTATION_COST, self._estimator.estimate_element(Dictation("text")))
+
+    def test_choice(self):
+        self.assertEqual(4, self._estimator.estimate_element(Choice("c", {"up": 1, "down": 2, "far left": 3})))
+
+    def test_repetition(self):
+        self.assertEqual(8, self._estimator.estimate_element(Repetition(Literal("go to"), min=1, max=5)))
+
+    def test_integer_grows_with_range(self):
+        small = self._estimator.estimate_element(IntegerRef("n", 1, 10))
+        large = self._estimator.estimate_element(IntegerRef("n", 1, 1000))
+        self.assertLess(small, large)
+
+    def test_referenced_rule_counted_once(self):
+        rule = _ChoiceRule()
+        rule_score = self._estimator.estimate_rule(rule)
+        twice = Repetition(RuleRef(rule), min=1, max=3)
+        self.assertEqual((ComplexityEstimator.REFERENCE_COST + rule_score) * 2,
+                         self._estimator.estimate_element(twice))
+
+    def test_rule(self):
+        self.assertEqual(5, self._estimator.estimate_rule(_ChoiceRule()))
+
+    def test_shared_extra_counted_per_reference(self):
+        integer_score = self._estimator.estimate_element(IntegerRef("n", 1, 10))
+        self.assertEqual(2 + integer_score + ComplexityEstimator.REFERENCE_COST,
+                         self._estimator.estimate_rule(_NumbersRule()))
+
+    def test_rule_score_reused_for_same_instance(self):
+        rule = _ChoiceRule()
+        self._estimator.estimate_rule(rule)
+        rule._mapping = {}
+        self.assertEqual(5, self._estimator.estimate_rule(rule))
+        self.assertEqual(5, self._estimator.estimate_rule(_ChoiceRule()))
@@ -0,0 +1,55 @@
+from dragonfly import Grammar, get_engine
+from mock import MagicMock
+
+from castervoice.lib.merge.ccrmerging2.hooks.base_hook import BaseHook
+from castervoice.lib.merge.ccrmerging2.hooks.hooks_runner import HooksRunner
+from tests.test_util.settings_mocking import SettingsEnabledTestCase
+
+
+class _HookOne(BaseHook):
+    def __init__(self):
+        super(_HookOne, self).__init__("test event")
+
+    def get_pronunciation(self):
+        return "runner alpha"
+
+
+class _HookTwo(BaseHook):
+    def __init__(self):
+        super(_HookTwo, self).__init__("test event")
+
+    def get_pronunciation(self):
+        return "runner bravo"
+
+
+class TestHooksRunner(SettingsEnabledTestCase):
+
+    def setUp(self):
+        self._set_setting(["hooks", "default_hooks"], [])
+        self._config = MagicMock()
+        self._runner = HooksRunner(self._config)
+        self._grammar = None
+
+    def tearDown(self):
+        if self._grammar is not None:
+            self._grammar.unload()
+
+    def _load_activation_rule(self):
+        rule_class, _ = self._runner.construct_activation_rule()
+        self._grammar = Grammar("hooks runner test")
+        self._grammar.add_rule(rule_class())
+        self._grammar.load()
+        self._config.reset_mock()
+
+    def test_no_hooks_no_rule(self):
+        self.assertIsNone(self._runner.construct_activation_rule())
+
+    def test_each_hook_activated_by_name(self):
+        self._runner.add_hook(_HookOne)
+        self._runner.add_hook(_HookTwo)
+        self._load_activation_rule()
+
+        get_engine().mimic("enable runner alpha hook")
+        get_engine().mimic("disable runner bravo hook")
+        self.assertEqual([("_HookOne", True), ("_HookTwo", False)],
+                         [call[0] for call in self._config.set_hook_active.call_args_list])
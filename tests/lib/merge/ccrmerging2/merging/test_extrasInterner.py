@@ -0,0 +1,87 @@
+from unittest import TestCase
+
+from dragonfly import Choice, Dictation, Function, Grammar, IntegerRef, RuleRef, get_engine
+from mock import patch
+
+from castervoice.lib import printer
+from castervoice.lib.merge.ccrmerging2.merging.extras_interner import ExtrasInterner
+from castervoice.lib.merge.mergerule import MergeRule
+from castervoice.lib.merge.state.actions2 import NullAction
+
+
+class _RuleOne(MergeRule):
+    mapping = {"interned one <n>": NullAction(), "interned go <direction>": NullAction()}
+    extras = [IntegerRef("n", 1, 50), Choice("direction", {"up": "up", "down": "down"})]
+
+
+class _RuleTwo(MergeRule):
+    mapping = {"interned two <n>": NullAction(), "interned come <way>": NullAction()}
+    extras = [IntegerRef("n", 1, 50), Choice("way", {"down": "down", "up": "up"})]
+
+
+class _RuleThree(MergeRule):
+    mapping = {"interned three <n> [<text>]": NullAction()}
+    extras = [IntegerRef("n", 1, 100), Dictation("text")]
+
+
+class _RuleFour(MergeRule):
+    mapping = {"interned four <m>": NullAction()}
+    extras = [IntegerRef("m", 1, 50)]
+
+
+class TestExtrasInterner(TestCase):
+
+    def setUp(self):
+        self._interner = ExtrasInterner()
+
+    def _extras_by_name(self, rules):
+        return {extra.name: extra for extra in self._interner.intern_extras(rules)}
+
+    def test_same_integers_share_one_rule(self):
+        extras = self._extras_by_name([_RuleOne(), _RuleTwo(), _RuleFour()])
+
+        self.assertIs(_RuleOne.extras[0], extras["n"])
+        self.assertIsInstance(extras["m"], RuleRef)
+        self.assertIs(extras["n"].rule, extras["m"].rule)
+
+    def test_same_choices_compiled_once(self):
+        extras = self._extras_by_name([_RuleOne(), _RuleTwo()])
+
+        self.assertIsInstance(extras["direction"], RuleRef)
+        self.assertIs(extras["direction"].rule, extras["way"].rule)
+
+    def test_interning_is_stable(self):
+        first = self._extras_by_name([_RuleOne(), _RuleTwo()])
+        second = self._extras_by_name([_RuleOne(), _RuleTwo()])
+
+        self.assertIs(first["way"], second["way"])
+
+    def test_conflict_reported_once_later_rule_wins(self):
+        with patch.object(printer, "out") as out:
+            extras = self._extras_by_name([_RuleOne(), _RuleThree()])
+            self._extras_by_name([_RuleOne(), _RuleThree()])
+
+        self.assertIs(_RuleThree.extras[0], extras["n"])
+        self.assertEqual(1, out.call_count)
+        self.assertIn("_RuleThree", out.call_args[0][0])
+
+    def test_merged_rule_still_recognizes(self):
+        recognized = []
+
+        class _RecordingRule(MergeRule):
+            mapping = {"interned five <n> <direction>":
+                       Function(lambda n, direction: recognized.append((n, direction)))}
+            extras = _RuleOne.extras
+
+        merged = MergeRule.merge_all([_RecordingRule(), _RuleTwo(), _RuleFour()], self._interner)
+        grammar = Grammar("interner test")
+        grammar.add_rule(merged)
+        grammar.load()
+        try:
+            get_engine().mimic("interned five seven down")
+        finally:
+            grammar.unload()
+
+        self.assertEqual([(7, "down")], recognized)
+        # one integer rule and one choice rule
+        self.assertEqual(2, len([rule for rule in grammar.rules if not rule.exported]))
@@ -1,9 +1,11 @@
 from dragonfly.grammar.context import LogicNotContext, Context, LogicAndContext
-from mock import Mock
+from mock import Mock, patch
+from castervoice.lib import settings
 from castervoice.lib.context import AppContext
 from castervoice.rules.apps.editor.eclipse_rules.eclipse import EclipseCCR
 from castervoice.rules.apps.editor.vscode_rules.vscode import VSCodeCcrRule
 from castervoice.rules.core.alphabet_rules.alphabet import Alphabet
+from castervoice.rules.ccr.prolog_rules.prolog import Prolog
 from castervoice.rules.core.navigation_rules.nav import Navigation
 from castervoice.lib.const import CCRType
 from castervoice.lib.ctrl.mgr.managed_rule import ManagedRule
@@ -141,3 +143,25 @@ class TestCCRMerger2(SettingsEnabledTestCase):
         self.assertIsInstance(context_2, AppContext)
         self.assertIsInstance(context_3, AppContext)
         # TODO: write a similar unit test to check the executables/titles validity of the contexts produced
+
+    def test_default_settings_keep_prolog_and_navigation(self):
+        """
+        Prolog's "cut" only overlaps Navigation's "cut [<nnavi500>]" through an optional,
+        which doesn't KO either rule unless the indexed compatibility check is turned on.
+        """
+        with patch.object(settings, "_USER_DIR", "/mock/user/dir"), \
+                patch.object(settings, "_BASE_PATH", "/mock/base/path"), \
+                patch.object(settings, "SYSTEM_INFORMATION", {"hidden console binary": ""}):
+            default_indexed_compat_check = settings._get_defaults()["ccr_merging"]["indexed_compat_check"]
+        self.addCleanup(self._set_setting, ["ccr_merging", "indexed_compat_check"],
+                        settings.settings(["ccr_merging", "indexed_compat_check"]))
+        self._set_setting(["ccr_merging", "indexed_compat_check"], default_indexed_compat_check)
+        self.merger = Nexus._create_merger(self.selfmodrule_configurer, self.transformers_runner)
+        sorter = ConfigBasedRuleSetSorter(["Navigation", "Prolog"])
+
+        prolog_mr = TestCCRMerger2._create_managed_rule(Prolog, CCRType.GLOBAL)
+        navigation_mr = TestCCRMerger2._create_managed_rule(Navigation, CCRType.GLOBAL)
+        result = self.merger.merge_rules([navigation_mr, prolog_mr], sorter)
+
+        self.assertEqual(["Navigation", "Prolog"], result.all_rule_class_names)
+        self.assertEqual(0, len(result.rules_enabled_diff.newly_disabled))
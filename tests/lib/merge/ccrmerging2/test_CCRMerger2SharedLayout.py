@@ -0,0 +1,91 @@
+from dragonfly.grammar.context import LogicNotContext
+from mock import Mock
+
+from castervoice.lib.const import CCRType
+from castervoice.lib.context import AppContext
+from castervoice.lib.ctrl.mgr.managed_rule import ManagedRule
+from castervoice.lib.ctrl.mgr.rule_details import RuleDetails
+from castervoice.lib.ctrl.nexus import Nexus
+from castervoice.lib.merge.ccrmerging2.sorting.config_ruleset_sorter import ConfigBasedRuleSetSorter
+from castervoice.lib.merge.ccrmerging2.transformers.transformers_runner import TransformersRunner
+from tests.lib.merge.ccrmerging2.fake_rules import FakeRuleOne, FakeRuleTwo, FakeRuleThree
+from tests.test_util.settings_mocking import SettingsEnabledTestCase
+
+
+class TestCCRMerger2SharedLayout(SettingsEnabledTestCase):
+
+    @staticmethod
+    def _create_managed_rule(rule_class, ccrtype, executable=None):
+        return ManagedRule(rule_class, RuleDetails(ccrtype=ccrtype, executable=executable))
+
+    def setUp(self):
+        self._set_setting(["miscellaneous", "max_ccr_repetitions"], "4")
+        self._set_setting(["ccr_merging", "shared_layout"], True)
+        self.sorter = ConfigBasedRuleSetSorter(["FakeRuleOne", "FakeRuleTwo", "FakeRuleThree"])
+        self.merger = Nexus._create_merger(Mock(), TransformersRunner(Mock()))
+
+    def tearDown(self):
+        self._set_setting(["ccr_merging", "shared_layout"], False)
+
+    def _extract_prepared_rules(self, repeat_rule):
+        return [child._rule for child in repeat_rule._extras["caster_base_sequence"]._child._children]
+
+    def test_app_rules_reference_shared_rule(self):
+        """
+        Every RepeatRule references the same prepared global rule, and app
+        RepeatRules add a delta rule with only the app's specs.
+        """
+        three_mr = self._create_managed_rule(FakeRuleThree, CCRType.GLOBAL)
+        one_mr = self._create_managed_rule(FakeRuleOne, CCRType.APP, "one")
+        result = self.merger.merge_rules([three_mr, one_mr], self.sorter)
+
+        self.assertTrue(result.single_grammar)
+        self.assertEqual(2, len(result.ccr_rules_and_contexts))
+        global_repeat_rule, global_context = result.ccr_rules_and_contexts[0]
+        app_repeat_rule, app_context = result.ccr_rules_and_contexts[1]
+        self.assertIsInstance(global_context, LogicNotContext)
+        self.assertIsInstance(app_context, AppContext)
+        self.assertIs(global_context, global_repeat_rule._context)
+        self.assertIs(app_context, app_repeat_rule._context)
+
+        shared_rule, = self._extract_prepared_rules(global_repeat_rule)
+        app_shared_rule, delta_rule = self._extract_prepared_rules(app_repeat_rule)
+        self.assertIs(shared_rule, app_shared_rule)
+        self.assertIn("c", shared_rule._mapping)
+        self.assertNotIn("c", delta_rule._mapping)
+        self.assertIn("one exclusive", delta_rule._mapping)
+
+    def test_app_rules_in_different_contexts_are_compatible(self):
+        """
+        App rules which are never active together don't KO each other.
+        """
+        one_mr = self._create_managed_rule(FakeRuleOne, CCRType.APP, "one")
+        two_mr = self._create_managed_rule(FakeRuleTwo, CCRType.APP, "two")
+        result = self.merger.merge_rules([one_mr, two_mr], self.sorter)
+
+        self.assertEqual(["FakeRuleOne", "FakeRuleTwo"], result.all_rule_class_names)
+        self.assertEqual(2, len(result.ccr_rules_and_contexts))
+
+    def test_app_rules_in_same_context_are_incompatible(self):
+        """
+        App rules for the same app still KO each other.
+        """
+        one_mr = self._create_managed_rule(FakeRuleOne, CCRType.APP, "same")
+        two_mr = self._create_managed_rule(FakeRuleTwo, CCRType.APP, "same")
+        result = self.merger.merge_rules([one_mr, two_mr], self.sorter)
+
+        self.assertEqual(["FakeRuleTwo"], result.all_rule_class_names)
+        self.assertEqual(set(["FakeRuleOne"]), result.rules_enabled_diff.newly_disabled)
+
+    def test_later_app_rule_kos_global_rule(self):
+        """
+        The global rule is shared by all contexts, so if an app rule KOs it, it's KO'd everywhere.
+        """
+        one_mr = self._create_managed_rule(FakeRuleOne, CCRType.GLOBAL)
+        two_mr = self._create_managed_rule(FakeRuleTwo, CCRType.APP, "two")
+        three_mr = self._create_managed_rule(FakeRuleThree, CCRType.GLOBAL)
+        result = self.merger.merge_rules([one_mr, two_mr, three_mr], self.sorter)
+
+        self.assertEqual(["FakeRuleTwo", "FakeRuleThree"], result.all_rule_class_names)
+        shared_rule, = self._extract_prepared_rules(result.ccr_rules_and_contexts[0][0])
+        self.assertNotIn("one exclusive", shared_rule._mapping)
@@ -0,0 +1,44 @@
+from unittest import TestCase
+
+from dragonfly import Grammar, get_engine
+from mock import MagicMock
+
+from castervoice.lib.merge.ccrmerging2.transformers.base_transformer import BaseRuleTransformer
+from castervoice.lib.merge.ccrmerging2.transformers.transformers_runner import TransformersRunner
+
+
+class _TransformerOne(BaseRuleTransformer):
+    def get_pronunciation(self):
+        return "runner charlie"
+
+
+class _TransformerTwo(BaseRuleTransformer):
+    def get_pronunciation(self):
+        return "runner delta"
+
+
+class TestTransformersRunner(TestCase):
+
+    def setUp(self):
+        self._config = MagicMock()
+        self._runner = TransformersRunner(self._config)
+
+    def test_no_transformers_no_rule(self):
+        self.assertIsNone(self._runner.construct_activation_rule())
+
+    def test_each_transformer_activated_by_name(self):
+        self._runner.add_transformer(_TransformerOne)
+        self._runner.add_transformer(_TransformerTwo)
+        rule_class, _ = self._runner.construct_activation_rule()
+        grammar = Grammar("transformers runner test")
+        grammar.add_rule(rule_class())
+        grammar.load()
+        self._config.reset_mock()
+        try:
+            get_engine().mimic("disable runner charlie transformer")
+            get_engine().mimic("enable runner delta transformer")
+        finally:
+            grammar.unload()
+
+        self.assertEqual([("_TransformerOne", False), ("_TransformerTwo", True)],
+                         [call[0] for call in self._config.set_transformer_active.call_args_list])
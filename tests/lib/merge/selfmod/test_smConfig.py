@@ -0,0 +1,62 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from mock import patch
+
+from castervoice.lib import utilities
+from castervoice.lib.merge.selfmod.sm_config import SelfModStateSavingConfig
+
+
+class TestSelfModStateSavingConfig(TestCase):
+
+    def setUp(self):
+        self._temp_dir = tempfile.mkdtemp()
+        self._path = os.path.join(self._temp_dir, "selfmod.toml")
+        self._write_file("path = [\"zero\"]\n")
+        load_patcher = patch.object(utilities, "load_toml_file", side_effect=lambda path: {"path": ["zero"]})
+        save_patcher = patch.object(utilities, "save_toml_file")
+        self._load_toml_file = load_patcher.start()
+        save_patcher.start()
+        self.addCleanup(load_patcher.stop)
+        self.addCleanup(save_patcher.stop)
+
+    def tearDown(self):
+        SelfModStateSavingConfig._loaded_configs.pop(self._path, None)
+        shutil.rmtree(self._temp_dir)
+
+    def _write_file(self, content):
+        with open(self._path, "w") as f:
+            f.write(content)
+
+    def _load(self):
+        config = SelfModStateSavingConfig(self._path)
+        config.load()
+        return config
+
+    def test_unchanged_file_read_once(self):
+        self._load()
+        config = self._load()
+
+        self.assertEqual(1, self._load_toml_file.call_count)
+        self.assertEqual(["zero"], config.get("path"))
+
+    def test_changed_file_read_again(self):
+        self._load()
+        self._write_file("path = [\"zero\", \"one alpha\"]\n")
+        self._load()
+
+        self.assertEqual(2, self._load_toml_file.call_count)
+
+    def test_saved_state_remembered(self):
+        self._load().replace({"path": ["zero", "one bravo"]})
+
+        self.assertEqual(["zero", "one bravo"], self._load().get("path"))
+        self.assertEqual(1, self._load_toml_file.call_count)
+
+    def test_loaded_configs_are_independent(self):
+        self._load()
+        self._load().get("path").append("one bravo")
+
+        self.assertEqual(["zero"], self._load().get("path"))
@@ -0,0 +1,76 @@
+from unittest import TestCase
+
+from dragonfly import IntegerRef
+from mock import patch
+
+from castervoice.lib.ctrl.mgr import rule_formatter
+from castervoice.lib.merge.mergerule import MergeRule
+from castervoice.lib.merge.state.actions2 import NullAction
+
+
+class _TestRuleA(MergeRule):
+    mapping = {
+        "hello [<n>]": NullAction(),
+        "a": NullAction()
+    }
+    extras = [IntegerRef("n", 1, 10)]
+    defaults = {"n": 1}
+
+
+class _TestRuleB(MergeRule):
+    mapping = {
+        "b": NullAction()
+    }
+    defaults = {"n": 2}
+
+
+class _TestRuleC(MergeRule):
+    mapping = {
+        "a": NullAction(),
+        "c": NullAction()
+    }
+
+
+class TestMergeRule(TestCase):
+
+    def test_merge_all_empty(self):
+        self.assertIsNone(MergeRule.merge_all([]))
+
+    def test_merge_all_single(self):
+        rule = _TestRuleA()
+        self.assertIs(rule, MergeRule.merge_all([rule]))
+
+    def test_merge_all_same_as_pairwise_merge(self):
+        rules = [_TestRuleA(), _TestRuleB(), _TestRuleC()]
+        pairwise = rules[0].merge(rules[1]).merge(rules[2])
+        merged = MergeRule.merge_all(rules)
+
+        self.assertEqual(pairwise.get_mapping(), merged.get_mapping())
+        self.assertEqual(pairwise.get_defaults(), merged.get_defaults())
+        self.assertEqual(sorted(pairwise._extras.keys()), sorted(merged._extras.keys()))
+
+    def test_merge_all_later_rules_win(self):
+        rule_a = _TestRuleA()
+        rule_c = _TestRuleC()
+        merged = MergeRule.merge_all([rule_a, _TestRuleB(), rule_c])
+
+        self.assertIs(rule_c._mapping["a"], merged._mapping["a"])
+        self.assertEqual(2, merged.get_defaults()["n"])
+
+    def test_merge_all_does_not_modify_rules(self):
+        rule_a = _TestRuleA()
+        MergeRule.merge_all([rule_a, _TestRuleB()])
+
+        self.assertNotIn("b", rule_a._mapping)
+        self.assertEqual(1, rule_a.get_defaults()["n"])
+
+    def test_class_rdescripts_set_once(self):
+        class _DescribedRule(MergeRule):
+            mapping = {"described": NullAction(rdescript=None)}
+
+        with patch.object(rule_formatter, "_set_rdescripts", wraps=rule_formatter._set_rdescripts) as set_rdescripts:
+            _DescribedRule()
+            _DescribedRule()
+
+        self.assertEqual(1, set_rdescripts.call_count)
+        self.assertEqual("_Described: described", _DescribedRule.mapping["described"].rdescript)
@@ -0,0 +1,57 @@
+import unittest
+
+from dragonfly import MappingRule, Function
+
+from castervoice.lib.available_commands_index import AvailableCommandsIndex
+
+
+def _rule(*specs):
+    return MappingRule(mapping=dict((spec, Function(lambda: None)) for spec in specs))
+
+
+class TestAvailableCommandsIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = AvailableCommandsIndex()
+        self.index.set_ccr_rules([("Navigation", _rule("go to line", "select all"), None),
+                                  ("FirefoxRule", _rule("new tab", "go back"), "firefox")])
+        self.index.set_non_ccr_rule("CasterRule", _rule("update caster"))
+
+    def test_get_commands_sorted(self):
+        specs = [spec for spec, _, _ in self.index.get_commands()]
+        self.assertEqual(["go back", "go to line", "new tab", "select all", "update caster"], specs)
+
+    def test_filter_by_rule(self):
+        commands = self.index.get_commands(rcn="navigation")
+        self.assertEqual([("go to line", "Navigation", None), ("select all", "Navigation", None)], commands)
+
+    def test_filter_by_context_includes_global_rules(self):
+        rcns = set(rcn for _, rcn, _ in self.index.get_commands(context_name="Firefox"))
+        self.assertEqual({"Navigation", "FirefoxRule", "CasterRule"}, rcns)
+        rcns = set(rcn for _, rcn, _ in self.index.get_commands(context_name="chrome"))
+        self.assertEqual({"Navigation", "CasterRule"}, rcns)
+
+    def test_filter_by_prefix(self):
+        specs = [spec for spec, _, _ in self.index.get_commands(prefix="go")]
+        self.assertEqual(["go back", "go to line"], specs)
+
+    def test_find_commands(self):
+        self.assertEqual([("go to line", "Navigation", None)], self.index.find_commands(" Line "))
+        specs = [spec for spec, _, _ in self.index.find_commands("fire")]
+        self.assertEqual(["go back", "new tab"], specs)
+
+    def test_commands_rebuilt_only_after_change(self):
+        commands = self.index.get_commands()
+        self.assertIs(self.index._get_all_commands(), self.index._get_all_commands())
+        self.index.set_non_ccr_rule("CasterRule", None)
+        self.assertEqual(len(commands) - 1, len(self.index.get_commands()))
+
+    def test_set_ccr_rules_replaces_all(self):
+        self.index.set_ccr_rules([("Navigation", _rule("copy"), None)])
+        specs = [spec for spec, _, _ in self.index.get_commands()]
+        self.assertEqual(["copy", "update caster"], specs)
+
+    def test_format_commands(self):
+        text = AvailableCommandsIndex.format_commands(self.index.get_commands(prefix="go"))
+        self.assertEqual("FirefoxRule (firefox):\n    go back\nNavigation:\n    go to line", text)
+        self.assertEqual("No matching commands.", AvailableCommandsIndex.format_commands([]))
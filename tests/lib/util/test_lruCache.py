@@ -0,0 +1,38 @@
+from unittest import TestCase
+
+from castervoice.lib.util.lru_cache import LRUCache
+
+
+class TestLRUCache(TestCase):
+
+    def test_get_missing(self):
+        cache = LRUCache(2)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(1, cache.misses)
+        self.assertEqual(0, cache.hits)
+
+    def test_get_present(self):
+        cache = LRUCache(2)
+        cache.put("a", 1)
+        self.assertEqual(1, cache.get("a"))
+        self.assertEqual(1, cache.hits)
+        self.assertEqual(0, cache.misses)
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertIn("c", cache)
+        self.assertEqual(2, len(cache))
+
+    def test_put_existing_replaces(self):
+        cache = LRUCache(2)
+        cache.put("a", 1)
+        cache.put("a", 2)
+        self.assertEqual(2, cache.get("a"))
+        self.assertEqual(1, len(cache))
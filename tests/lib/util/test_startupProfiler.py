@@ -0,0 +1,95 @@
+import os
+import shutil
+import sys
+import tempfile
+from unittest import TestCase
+
+from castervoice.lib.util.startup_profiler import StartupProfiler, TimingNode
+
+
+class _Loader(object):
+
+    def load(self, name):
+        return name.upper()
+
+
+class TestStartupProfiler(TestCase):
+
+    def setUp(self):
+        self._now = [0.0]
+        self._profiler = StartupProfiler(clock=lambda: self._now[0])
+
+    def _advance(self, seconds):
+        self._now[0] += seconds
+
+    def test_phases_nest_and_combine(self):
+        self._profiler.start()
+        with self._profiler.phase("settings"):
+            self._advance(1)
+        with self._profiler.phase("nexus"):
+            self._advance(0.5)
+            for i in range(2):
+                with self._profiler.phase("load grammar"):
+                    self._advance(2)
+        self._profiler.stop()
+
+        root = self._profiler.root
+        self.assertEqual(5.5, root.seconds)
+        self.assertEqual(["settings", "nexus"], [node.name for node in root.get_children()])
+        nexus = root.get_children()[1]
+        self.assertEqual(4.5, nexus.seconds)
+        self.assertEqual(0.5, nexus.get_self_seconds())
+        load_grammar = nexus.get_children()[0]
+        self.assertEqual((4, 2), (load_grammar.seconds, load_grammar.count))
+
+    def test_folded_stacks_use_self_time(self):
+        self._profiler.start()
+        with self._profiler.phase("nexus"):
+            self._advance(0.25)
+            with self._profiler.phase("load; grammar"):
+                self._advance(0.5)
+        self._profiler.stop()
+        self.assertEqual(["startup;nexus 250000", "startup;nexus;load, grammar 500000"],
+                         self._profiler.to_folded())
+
+    def test_wrap_times_method_until_stopped(self):
+        self._profiler.start()
+        self._profiler.wrap(_Loader, "load", lambda loader, name: "load " + name)
+        self.assertEqual("A", _Loader().load("a"))
+        self._profiler.stop()
+        self.assertEqual("B", _Loader().load("b"))
+
+        self.assertEqual(["load a"], [node.name for node in self._profiler.root.get_children()])
+        self.assertEqual("load", _Loader.__dict__["load"].__name__)
+
+    def test_imports_recorded_in_current_phase(self):
+        directory = tempfile.mkdtemp()
+        sys.path.insert(0, directory)
+        try:
+            with open(os.path.join(directory, "caster_profiled_module.py"), "w") as f:
+                f.write("import caster_profiled_dependency\n")
+            with open(os.path.join(directory, "caster_profiled_dependency.py"), "w") as f:
+                f.write("VALUE = 1\n")
+            self._profiler.start()
+            try:
+                with self._profiler.phase("rules"):
+                    import caster_profiled_module
+                    try:
+                        import caster_missing_module
+                    except ImportError:
+                        pass
+            finally:
+                self._profiler.stop()
+        finally:
+            sys.path.remove(directory)
+            sys.modules.pop("caster_profiled_module", None)
+            sys.modules.pop("caster_profiled_dependency", None)
+            shutil.rmtree(directory)
+
+        rules = self._profiler.root.get_children()[0]
+        imported = rules.get_children()
+        self.assertEqual(["caster_profiled_module"], [node.name for node in imported])
+        self.assertEqual(TimingNode.IMPORT, imported[0].kind)
+        self.assertEqual(["caster_profiled_dependency"], [node.name for node in imported[0].get_children()])
+        self.assertEqual(["caster_profiled_module", "caster_profiled_dependency"],
+                         sorted([entry["module"] for entry in self._profiler.get_imports()], reverse=True))